@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class AccountsConfig(AppConfig):
+    name = 'app.accounts'
+
+    def ready(self):
+        from app.accounts import signals  # noqa: F401
@@ -0,0 +1,41 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.functions import Lower
+
+UserModel = get_user_model()
+
+
+class UsernameOrEmailBackend(ModelBackend):
+    '''
+    `ModelBackend` that also takes the user's email (any case) as the
+    username, looking the user up with one query. An exact username match
+    wins over an email match.
+    '''
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if not username or password is None:
+            return None
+
+        # LOWER(email) is indexed (accounts migration 0005)
+        user = UserModel._default_manager.annotate(
+            email_lower=Lower('email'),
+            username_match=Case(
+                When(username=username, then=Value(0)),
+                default=Value(1),
+                output_field=IntegerField()
+            )
+        ).filter(
+            Q(username=username) | Q(email_lower=username.lower())
+        ).order_by('username_match', 'pk').first()
+
+        if user is None:
+            # Run the default password hasher once to reduce the timing
+            # difference between an existing and a nonexistent user
+            UserModel().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
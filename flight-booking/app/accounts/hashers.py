@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    '''
+    Argon2 with its costs from settings (ARGON2_TIME_COST, ARGON2_MEMORY_COST,
+    ARGON2_PARALLELISM). Hashes made with other costs are rehashed with
+    these the next time their user logs in.
+    '''
+
+    @property
+    def time_cost(self):
+        return settings.ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.ARGON2_PARALLELISM
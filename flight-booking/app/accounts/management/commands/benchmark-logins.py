@@ -0,0 +1,85 @@
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import User
+from django.core.management import BaseCommand
+from django.db import connection
+from django.db.models import Q
+from django.test.utils import CaptureQueriesContext
+
+from app.accounts.backends import UsernameOrEmailBackend
+
+
+class Command(BaseCommand):
+    help = ('Log a user in by email many times, the previous way (lookup '
+            'then ModelBackend) and with UsernameOrEmailBackend, using the '
+            'configured password hasher.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=200)
+        parser.add_argument('--workers', type=int, default=4)
+
+    def _lookup_then_authenticate_(self, email, password):
+        user = User.objects.filter(
+            Q(username=email) | Q(email__iexact=email)).first()
+        return ModelBackend().authenticate(
+            None, username=user.username, password=password)
+
+    def _single_lookup_(self, email, password):
+        return UsernameOrEmailBackend().authenticate(
+            None, username=email, password=password)
+
+    def _time_(self, label, login, email, password, options):
+        with CaptureQueriesContext(connection) as queries:
+            login(email, password)
+
+        def timed_login(_):
+            started = time.perf_counter()
+            try:
+                return login(email, password) is not None, \
+                    time.perf_counter() - started
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            results = list(pool.map(timed_login, range(options['logins'])))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency for _, latency in results)
+        self.stdout.write(
+            '{}: {:.0f} logins/s p50: {:.1f}ms queries/login: {} '
+            'failed: {}'.format(
+                label,
+                len(results) / elapsed,
+                latencies[len(latencies) // 2] * 1000,
+                len(queries.captured_queries),
+                sum(1 for logged_in, _ in results if not logged_in)))
+
+    def handle(self, *args, **options):
+        suffix = uuid.uuid4().hex[:8]
+        password = uuid.uuid4().hex
+        user = User(
+            username='login-benchmark-{}'.format(suffix),
+            email='Login.Benchmark.{}@Example.com'.format(suffix))
+        user.set_password(password)
+        user.save()
+
+        try:
+            self.stdout.write('hash: {}'.format(user.password.rsplit('$', 2)[0]))
+            started = time.perf_counter()
+            for _ in range(20):
+                user.check_password(password)
+            self.stdout.write('password check alone: {:.1f}ms'.format(
+                (time.perf_counter() - started) / 20 * 1000))
+
+            email = user.email.lower()
+            self._time_('lookup then authenticate',
+                        self._lookup_then_authenticate_, email, password,
+                        options)
+            self._time_('single lookup backend',
+                        self._single_lookup_, email, password, options)
+        finally:
+            user.delete()
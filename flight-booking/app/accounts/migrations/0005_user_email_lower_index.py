@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.db import migrations
+
+INDEX_NAME = 'auth_user_email_lower_idx'
+
+
+def create_email_index(apps, schema_editor):
+    if schema_editor.connection.vendor not in ('postgresql', 'sqlite'):
+        return
+
+    table = apps.get_model(settings.AUTH_USER_MODEL)._meta.db_table
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS {} ON {} (LOWER(email))'.format(
+            INDEX_NAME, schema_editor.quote_name(table))
+    )
+
+
+def drop_email_index(apps, schema_editor):
+    if schema_editor.connection.vendor not in ('postgresql', 'sqlite'):
+        return
+
+    schema_editor.execute('DROP INDEX IF EXISTS {}'.format(INDEX_NAME))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('accounts', '0004_accounts_passport_number'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            create_email_index,
+            drop_email_index
+        ),
+    ]
@@ -1,3 +1,8 @@
+import threading
+
+from django.conf import settings
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
 
 GROUPS = {
     'client': [
@@ -69,3 +74,151 @@ GROUPS = {
         ('airline', 'change_airline'),
     ]
 }
+
+
+_lock = threading.Lock()
+# (bit of each 'app_label.codename', mask of each group in GROUPS)
+_compiled = None
+
+
+def _compile_groups_():
+    '''
+    Give every permission named in GROUPS a bit and each group the mask
+    of its permissions. GROUPS names permissions by codename only (as
+    `fix-permissions` does), so a codename grants it under any app label.
+    '''
+    codenames = {
+        codename
+        for group_permissions in GROUPS.values()
+        for _, codename in group_permissions
+    }
+    perms = sorted(
+        '{}.{}'.format(app_label, codename)
+        for app_label, codename in Permission.objects.filter(
+            codename__in=codenames
+        ).values_list('content_type__app_label', 'codename')
+    )
+    bits = {perm: 1 << position for position, perm in enumerate(perms)}
+
+    by_codename = {}
+    for perm, bit in bits.items():
+        codename = perm.split('.', 1)[1]
+        by_codename[codename] = by_codename.get(codename, 0) | bit
+
+    group_masks = {}
+    for group, group_permissions in GROUPS.items():
+        mask = 0
+        for _, codename in group_permissions:
+            mask |= by_codename.get(codename, 0)
+        group_masks[group] = mask
+    return bits, group_masks
+
+
+def get_compiled_permissions():
+    '''Permission bits and group masks, compiled once per process'''
+    global _compiled
+    compiled = _compiled
+    if compiled is None:
+        with _lock:
+            if _compiled is None:
+                _compiled = _compile_groups_()
+            compiled = _compiled
+    return compiled
+
+
+def reset_compiled_permissions():
+    '''Recompile on next use (after permissions are recreated)'''
+    global _compiled
+    with _lock:
+        _compiled = None
+
+
+def _cache_key_(user_id):
+    return 'permissions:user:{}'.format(user_id)
+
+
+def _user_grants_(user):
+    '''
+    Names of `user`'s groups and its own permissions, read through the
+    shared cache (kept until membership changes, see `invalidate`)
+    '''
+    key = _cache_key_(user.pk)
+    grants = cache.get(key)
+    if grants is None:
+        grants = (
+            tuple(user.groups.values_list('name', flat=True)),
+            tuple(
+                '{}.{}'.format(app_label, codename)
+                for app_label, codename in user.user_permissions.values_list(
+                    'content_type__app_label', 'codename')
+            )
+        )
+        cache.set(key, grants, settings.PERMISSION_CACHE_TIMEOUT)
+    return grants
+
+
+def _user_mask_(user):
+    '''
+    `(mask, complete)` of `user`, kept on the user for the rest of the
+    request. `complete` is False when the user is in a group GROUPS does
+    not describe, whose permissions only the auth backend knows.
+    '''
+    resolved = getattr(user, '_permission_mask', None)
+    if resolved is None:
+        bits, group_masks = get_compiled_permissions()
+        groups, user_permissions = _user_grants_(user)
+        mask = 0
+        complete = True
+        for group in groups:
+            if group in group_masks:
+                mask |= group_masks[group]
+            else:
+                complete = False
+        for perm in user_permissions:
+            mask |= bits.get(perm, 0)
+        resolved = user._permission_mask = (mask, complete)
+    return resolved
+
+
+def has_perm(user, perm):
+    '''
+    `user.has_perm(perm)` for the permissions in GROUPS without database
+    queries: a bit test against the user's compiled mask. Anything else
+    is left to `user.has_perm`.
+    '''
+    if not user.is_active:
+        return False
+    if user.is_superuser:
+        return True
+
+    bit = get_compiled_permissions()[0].get(perm)
+    if bit is None:
+        return user.has_perm(perm)
+    mask, complete = _user_mask_(user)
+    if mask & bit:
+        return True
+    return not complete and user.has_perm(perm)
+
+
+def permission_claims(user):
+    '''
+    `(permissions, complete)` of `user` for its token: the names of the
+    GROUPS permissions it holds, and whether those are all it holds
+    '''
+    bits = get_compiled_permissions()[0]
+    mask, complete = _user_mask_(user)
+    return sorted(perm for perm, bit in bits.items() if mask & bit), complete
+
+
+def claims_mask(user_permissions, complete):
+    '''The `(mask, complete)` pair `permission_claims` was built from'''
+    bits = get_compiled_permissions()[0]
+    mask = 0
+    for perm in user_permissions:
+        mask |= bits.get(perm, 0)
+    return mask, complete
+
+
+def invalidate(*user_ids):
+    '''Forget the cached groups and permissions of users'''
+    cache.delete_many([_cache_key_(user_id) for user_id in user_ids])
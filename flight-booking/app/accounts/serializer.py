@@ -130,3 +130,4 @@ class CompactAccountsViewSerializer(serializers.ModelSerializer):
     class Meta:
         model = Accounts
         fields = ('full_name', 'user_name', 'id')
+        select_related = ('user',)
@@ -4,10 +4,8 @@ from django.db import (
 )
 from django.contrib.auth import (
     authenticate,
-    user_logged_in,
-    models as auth_models
+    user_logged_in
 )
-from django.db.models import Q
 
 from rest_framework_jwt.settings import api_settings
 from rest_framework import (
@@ -19,7 +17,7 @@ from app.helpers import (
 )
 
 from .models import Accounts
-from . import serializer as account_serializer
+from . import permissions, serializer as account_serializer
 from app.uploads import (
     tasks as upload_tasks,
     services as upload_services
@@ -44,30 +42,24 @@ def authenticate_user(request, *, data):
         data, 'username', 'password',
         raise_exception=True
     )
-    user_model = auth_models.User.objects.filter(
-        Q(username=valid_data.get('username')) |
-        Q(email__iexact=valid_data.get('username'))
-    ).first()
-
-    if user_model is not None:
-        credentials = {
-            'username': user_model.username,
-            'password': valid_data.get('password')
-        }
-        if all(credentials.values()):
-            user = authenticate(request=request, **credentials)
-
-            if user and user.is_active:
-                payload = api_settings.JWT_PAYLOAD_HANDLER(user)
-                token = api_settings.JWT_ENCODE_HANDLER(payload)
-
-                user_logged_in.send(sender=user.__class__,
-                                    request=request, user=user)
-
-                return utils.jwt_response_payload_handler(
-                    token,
-                    user
-                ), token
+    # the backend finds the user by username or email in one query
+    user = authenticate(
+        request=request,
+        username=valid_data.get('username'),
+        password=valid_data.get('password')
+    )
+
+    if user and user.is_active:
+        payload = api_settings.JWT_PAYLOAD_HANDLER(user)
+        token = api_settings.JWT_ENCODE_HANDLER(payload)
+
+        user_logged_in.send(sender=user.__class__,
+                            request=request, user=user)
+
+        return utils.jwt_response_payload_handler(
+            token,
+            user
+        ), token
 
     raise exceptions.NotAuthenticated(
         'Unable to log in with provided credentials.'
@@ -76,9 +68,9 @@ def authenticate_user(request, *, data):
 
 def update_profile_picture(requestor, *, account_id, data):
     '''Upload/Edit Profile Picture'''
-    if requestor.has_perm('accounts.update_any_picture'):
+    if permissions.has_perm(requestor, 'accounts.update_any_picture'):
         pass
-    elif requestor.has_perm('accounts.update_own_picture'):
+    elif permissions.has_perm(requestor, 'accounts.update_own_picture'):
         if str(requestor.account.id) != str(account_id):
             raise exceptions.PermissionDenied('Insufficient Permission.')
         # account_id = requestor.account.id
@@ -112,9 +104,9 @@ def update_profile_picture(requestor, *, account_id, data):
 
 def delete_profile_picture(requestor, *, account_id):
     '''Remove Profile Picture'''
-    if requestor.has_perm('accounts.delete_any_picture'):
+    if permissions.has_perm(requestor, 'accounts.delete_any_picture'):
         pass
-    elif requestor.has_perm('accounts.delete_own_picture'):
+    elif permissions.has_perm(requestor, 'accounts.delete_own_picture'):
         if str(requestor.account.id) != str(account_id):
             raise exceptions.PermissionDenied('Insufficient Permission.')
         # account_id = requestor.account.id
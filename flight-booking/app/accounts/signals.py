@@ -0,0 +1,32 @@
+from django.contrib.auth.models import Group, Permission, User
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from app.accounts import permissions
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_permissions(sender, instance, **kwargs):
+    '''New or removed users never see another user's cached permissions'''
+    permissions.invalidate(instance.pk)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def membership_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    '''Drop cached permissions of users whose groups or permissions change'''
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            permissions.invalidate(instance.pk)
+    elif action in ('post_add', 'post_remove'):
+        permissions.invalidate(*pk_set)
+    elif action == 'pre_clear':
+        permissions.invalidate(*instance.user_set.values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=Group)
+@receiver(pre_delete, sender=Permission)
+def grant_deleted(sender, instance, **kwargs):
+    '''Deleting a group or permission silently removes it from its users'''
+    permissions.invalidate(*instance.user_set.values_list('pk', flat=True))
@@ -0,0 +1,73 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework_jwt.settings import api_settings
+from rest_framework_jwt.utils import jwt_payload_handler
+
+from app.accounts.tests import factory as user_factory
+from app.helpers import utils
+from app.helpers.authentication import ClaimsPrincipal
+from app.reservations.tests import factory as reservation_factory
+
+AUTH_TABLES = (
+    'FROM "auth_user"',
+    'FROM "accounts_accounts"',
+    'FROM "auth_permission"',
+    'FROM "auth_group"',
+)
+
+
+class ClaimsAuthenticationTests(APITestCase):
+    '''JWT claims authentication'''
+
+    def setUp(self):
+        self.user = user_factory.create_user()
+        flight = reservation_factory.create_single_flight()
+        reservation_factory.make_reservation_single(
+            user_account=self.user, flight=flight)
+        self.url = reverse('reservations-list', kwargs={'version': 'v1'})
+
+    def test_token_claims(self):
+        '''JWT claims - account, user type and permissions are in the token'''
+        payload = utils.jwt_payload_handler(self.user)
+
+        self.assertEqual(payload['account_id'], str(self.user.account.id))
+        self.assertEqual(payload['user_type'], self.user.account.user_type)
+        self.assertIn('reservations.add_reservation', payload['permissions'])
+        self.assertNotIn(
+            'reservations.retrieve_any_reservations', payload['permissions'])
+        self.assertTrue(payload['permissions_complete'])
+
+        principal = ClaimsPrincipal(payload)
+        self.assertEqual(principal.account.id, self.user.account.id)
+        self.assertEqual(principal, self.user)
+        with self.assertNumQueries(1):
+            self.assertEqual(principal.email, self.user.email)
+
+    def test_no_auth_queries(self):
+        '''JWT claims - listing reservations makes no user or permission queries'''
+        token = utils.generate_token(self.user)
+        self.client.get(self.url, HTTP_AUTHORIZATION=token)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, HTTP_AUTHORIZATION=token)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data.get('payload').get('results')), 1)
+        self.assertFalse([
+            query['sql'] for query in queries.captured_queries
+            if any(table in query['sql'] for table in AUTH_TABLES)
+        ])
+
+    def test_token_without_claims(self):
+        '''JWT claims - tokens issued without them still authenticate'''
+        token = '{} {}'.format(
+            'Bearer',
+            api_settings.JWT_ENCODE_HANDLER(jwt_payload_handler(self.user))
+        )
+        response = self.client.get(self.url, HTTP_AUTHORIZATION=token)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data.get('payload').get('results')), 1)
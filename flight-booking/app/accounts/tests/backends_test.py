@@ -0,0 +1,94 @@
+from django.contrib.auth import authenticate
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from app.accounts.tests import factory as user_factory
+
+
+class UsernameOrEmailBackendTests(TestCase):
+    '''Username or email authentication backend'''
+
+    def setUp(self):
+        self.user = user_factory.create_user(
+            email='Test.User@Example.com',
+            username='testuser',
+            password='testuserpassword'
+        )
+
+    def test_username_or_email(self):
+        '''Authentication backend - username or any case email, one query'''
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                authenticate(username='testuser', password='testuserpassword'),
+                self.user
+            )
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                authenticate(
+                    username='test.user@example.COM',
+                    password='testuserpassword'),
+                self.user
+            )
+        self.assertIsNone(
+            authenticate(username='testuser', password='wrongpassword'))
+        self.assertIsNone(
+            authenticate(username='nobody', password='testuserpassword'))
+
+    def test_username_wins_over_email(self):
+        '''Authentication backend - exact username match comes first'''
+        other = user_factory.create_user(
+            email='someone@example.com',
+            username='test.user@example.com',
+            password='otheruserpassword'
+        )
+        self.assertEqual(
+            authenticate(
+                username='test.user@example.com',
+                password='otheruserpassword'),
+            other
+        )
+
+    def test_username_wins_over_earlier_emails(self):
+        '''Authentication backend - exact username match beats older email matches'''
+        user_factory.create_user(
+            email='shared@example.com',
+            username='first',
+            password='firstuserpassword'
+        )
+        user_factory.create_user(
+            email='shared@example.com',
+            username='second',
+            password='seconduserpassword'
+        )
+        other = user_factory.create_user(
+            email='someone@example.com',
+            username='shared@example.com',
+            password='otheruserpassword'
+        )
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                authenticate(
+                    username='shared@example.com',
+                    password='otheruserpassword'),
+                other
+            )
+
+    def test_inactive_user(self):
+        '''Authentication backend - inactive users can not log in'''
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(
+            authenticate(username='testuser', password='testuserpassword'))
+
+    def test_rehash_on_login(self):
+        '''Argon2 hasher - new costs are applied on the next login'''
+        self.assertIn('t=2', self.user.password)
+
+        with override_settings(ARGON2_TIME_COST=1, ARGON2_MEMORY_COST=256):
+            self.assertIsNotNone(
+                authenticate(username='testuser', password='testuserpassword'))
+            password = User.objects.get(pk=self.user.pk).password
+            self.assertIn('m=256,t=1', password)
+
+            with self.assertNumQueries(1):
+                authenticate(username='testuser', password='testuserpassword')
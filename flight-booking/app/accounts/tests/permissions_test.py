@@ -0,0 +1,112 @@
+from django.contrib.auth.models import Group, Permission, User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from app.accounts import permissions
+from app.accounts.tests import factory as user_factory
+from app.helpers import utils
+
+
+class PermissionResolverTests(TestCase):
+    '''Compiled group permissions'''
+
+    def setUp(self):
+        permissions.reset_compiled_permissions()
+        self.client_group = Group.objects.create(name='client')
+        self.user = User.objects.create(username='grouped')
+        self.user.groups.add(self.client_group)
+
+    def _fresh_(self, user):
+        '''The user as a new request would load it'''
+        return User.objects.get(pk=user.pk)
+
+    def test_group_permissions(self):
+        '''Permission resolver - GROUPS grants, without queries once cached'''
+        self.assertTrue(permissions.has_perm(
+            self._fresh_(self.user), 'reservations.add_reservation'))
+
+        user = self._fresh_(self.user)
+        with self.assertNumQueries(0):
+            self.assertTrue(permissions.has_perm(
+                user, 'reservations.add_reservation'))
+            self.assertTrue(permissions.has_perm(
+                user, 'accounts.update_own_picture'))
+            self.assertFalse(permissions.has_perm(
+                user, 'reservations.create_any_reservation'))
+            self.assertFalse(permissions.has_perm(
+                user, 'reservations.add_flights'))
+
+    def test_membership_changes(self):
+        '''Permission resolver - cached groups are dropped when they change'''
+        self.assertTrue(permissions.has_perm(
+            self._fresh_(self.user), 'reservations.add_reservation'))
+
+        self.user.groups.remove(self.client_group)
+        self.assertFalse(permissions.has_perm(
+            self._fresh_(self.user), 'reservations.add_reservation'))
+
+        staff = Group.objects.create(name='staff')
+        staff.user_set.add(self.user)
+        self.assertTrue(permissions.has_perm(
+            self._fresh_(self.user), 'reservations.add_flights'))
+
+        staff.delete()
+        self.assertFalse(permissions.has_perm(
+            self._fresh_(self.user), 'reservations.add_flights'))
+
+    def test_user_permissions_and_flags(self):
+        '''Permission resolver - own permissions, inactive and superusers'''
+        user = user_factory.create_user(user_type='staff')
+        self.assertTrue(permissions.has_perm(
+            self._fresh_(user), 'reservations.change_flight'))
+        self.assertFalse(permissions.has_perm(
+            self._fresh_(user), 'reservations.retrieve_any_reservations'))
+
+        user.is_active = False
+        user.save()
+        self.assertFalse(permissions.has_perm(
+            self._fresh_(user), 'reservations.change_flight'))
+
+        user.is_active = True
+        user.is_superuser = True
+        user.save()
+        self.assertTrue(permissions.has_perm(
+            self._fresh_(user), 'reservations.retrieve_any_reservations'))
+
+    def test_falls_back_to_auth_backend(self):
+        '''Permission resolver - groups and permissions outside GROUPS'''
+        auditors = Group.objects.create(name='auditors')
+        auditors.permissions.add(Permission.objects.get(
+            codename='retrieve_any_reservations'))
+        self.user.groups.add(auditors)
+
+        self.assertTrue(permissions.has_perm(
+            self._fresh_(self.user), 'reservations.retrieve_any_reservations'))
+        self.assertFalse(permissions.has_perm(
+            self._fresh_(self.user), 'auth.add_user'))
+
+
+class PermissionQueriesTests(APITestCase):
+    '''Permission checks on API requests'''
+
+    def setUp(self):
+        self.user = user_factory.create_user()
+
+    def test_no_permission_queries(self):
+        '''Permission checks - no permission queries once cached'''
+        url = reverse('airlines-list', kwargs={'version': 'v1'})
+        token = utils.generate_token(self.user)
+        self.client.get(url, HTTP_AUTHORIZATION=token)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_AUTHORIZATION=token)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse([
+            query['sql'] for query in queries.captured_queries
+            if 'auth_permission' in query['sql'] or 'auth_group' in query['sql']
+        ])
@@ -10,6 +10,7 @@ from . import (
     services as accounts_services
 )
 from app.helpers.response import Response
+from app.helpers.throttling import LOGIN_THROTTLES
 from rest_framework_jwt.views import JSONWebTokenAPIView
 from rest_framework_jwt.settings import api_settings
 
@@ -18,7 +19,8 @@ class UserAuthViewSet(ViewSet):
     '''
     Handles User Creation, Authentication, Profile Picture Upload and Delete
     '''
-    @decorators.action(detail=False, methods=['post'])
+    @decorators.action(detail=False, methods=['post'],
+                       throttle_classes=LOGIN_THROTTLES)
     def auth_user(self, request, **kwargs):
         '''
         To authenticate a user -
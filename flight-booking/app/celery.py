@@ -17,12 +17,16 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 # Load task modules from all registered Django app configs.
 app.autodiscover_tasks()
 
-# app.conf.beat_schedule = {
-#     'send-reservation-reminder-email': {
-#         'task': 'publisher.tasks.send_reservation_reminder',
-#         'schedule': crontab(minute=0, hour=0),
-#     },
-# }
+app.conf.beat_schedule = {
+    # 'send-reservation-reminder-email': {
+    #     'task': 'publisher.tasks.send_reservation_reminder',
+    #     'schedule': crontab(minute=0, hour=0),
+    # },
+    'materialize-flight-schedules': {
+        'task': 'materialize_flight_schedules',
+        'schedule': crontab(minute=30, hour=0),
+    },
+}
 
 @app.task(bind=True)
 def debug_task(self):
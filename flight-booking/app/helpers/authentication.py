@@ -0,0 +1,99 @@
+from django.contrib.auth.models import User
+from django.utils.translation import ugettext as _
+from rest_framework import exceptions
+from rest_framework_jwt.authentication import JSONWebTokenAuthentication
+
+from app.accounts import permissions
+from app.accounts.models import Accounts
+
+
+class ClaimsAccount(object):
+    '''
+    The requestor's account as its token describes it (`id`, `user_type`);
+    any other attribute is read from the `Accounts` row, loaded on first use
+    '''
+
+    def __init__(self, account_id, user_type, user_id):
+        self.id = self.pk = Accounts._meta.pk.to_python(account_id)
+        self.user_type = user_type
+        self.user_id = user_id
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        if '_account' not in self.__dict__:
+            self._account = Accounts.objects.get(pk=self.id)
+        return getattr(self._account, name)
+
+
+class ClaimsPrincipal(object):
+    '''
+    The requesting user built from its token's claims alone, in place of
+    the `User` row. Permission checks use the claimed permissions; any
+    other attribute is read from the `User` row, loaded on first use.
+    '''
+    is_active = True
+    is_anonymous = False
+    is_authenticated = True
+
+    def __init__(self, payload):
+        self.id = self.pk = payload['user_id']
+        self.username = payload.get('username')
+        self.is_superuser = payload.get('is_superuser', False)
+        self._account = None
+        if payload.get('account_id') is not None:
+            self._account = ClaimsAccount(
+                payload['account_id'], payload.get('user_type'), self.pk)
+        # read by `permissions.has_perm` instead of the user's groups
+        self._permission_mask = permissions.claims_mask(
+            payload.get('permissions', []),
+            payload.get('permissions_complete', False)
+        )
+
+    def _get_user_(self):
+        if '_user' not in self.__dict__:
+            self._user = User.objects.get(pk=self.pk)
+        return self._user
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return getattr(self._get_user_(), name)
+
+    @property
+    def account(self):
+        if self._account is None:
+            return self._get_user_().account
+        return self._account
+
+    def has_perm(self, perm, obj=None):
+        return self._get_user_().has_perm(perm, obj)
+
+    def __eq__(self, other):
+        return isinstance(other, (User, ClaimsPrincipal)) and other.pk == self.pk
+
+    def __hash__(self):
+        return hash(self.pk)
+
+    def __str__(self):
+        return self.username or ''
+
+
+class ClaimsJSONWebTokenAuthentication(JSONWebTokenAuthentication):
+    '''
+    JWT authentication that trusts the token's claims instead of loading
+    the user: tokens from `utils.jwt_payload_handler` authenticate without
+    queries, older tokens fall back to the user lookup. Deactivating a user
+    or changing their permissions takes effect when their token expires
+    (`JWT_EXPIRATION_DELTA`) or is refreshed.
+    '''
+
+    def authenticate_credentials(self, payload):
+        if 'permissions' not in payload:
+            return super(
+                ClaimsJSONWebTokenAuthentication, self
+            ).authenticate_credentials(payload)
+
+        if not payload.get('user_id') or not payload.get('username'):
+            raise exceptions.AuthenticationFailed(_('Invalid payload.'))
+        return ClaimsPrincipal(payload)
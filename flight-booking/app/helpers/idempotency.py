@@ -0,0 +1,103 @@
+import functools
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import exceptions, status
+from rest_framework.response import Response
+
+from app.helpers import utils
+
+HEADER = 'HTTP_IDEMPOTENCY_KEY'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyConflict(exceptions.APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'A request with this Idempotency-Key is still in progress.'
+    default_code = 'conflict'
+
+
+def _cache_key_(user_pk, key):
+    return 'idempotency:{}:{}'.format(
+        user_pk, hashlib.sha256(key.encode('utf-8')).hexdigest())
+
+
+def _fingerprint_(request):
+    '''Hash of what the request asks for, to catch a key reused elsewhere'''
+    data = request.data
+    if hasattr(data, 'lists'):
+        data = dict(data.lists())
+    return hashlib.sha256(json.dumps(
+        [request.method, request.path, data], sort_keys=True, default=str
+    ).encode('utf-8')).hexdigest()
+
+
+def idempotent(view_method):
+    '''
+    Lets clients retry a POST safely with an `Idempotency-Key` header: the
+    first successful response is kept per (user, key) for
+    IDEMPOTENCY_KEY_TIMEOUT seconds and replayed to retries without
+    running the view again. Failed requests are not kept, so they can be
+    retried with the same key.
+    '''
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.META.get(HEADER)
+        if (request.method != 'POST' or not key or
+                not request.user or not request.user.is_authenticated):
+            return view_method(self, request, *args, **kwargs)
+
+        if len(key) > MAX_KEY_LENGTH:
+            raise utils.FieldErrorExceptions({
+                'Idempotency-Key': {
+                    'message': 'Must be at most {} characters.'.format(
+                        MAX_KEY_LENGTH),
+                    'type': 'invalid'
+                }
+            })
+
+        cache_key = _cache_key_(request.user.pk, key)
+        fingerprint = _fingerprint_(request)
+
+        entry = cache.get(cache_key)
+        if entry is None and cache.add(
+                cache_key, {'fingerprint': fingerprint},
+                settings.IDEMPOTENCY_LOCK_TIMEOUT):
+            try:
+                response = view_method(self, request, *args, **kwargs)
+            except BaseException:
+                cache.delete(cache_key)
+                raise
+            if status.is_success(response.status_code):
+                cache.set(cache_key, {
+                    'fingerprint': fingerprint,
+                    'status': response.status_code,
+                    'data': response.data,
+                }, settings.IDEMPOTENCY_KEY_TIMEOUT)
+            else:
+                cache.delete(cache_key)
+            return response
+
+        if entry is None:
+            # another request with this key got there first
+            entry = cache.get(cache_key) or {}
+        if entry.get('fingerprint', fingerprint) != fingerprint:
+            raise utils.FieldErrorExceptions({
+                'Idempotency-Key': {
+                    'message': 'Already used for a different request.',
+                    'type': 'mismatch'
+                }
+            })
+        if 'status' not in entry:
+            raise IdempotencyConflict()
+
+        return Response(
+            entry['data'],
+            status=entry['status'],
+            headers={REPLAYED_HEADER: 'true'}
+        )
+
+    return wrapper
@@ -0,0 +1,89 @@
+import json
+
+
+_WHITESPACE = ' \t\n\r'
+
+
+class _Reader_(object):
+    '''Text buffer over a file, refilled one chunk at a time'''
+
+    def __init__(self, file, chunk_size):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.position = 0
+        self.eof = False
+
+    def fill(self):
+        '''Read another chunk (dropping what was consumed); False at EOF'''
+        if self.eof:
+            return False
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return True
+
+    def peek(self):
+        '''Next non whitespace character (None at EOF)'''
+        while True:
+            while (self.position < len(self.buffer) and
+                   self.buffer[self.position] in _WHITESPACE):
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self.fill():
+                return None
+
+    def expect(self, characters):
+        character = self.peek()
+        if character is None or character not in characters:
+            raise ValueError('Expected one of {!r} at {!r}'.format(
+                characters, character))
+        self.position += 1
+        return character
+
+    def decode(self, decoder):
+        '''Next complete JSON value'''
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buffer, self.position)
+            except ValueError:
+                if not self.fill():
+                    raise
+                continue
+            # a value running to the end of the buffer (a number, say)
+            # may continue in the next chunk
+            if end == len(self.buffer) and self.fill():
+                continue
+            self.position = end
+            return value
+
+
+def iter_json(file, *, chunk_size=64 * 1024):
+    '''
+    Decode a JSON document one item at a time: the elements of a top level
+    array, or `(key, value)` pairs of a top level object. Only one item
+    (and one chunk of text) is held in memory.
+    '''
+    decoder = json.JSONDecoder()
+    reader = _Reader_(file, chunk_size)
+
+    opening = reader.expect('[{')
+    closing = ']' if opening == '[' else '}'
+    if reader.peek() == closing:
+        reader.position += 1
+        return
+
+    while True:
+        if opening == '{':
+            key = reader.decode(decoder)
+            reader.expect(':')
+            yield key, reader.decode(decoder)
+        else:
+            yield reader.decode(decoder)
+        if reader.expect(',' + closing) == closing:
+            return
@@ -0,0 +1,43 @@
+import uuid
+
+from django.conf import settings
+from django.http import JsonResponse
+from rest_framework import status
+
+from app.helpers import throttling
+
+
+class InFlightLimitMiddleware(object):
+    '''
+    Sheds load once INFLIGHT_REQUEST_LIMIT requests are being served
+    across all workers: further requests get a 503 straight away instead
+    of waiting for a worker. Off when the limit is 0. Streamed responses
+    give their slot back once the view returns.
+    '''
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.INFLIGHT_REQUEST_LIMIT:
+            return self.get_response(request)
+
+        slot = uuid.uuid4().hex
+        acquired = throttling.acquire_inflight_slot(slot)
+        if acquired is False:
+            response = JsonResponse({
+                'status_code': status.HTTP_503_SERVICE_UNAVAILABLE,
+                'errors': {
+                    'global': 'Server busy, please try again shortly.'
+                },
+                'message': 'An error has occured.',
+                'success': False,
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            response['Retry-After'] = str(settings.INFLIGHT_RETRY_AFTER)
+            return response
+
+        try:
+            return self.get_response(request)
+        finally:
+            if acquired:
+                throttling.release_inflight_slot(slot)
@@ -1,8 +1,153 @@
+import hashlib
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
 from collections import OrderedDict, namedtuple
+from datetime import date
+from functools import partial
+from math import ceil
 
+from django.conf import settings
+from django.core import (
+    exceptions as django_exceptions,
+    paginator as django_paginator
+)
+from django.core.cache import cache
+from django.db import connections, models
+from django.utils.functional import cached_property
 from rest_framework import (
+    exceptions,
     pagination
 )
+from rest_framework.utils.urls import replace_query_param
+
+from app.helpers.queries import optimize_queryset
+
+
+COUNT_EXACT = 'exact'
+COUNT_CAPPED = 'capped'
+COUNT_ESTIMATE = 'estimate'
+
+
+class _Page_(django_paginator.Page):
+    '''Page that knows whether a next page exists without the total count'''
+
+    def __init__(self, object_list, number, paginator, *, has_next):
+        super(_Page_, self).__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+
+class CountStrategyPaginator(django_paginator.Paginator):
+    '''
+    Paginator whose total count is computed with a count strategy:
+    - `exact`: `COUNT(*)` over the whole result
+    - `capped`: stop counting after `PAGINATION_COUNT_CAP` rows
+    - `estimate`: planner row estimate for unfiltered PostgreSQL queries
+      (capped otherwise)
+    Capped/estimated counts are cached per query for
+    `PAGINATION_COUNT_CACHE_TIMEOUT` seconds. Pages never depend on the
+    count: one extra row is fetched to tell if there is a next page.
+    '''
+
+    def __init__(self, object_list, per_page, *, count_strategy=COUNT_EXACT,
+                 **kwargs):
+        super(CountStrategyPaginator, self).__init__(
+            object_list, per_page, **kwargs)
+        self.count_strategy = count_strategy
+        self.count_is_exact = True
+
+    def validate_number(self, number):
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise django_paginator.PageNotAnInteger(
+                'That page number is not an integer')
+        if number < 1:
+            raise django_paginator.EmptyPage(
+                'That page number is less than 1')
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        object_list = list(
+            self.object_list[bottom:bottom + self.per_page + 1])
+
+        if not object_list and number > 1:
+            raise django_paginator.EmptyPage('That page contains no results')
+
+        return _Page_(
+            object_list[:self.per_page],
+            number,
+            self,
+            has_next=len(object_list) > self.per_page
+        )
+
+    def _capped_count_(self):
+        count_cap = settings.PAGINATION_COUNT_CAP
+        count = self.object_list.order_by()[:count_cap + 1].count()
+        if count > count_cap:
+            self.count_is_exact = False
+            return count_cap
+        return count
+
+    def _estimated_count_(self):
+        query_set = self.object_list
+        connection = connections[query_set.db]
+        if connection.vendor != 'postgresql' or query_set.query.where:
+            return self._capped_count_()
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [query_set.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+
+        if row is None or row[0] < 0:
+            return self._capped_count_()
+        self.count_is_exact = False
+        return row[0]
+
+    def _cache_key_(self):
+        try:
+            sql, params = self.object_list.query.sql_with_params()
+        except django_exceptions.EmptyResultSet:
+            return None
+        signature = repr((self.count_strategy, sql, params))
+        return 'pagination-count:{}'.format(
+            hashlib.md5(signature.encode('utf-8')).hexdigest())
+
+    @cached_property
+    def count(self):
+        if (self.count_strategy == COUNT_EXACT or
+                not isinstance(self.object_list, models.QuerySet)):
+            return super(CountStrategyPaginator, self).count
+
+        cache_key = self._cache_key_()
+        if cache_key is None:
+            return 0
+
+        cached = cache.get(cache_key)
+        if cached is not None:
+            count, self.count_is_exact = cached
+            return count
+
+        if self.count_strategy == COUNT_ESTIMATE:
+            count = self._estimated_count_()
+        else:
+            count = self._capped_count_()
+
+        cache.set(
+            cache_key,
+            (count, self.count_is_exact),
+            settings.PAGINATION_COUNT_CACHE_TIMEOUT
+        )
+        return count
 
 
 class CustomPagination(pagination.PageNumberPagination):
@@ -10,12 +155,21 @@ class CustomPagination(pagination.PageNumberPagination):
     max_page_size = 10000
     page_size_query_param = 'page_size'
 
-    def get_paginated_response(self, data):
+    def __init__(self, count_strategy=None):
+        if count_strategy is None:
+            count_strategy = settings.PAGINATION_COUNT_STRATEGY
+        self.django_paginator_class = partial(
+            CountStrategyPaginator,
+            count_strategy=count_strategy
+        )
 
-        count = self.page.paginator.count
-        total_pages = count // self.page_size
+    def get_paginated_response(self, data):
+        paginator = self.page.paginator
+        count = paginator.count
+        total_pages = ceil(count / paginator.per_page)
         return OrderedDict([
             ('count', count),
+            ('count_is_exact', paginator.count_is_exact),
             ('total_pages', total_pages),
             ('next', self.get_next_link()),
             ('previous', self.get_previous_link()),
@@ -23,9 +177,124 @@ class CustomPagination(pagination.PageNumberPagination):
         ])
 
 
-def paginate(*, serializer, query_set, request):
-    '''Paginate Queries'''
-    paginator = CustomPagination()
+class KeysetPagination(pagination.BasePagination):
+    '''
+    Cursor (keyset) pagination over a unique `ordering`, e.g.
+    `('first_flight__expected_departure', 'id')`.
+    Pages continue with `WHERE (a, b) > (last_a, last_b)` instead of an
+    OFFSET and no COUNT is run, so every page costs the same as the first.
+    '''
+    page_size = CustomPagination.page_size
+    max_page_size = 1000
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, ordering):
+        self.ordering = tuple(ordering)
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size < 1:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+        except (TypeError, ValueError, UnicodeError):
+            raise exceptions.NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise exceptions.NotFound(self.invalid_cursor_message)
+        return position
+
+    def encode_cursor(self, position):
+        encoded = urlsafe_b64encode(json.dumps(position).encode('ascii'))
+        return replace_query_param(
+            self.base_url,
+            self.cursor_query_param,
+            encoded.decode('ascii')
+        )
+
+    def get_position(self, instance):
+        position = []
+        for field in self.ordering:
+            value = instance
+            for attr in field.split('__'):
+                value = getattr(value, attr)
+            if isinstance(value, date):
+                value = value.isoformat()
+            elif not isinstance(value, (int, float)):
+                value = str(value)
+            position.append(value)
+        return position
+
+    def filter_after(self, query_set, position):
+        '''Rows strictly after `position` in `ordering`'''
+        after = models.Q()
+        for index, field in enumerate(self.ordering):
+            step = models.Q(**{'{}__gt'.format(field): position[index]})
+            for previous_index in range(index):
+                step &= models.Q(**{
+                    self.ordering[previous_index]: position[previous_index]
+                })
+            after |= step
+        return query_set.filter(after)
+
+    def paginate_queryset(self, query_set, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+
+        query_set = query_set.order_by(*self.ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            try:
+                query_set = self.filter_after(query_set, position)
+            except (TypeError, ValueError, django_exceptions.ValidationError):
+                raise exceptions.NotFound(self.invalid_cursor_message)
+
+        results = list(query_set[:page_size + 1])
+        self.has_next = len(results) > page_size
+        self.page = results[:page_size]
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.get_position(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data)
+        ])
+
+
+def _use_keyset_pagination_(request):
+    '''Clients opt in per request with `?pagination=cursor`'''
+    return (request.query_params.get('pagination') == 'cursor' or
+            KeysetPagination.cursor_query_param in request.query_params)
+
+
+def paginate(*, serializer, query_set, request, ordering=None,
+             count_strategy=None):
+    '''
+    Paginate Queries
+    Page number pagination by default (`count_strategy` overrides
+    `PAGINATION_COUNT_STRATEGY`); with `ordering` (a unique ordering)
+    the client may ask for keyset pagination with `?pagination=cursor`.
+    '''
+    if ordering is not None and _use_keyset_pagination_(request):
+        paginator = KeysetPagination(ordering)
+    else:
+        paginator = CustomPagination(count_strategy=count_strategy)
+    query_set = optimize_queryset(query_set, serializer)
     paginator_results = paginator.paginate_queryset(query_set, request)
 
     serialized_data = serializer(paginator_results, many=True).data
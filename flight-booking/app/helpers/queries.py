@@ -0,0 +1,96 @@
+from functools import lru_cache
+
+from django.db import models
+from rest_framework import serializers
+
+
+def _related_lookup_(prefix, source):
+    '''Turn a serializer `source` into an ORM lookup under `prefix`'''
+    return '{}{}'.format(prefix, source.replace('.', '__'))
+
+
+def _collect_related_fields_(serializer_class, prefix, select_related,
+                             prefetch_related, is_prefetch=False):
+    '''Walk a serializer and its nested serializers collecting relations'''
+    meta = getattr(serializer_class, 'Meta', None)
+
+    declared = select_related
+    if is_prefetch:
+        declared = prefetch_related
+
+    for lookup in getattr(meta, 'select_related', ()):
+        declared.append(_related_lookup_(prefix, lookup))
+
+    for lookup in getattr(meta, 'prefetch_related', ()):
+        prefetch_related.append(_related_lookup_(prefix, lookup))
+
+    # plain `BaseSerializer`s declare no fields
+    declared_fields = getattr(serializer_class, '_declared_fields', {})
+    for field_name, field in declared_fields.items():
+        if not isinstance(field, serializers.BaseSerializer):
+            continue
+
+        source = field.source or field_name
+        nested_is_prefetch = is_prefetch
+
+        if isinstance(field, serializers.ListSerializer):
+            field = field.child
+            nested_is_prefetch = True
+
+        if source == '*':
+            nested_prefix = prefix
+        else:
+            lookup = _related_lookup_(prefix, source)
+            if nested_is_prefetch:
+                prefetch_related.append(lookup)
+            else:
+                select_related.append(lookup)
+            nested_prefix = '{}__'.format(lookup)
+
+        _collect_related_fields_(
+            field.__class__,
+            nested_prefix,
+            select_related,
+            prefetch_related,
+            is_prefetch=nested_is_prefetch
+        )
+
+
+@lru_cache(maxsize=None)
+def get_related_fields(serializer_class):
+    '''
+    Relations a serializer needs loaded up front.
+    Serializers declare them with `Meta.select_related` and
+    `Meta.prefetch_related`; nested serializers are followed through
+    their `source` so the lookups are prefixed automatically.
+    Returns a `(select_related, prefetch_related)` tuple.
+    '''
+    select_related = []
+    prefetch_related = []
+
+    _collect_related_fields_(
+        serializer_class,
+        '',
+        select_related,
+        prefetch_related
+    )
+
+    return (
+        tuple(dict.fromkeys(select_related)),
+        tuple(dict.fromkeys(prefetch_related))
+    )
+
+
+def optimize_queryset(query_set, serializer_class):
+    '''Apply the select/prefetch related lookups `serializer_class` needs'''
+    if not isinstance(query_set, models.QuerySet):
+        return query_set
+
+    select_related, prefetch_related = get_related_fields(serializer_class)
+
+    if select_related:
+        query_set = query_set.select_related(*select_related)
+    if prefetch_related:
+        query_set = query_set.prefetch_related(*prefetch_related)
+
+    return query_set
@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.db import models
+from django.http import StreamingHttpResponse
+
+from app.helpers.queries import optimize_queryset
+from app.helpers.renderers import dumps
+
+
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+
+
+def use_streaming(request):
+    '''Clients opt in per request with `?stream=ndjson`'''
+    return request.query_params.get('stream') == 'ndjson'
+
+
+def _ndjson_lines_(serializer, rows):
+    '''Serialize and encode one row at a time'''
+    row_serializer = serializer()
+    for instance in rows:
+        yield dumps(row_serializer.to_representation(instance)) + b'\n'
+
+
+def stream_ndjson(*, serializer, query_set, chunk_size=None):
+    '''
+    Stream Queries
+    One JSON document per line (NDJSON), written as rows are serialized.
+    Querysets are read with `.iterator(chunk_size)` so only one chunk of
+    rows is held in memory (`prefetch_related` lookups are not applied
+    to iterators; serializers streamed here should only select related).
+    '''
+    if chunk_size is None:
+        chunk_size = settings.STREAM_CHUNK_SIZE
+
+    rows = query_set
+    if isinstance(query_set, models.QuerySet):
+        rows = optimize_queryset(query_set, serializer).iterator(
+            chunk_size=chunk_size)
+
+    return StreamingHttpResponse(
+        _ndjson_lines_(serializer, rows),
+        content_type=NDJSON_CONTENT_TYPE
+    )
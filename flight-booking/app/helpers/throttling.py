@@ -0,0 +1,253 @@
+import hashlib
+import logging
+import math
+import threading
+import time
+
+import redis
+from django.conf import settings
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+# KEYS: bucket; ARGV: capacity, tokens per second, now.
+# Returns {allowed, seconds until the next token}
+_TAKE_TOKEN = '''
+local capacity = tonumber(ARGV[1])
+local refill_rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'at')
+local tokens = tonumber(bucket[1]) or capacity
+local at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - at) * refill_rate)
+local allowed = 0
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    wait = (1 - tokens) / refill_rate
+end
+redis.call('HMSET', KEYS[1], 'tokens', tostring(tokens), 'at', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / refill_rate) + 1)
+return {allowed, tostring(wait)}
+'''
+
+# KEYS: slots; ARGV: limit, now, timeout, slot. Slots older than
+# `timeout` belong to workers that died mid request and are dropped
+_ACQUIRE_SLOT = '''
+local limit = tonumber(ARGV[1])
+local now = tonumber(ARGV[2])
+local timeout = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - timeout)
+if redis.call('ZCARD', KEYS[1]) >= limit then
+    return 0
+end
+redis.call('ZADD', KEYS[1], now, ARGV[4])
+redis.call('EXPIRE', KEYS[1], math.ceil(timeout))
+return 1
+'''
+
+
+def _refill_(tokens, at, capacity, refill_rate, now):
+    return min(capacity, tokens + max(0, now - at) * refill_rate)
+
+
+class RedisStore(object):
+    '''Token buckets and in-flight slots shared by every worker'''
+
+    def __init__(self, url):
+        self.client = redis.StrictRedis.from_url(
+            url,
+            socket_timeout=settings.THROTTLE_REDIS_TIMEOUT,
+            socket_connect_timeout=settings.THROTTLE_REDIS_TIMEOUT
+        )
+        self._take_token = self.client.register_script(_TAKE_TOKEN)
+        self._acquire_slot = self.client.register_script(_ACQUIRE_SLOT)
+
+    def take_token(self, key, capacity, refill_rate, now):
+        '''`(allowed, seconds to wait)` after taking a token from `key`'''
+        allowed, wait = self._take_token(
+            keys=[key], args=[capacity, refill_rate, now])
+        return bool(allowed), float(wait)
+
+    def acquire_slot(self, key, slot, limit, timeout, now):
+        '''Hold one of `limit` slots of `key`; False when all are taken'''
+        return bool(self._acquire_slot(
+            keys=[key], args=[limit, now, timeout, slot]))
+
+    def release_slot(self, key, slot):
+        self.client.zrem(key, slot)
+
+
+class LocalStore(object):
+    '''`RedisStore` within one process (tests, or no Redis configured)'''
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._slots = {}
+
+    def take_token(self, key, capacity, refill_rate, now):
+        with self._lock:
+            tokens, at = self._buckets.get(key, (capacity, now))
+            tokens = _refill_(tokens, at, capacity, refill_rate, now)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                return True, 0.0
+            self._buckets[key] = (tokens, now)
+            return False, (1 - tokens) / refill_rate
+
+    def acquire_slot(self, key, slot, limit, timeout, now):
+        with self._lock:
+            slots = self._slots.setdefault(key, {})
+            for stale in [
+                    held for held, at in slots.items() if at <= now - timeout]:
+                del slots[stale]
+            if len(slots) >= limit:
+                return False
+            slots[slot] = now
+            return True
+
+    def release_slot(self, key, slot):
+        with self._lock:
+            self._slots.get(key, {}).pop(slot, None)
+
+
+_lock = threading.Lock()
+_store = None
+
+
+def get_store():
+    '''Redis at THROTTLE_REDIS_URL, or a process local store without one'''
+    global _store
+    store = _store
+    if store is None:
+        with _lock:
+            if _store is None:
+                if settings.THROTTLE_REDIS_URL:
+                    _store = RedisStore(settings.THROTTLE_REDIS_URL)
+                else:
+                    _store = LocalStore()
+            store = _store
+    return store
+
+
+def reset_store():
+    '''Forget all buckets and slots (local store) and reconnect'''
+    global _store
+    with _lock:
+        _store = None
+
+
+def _parse_rate_(rate):
+    '''`'10/min'` -> `(10, 60)`'''
+    num_requests, period = rate.split('/')
+    duration = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 60 * 60 * 24}[period[0]]
+    return int(num_requests), duration
+
+
+class TokenBucketThrottle(BaseThrottle):
+    '''
+    Token bucket per client for `methods` requests: a rate of `N/period`
+    (`DEFAULT_THROTTLE_RATES[scope]`) lets a client burst N requests, then
+    refills evenly over the period. Without a rate nothing is throttled;
+    when Redis is unreachable requests are let through.
+    '''
+    scope = None
+    methods = ('POST',)
+
+    def get_key(self, request, view):
+        '''Client the request is counted against (None: not counted)'''
+        raise NotImplementedError('.get_key() must be overridden')
+
+    def allow_request(self, request, view):
+        self.wait_seconds = None
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        if rate is None or request.method not in self.methods:
+            return True
+        key = self.get_key(request, view)
+        if key is None:
+            return True
+
+        capacity, duration = _parse_rate_(rate)
+        try:
+            allowed, self.wait_seconds = get_store().take_token(
+                'throttle:{}:{}'.format(self.scope, key),
+                capacity, capacity / duration, time.time())
+        except redis.RedisError as exc:
+            logger.warning('Throttle %s not applied: %s', self.scope, exc)
+            return True
+        return allowed
+
+    def wait(self):
+        if self.wait_seconds is None:
+            return None
+        return math.ceil(self.wait_seconds)
+
+
+class IPThrottle(TokenBucketThrottle):
+    '''Counts requests per client IP'''
+
+    def get_key(self, request, view):
+        return self.get_ident(request)
+
+
+class AccountThrottle(TokenBucketThrottle):
+    '''Counts requests per signed in user (per IP when anonymous)'''
+
+    def get_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return 'user-{}'.format(request.user.pk)
+        return self.get_ident(request)
+
+
+class LoginAccountThrottle(TokenBucketThrottle):
+    '''Counts login attempts per username/email tried, whoever sends them'''
+    scope = 'login_account'
+
+    def get_key(self, request, view):
+        username = request.data.get('username')
+        if not isinstance(username, str) or not username:
+            return None
+        return hashlib.sha1(username.lower().encode('utf-8')).hexdigest()
+
+
+class LoginIPThrottle(IPThrottle):
+    scope = 'login_ip'
+
+
+class BookingIPThrottle(IPThrottle):
+    scope = 'booking_ip'
+
+
+class BookingAccountThrottle(AccountThrottle):
+    scope = 'booking_account'
+
+
+LOGIN_THROTTLES = (LoginIPThrottle, LoginAccountThrottle)
+BOOKING_THROTTLES = (BookingIPThrottle, BookingAccountThrottle)
+
+INFLIGHT_KEY = 'inflight'
+
+
+def acquire_inflight_slot(slot):
+    '''
+    Take one of INFLIGHT_REQUEST_LIMIT slots for a request: True when
+    taken, False when all are in use, None when the store is unreachable
+    '''
+    try:
+        return get_store().acquire_slot(
+            INFLIGHT_KEY, slot, settings.INFLIGHT_REQUEST_LIMIT,
+            settings.INFLIGHT_REQUEST_TIMEOUT, time.time())
+    except redis.RedisError as exc:
+        logger.warning('In flight limit not applied: %s', exc)
+        return None
+
+
+def release_inflight_slot(slot):
+    try:
+        get_store().release_slot(INFLIGHT_KEY, slot)
+    except redis.RedisError as exc:
+        logger.warning('In flight slot not released: %s', exc)
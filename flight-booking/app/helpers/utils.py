@@ -4,6 +4,10 @@ from rest_framework import (
     serializers
 )
 from rest_framework_jwt.settings import api_settings
+from rest_framework_jwt.utils import (
+    jwt_payload_handler as default_jwt_payload_handler
+)
+from app.accounts import permissions
 from app.accounts.serializer import(
     UserSerializer
 )
@@ -51,6 +55,24 @@ def validate_fields_present(data, *args, **kwargs):
     return fields
 
 
+def jwt_payload_handler(user):
+    '''
+    Default jwt payload plus the claims `ClaimsJSONWebTokenAuthentication`
+    builds the requesting user from: account, user type and permissions
+    '''
+    payload = default_jwt_payload_handler(user)
+    account = getattr(user, 'account', None)
+    user_permissions, complete = permissions.permission_claims(user)
+    payload.update({
+        'account_id': None if account is None else str(account.id),
+        'user_type': None if account is None else account.user_type,
+        'is_superuser': user.is_superuser,
+        'permissions': user_permissions,
+        'permissions_complete': complete,
+    })
+    return payload
+
+
 def jwt_response_payload_handler(token, user=None, request=None):
     '''custom jwt response payload including user details'''
     return {
@@ -0,0 +1,220 @@
+import bisect
+import heapq
+import re
+import threading
+import time
+import unicodedata
+from functools import lru_cache
+
+from django.conf import settings
+
+from .models import Airport
+
+
+_NON_ALPHANUMERIC = re.compile(r'[^0-9a-z]+')
+
+
+def normalize(text):
+    '''Lower case, accent folded words of `text`'''
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return _NON_ALPHANUMERIC.sub(' ', text.casefold()).split()
+
+
+# prefixes up to this length have their airports precomputed
+_SHORT_PREFIX_LENGTH = 2
+
+# ranked results remembered per index
+_SEARCH_CACHE_SIZE = 4096
+
+# match quality, best first
+MATCH_CODE = 0
+MATCH_CODE_PREFIX = 1
+MATCH_WORDS = 2
+
+AIRPORT_FIELDS = (
+    'code', 'icao', 'airport_name', 'city', 'country',
+    'direct_flights', 'carriers'
+)
+
+
+class AirportIndex(object):
+    '''
+    In memory airport lookup built from rows of `AIRPORT_FIELDS`:
+    - IATA/ICAO code map (and a sorted IATA code array for code prefixes)
+    - prefix index over the normalized words of city, country and name
+      (sorted word array; a prefix is the contiguous run found with bisect,
+      short prefixes are precomputed)
+    - each airport's search result, so lookups never touch the database
+    '''
+
+    def __init__(self, airports):
+        self.codes = {}
+        self.airports = {}
+        word_codes = {}
+
+        for row in airports:
+            airport = dict(zip(AIRPORT_FIELDS, row))
+            code = airport['code']
+            self.airports[code] = airport
+
+            self.codes[code.upper()] = code
+            if airport['icao']:
+                self.codes[airport['icao'].upper()] = code
+            for field in ('city', 'country', 'airport_name'):
+                for word in normalize(airport[field]):
+                    word_codes.setdefault(word, set()).add(code)
+
+        self.sorted_codes = sorted(self.airports)
+        # busiest airports first, then by code
+        self._traffic_rank = {
+            code: rank
+            for rank, code in enumerate(sorted(
+                self.airports,
+                key=lambda code: (
+                    -self.airports[code]['direct_flights'],
+                    -self.airports[code]['carriers'],
+                    code
+                )
+            ))
+        }
+        self.words = sorted(word_codes)
+        self.word_codes = [frozenset(word_codes[word]) for word in self.words]
+
+        # autocomplete queries repeat a lot (every keystroke of common names)
+        self._ranked_ = lru_cache(maxsize=_SEARCH_CACHE_SIZE)(self._rank_)
+
+        self.short_prefixes = {}
+        for word, codes in zip(self.words, self.word_codes):
+            for length in range(1, min(len(word), _SHORT_PREFIX_LENGTH) + 1):
+                self.short_prefixes.setdefault(
+                    word[:length], set()).update(codes)
+
+    def prefix_codes(self, prefix):
+        '''Airports with a word starting with `prefix` (normalized)'''
+        if len(prefix) <= _SHORT_PREFIX_LENGTH:
+            return set(self.short_prefixes.get(prefix, ()))
+
+        codes = set()
+        index = bisect.bisect_left(self.words, prefix)
+        while index < len(self.words) and self.words[index].startswith(prefix):
+            codes |= self.word_codes[index]
+            index += 1
+        return codes
+
+    def code_prefix_codes(self, prefix):
+        '''Airports whose IATA code starts with `prefix`'''
+        prefix = prefix.upper()
+        codes = set()
+        index = bisect.bisect_left(self.sorted_codes, prefix)
+        while (index < len(self.sorted_codes) and
+               self.sorted_codes[index].startswith(prefix)):
+            codes.add(self.sorted_codes[index])
+            index += 1
+        return codes
+
+    def word_match_codes(self, location):
+        '''Airports where every word of `location` starts one of their words'''
+        codes = None
+        # longest words narrow the match fastest
+        for word in sorted(normalize(location), key=len, reverse=True):
+            word_codes = self.prefix_codes(word)
+            codes = word_codes if codes is None else codes & word_codes
+            if not codes:
+                break
+        return codes or set()
+
+    def resolve(self, location):
+        '''
+        Airport codes for free text `location`.
+        An upper case IATA/ICAO code (`LOS`, `DNMM`) resolves to that airport
+        only; otherwise every word of `location` must start a word of the
+        airport's city, country or name (`london heath` -> `LHR`), plus any
+        airport whose code it is.
+        '''
+        location = (location or '').strip()
+        code = self.codes.get(location.upper())
+        if code is not None and location.isupper():
+            return {code}
+
+        codes = self.word_match_codes(location)
+        if code is not None:
+            codes.add(code)
+        return codes
+
+    def _rank_(self, query, limit):
+        exact_code = self.codes.get(query.upper())
+        prefix_codes = set()
+        if query.isalnum():
+            prefix_codes = self.code_prefix_codes(query)
+
+        codes = self.word_match_codes(query) | prefix_codes
+        if exact_code is not None:
+            codes.add(exact_code)
+
+        tier_size = len(self._traffic_rank)
+
+        def rank(code):
+            if code == exact_code:
+                tier = MATCH_CODE
+            elif code in prefix_codes:
+                tier = MATCH_CODE_PREFIX
+            else:
+                tier = MATCH_WORDS
+            return tier * tier_size + self._traffic_rank[code]
+
+        return tuple(heapq.nsmallest(limit, codes, key=rank))
+
+    def search(self, query, *, limit=10):
+        '''
+        Autocomplete: up to `limit` airports for `query`, ranked by match
+        quality (IATA/ICAO code, IATA code prefix, word prefixes) then
+        traffic (direct flights, carriers)
+        '''
+        query = (query or '').strip()
+        if not query:
+            return []
+        return [
+            dict(self.airports[code])
+            for code in self._ranked_(query, limit)
+        ]
+
+
+_lock = threading.Lock()
+_index = None
+_built_at = None
+
+
+def get_airport_index():
+    '''
+    This process's `AirportIndex`, built from the `Airport` table on first
+    use and rebuilt after `AIRPORT_INDEX_TIMEOUT` seconds or an airport change
+    '''
+    global _index, _built_at
+
+    with _lock:
+        now = time.monotonic()
+        if _index is None or now - _built_at > settings.AIRPORT_INDEX_TIMEOUT:
+            _index = AirportIndex(
+                Airport.objects.values_list(*AIRPORT_FIELDS).iterator()
+            )
+            _built_at = now
+        return _index
+
+
+def reset_airport_index():
+    '''Rebuild the index on next use'''
+    global _index
+
+    with _lock:
+        _index = None
+
+
+def resolve_location(location):
+    '''Airport codes matching free text `location`'''
+    return get_airport_index().resolve(location)
+
+
+def search_airports(query, *, limit=10):
+    '''Ranked airport autocomplete for `query`'''
+    return get_airport_index().search(query, limit=limit)
@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class ReservationsConfig(AppConfig):
+    name = 'app.reservations'
+
+    def ready(self):
+        from app.reservations import signals  # noqa: F401
@@ -0,0 +1,155 @@
+import math
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+
+from .models import Airport
+
+
+# mean earth radius (IUGG)
+EARTH_RADIUS_KM = 6371.0088
+# matched airports `GeoIndex.within` expands at most
+WITHIN_MAX_CODES = 25
+
+
+def unit_vectors(latitudes, longitudes):
+    '''Points on the unit sphere (one row per point) for degree coordinates'''
+    latitudes = np.radians(np.asarray(latitudes, dtype=np.float64))
+    longitudes = np.radians(np.asarray(longitudes, dtype=np.float64))
+    cos_latitudes = np.cos(latitudes)
+    return np.column_stack((
+        cos_latitudes * np.cos(longitudes),
+        cos_latitudes * np.sin(longitudes),
+        np.sin(latitudes),
+    ))
+
+
+def _chord_km_(chords):
+    '''Great circle distance for straight line (chord) distances on the unit sphere'''
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(chords / 2, 1))
+
+
+def _radius_cosine_(radius_km):
+    '''Smallest a . b of two unit vectors at most `radius_km` apart'''
+    return math.cos(min(radius_km / EARTH_RADIUS_KM, math.pi))
+
+
+class GeoIndex(object):
+    '''
+    Airport coordinates as an `(n, 3)` array of unit vectors. A distance is
+    the chord between two vectors turned into an arc, accurate from a few
+    metres to antipodes; a query against every airport is one pass over
+    the array instead of a Python loop.
+    '''
+
+    def __init__(self, airports):
+        codes = []
+        latitudes = []
+        longitudes = []
+        for code, latitude, longitude in airports:
+            codes.append(code)
+            latitudes.append(float(latitude))
+            longitudes.append(float(longitude))
+
+        self.codes = codes
+        self.positions = {code: position for position, code in enumerate(codes)}
+        self.vectors = unit_vectors(latitudes, longitudes)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def nearest(self, latitude, longitude, *, limit=10, radius_km=None):
+        '''Up to `limit` `(code, km)` closest to a point, nearest first'''
+        point = unit_vectors([latitude], [longitude])[0]
+        # closer airports have a larger a . b (cosine of the angle), so
+        # rank on one matrix-vector product and measure the few kept
+        cosines = self.vectors.dot(point)
+        if radius_km is None:
+            positions = np.arange(len(cosines))
+        else:
+            positions = np.flatnonzero(cosines >= _radius_cosine_(radius_km))
+
+        if len(positions) > limit:
+            positions = positions[
+                np.argpartition(-cosines[positions], limit - 1)[:limit]]
+        positions = positions[np.argsort(-cosines[positions], kind='stable')]
+        distances = _chord_km_(
+            np.sqrt(((self.vectors[positions] - point) ** 2).sum(axis=1)))
+        return [
+            (self.codes[position], distance)
+            for position, distance in zip(positions.tolist(), distances.tolist())
+        ]
+
+    def within(self, codes, radius_km, *, max_codes=WITHIN_MAX_CODES):
+        '''
+        `codes` plus every airport within `radius_km` of one of them. A
+        match broader than `max_codes` airports is returned as is: it
+        already spans a region, and expanding it would only grow the query.
+        '''
+        positions = [self.positions[code] for code in codes if code in self.positions]
+        if not positions or len(positions) > max_codes:
+            return set(codes)
+
+        # one pass over the array per match, keeping one row of flags
+        radius_cosine = _radius_cosine_(radius_km)
+        nearby = np.zeros(len(self.codes), dtype=bool)
+        for position in positions:
+            nearby |= self.vectors.dot(self.vectors[position]) >= radius_cosine
+        return set(codes) | {
+            self.codes[position] for position in np.flatnonzero(nearby)}
+
+    def route_distances(self, routes):
+        '''
+        Kilometres of each `(departure, arrival)` code pair in one pass;
+        `None` where an airport is unknown
+        '''
+        routes = list(routes)
+        known = [
+            index for index, (origin, destination) in enumerate(routes)
+            if origin in self.positions and destination in self.positions
+        ]
+        distances = [None] * len(routes)
+        if not known:
+            return distances
+
+        origins = self.vectors[[self.positions[routes[index][0]] for index in known]]
+        destinations = self.vectors[
+            [self.positions[routes[index][1]] for index in known]]
+        kilometres = _chord_km_(
+            np.sqrt(((origins - destinations) ** 2).sum(axis=1)))
+        for index, distance in zip(known, kilometres.tolist()):
+            distances[index] = distance
+        return distances
+
+
+_lock = threading.Lock()
+_index = None
+_built_at = None
+
+
+def get_geo_index():
+    '''
+    This process's `GeoIndex`, built from the `Airport` table on first use
+    and rebuilt after `AIRPORT_INDEX_TIMEOUT` seconds or an airport change
+    '''
+    global _index, _built_at
+
+    with _lock:
+        now = time.monotonic()
+        if _index is None or now - _built_at > settings.AIRPORT_INDEX_TIMEOUT:
+            _index = GeoIndex(
+                Airport.objects.values_list(
+                    'code', 'latitude', 'longitude').iterator()
+            )
+            _built_at = now
+        return _index
+
+
+def reset_geo_index():
+    '''Rebuild the index on next use'''
+    global _index
+
+    with _lock:
+        _index = None
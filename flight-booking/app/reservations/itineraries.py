@@ -0,0 +1,291 @@
+import bisect
+import heapq
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from datetime import datetime, time as day_time, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from app.reservations import route_network
+
+from .models import Flight
+
+
+# departure/arrival are UTC timestamps (seconds)
+Leg = namedtuple(
+    'Leg',
+    'flight_id departure_airport arrival_airport departure arrival'
+)
+
+
+class DepartureIndex(object):
+    '''
+    Flights of a departure window as per route departure arrays sorted by
+    departure time (a time expanded flight graph: the flights from one
+    airport to another after a given time are one bisect away)
+    '''
+
+    def __init__(self, legs):
+        routes = {}
+        for leg in sorted(legs, key=lambda leg: leg.departure):
+            routes.setdefault(
+                (leg.departure_airport, leg.arrival_airport), []).append(leg)
+
+        self.routes = {}
+        self.route_times = {}
+        self.route_durations = {}
+        destinations_of = {}
+        origins_of = {}
+        for (origin, destination), route_legs in routes.items():
+            self.routes[origin, destination] = route_legs
+            self.route_durations[origin, destination] = min(
+                leg.arrival - leg.departure for leg in route_legs)
+            self.route_times[origin, destination] = [
+                leg.departure for leg in route_legs]
+            destinations_of.setdefault(origin, set()).add(destination)
+            origins_of.setdefault(destination, set()).add(origin)
+
+        self.shortest_departure = {}
+        for (origin, _), duration in self.route_durations.items():
+            self.shortest_departure[origin] = min(
+                duration, self.shortest_departure.get(origin, duration))
+
+        self.destinations_of = {
+            airport: frozenset(airports)
+            for airport, airports in destinations_of.items()
+        }
+        self.origins_of = {
+            airport: frozenset(airports)
+            for airport, airports in origins_of.items()
+        }
+
+    def departing(self, origin, destination, start, end):
+        '''Flights `origin` -> `destination` leaving in `[start, end)`, earliest first'''
+        times = self.route_times.get((origin, destination))
+        if not times:
+            return []
+        low = bisect.bisect_left(times, start)
+        high = bisect.bisect_left(times, end, low)
+        return self.routes[origin, destination][low:high]
+
+    def reaching(self, destinations, max_legs):
+        '''`reach[n]`: airports with a route to a destination in `n` legs or less'''
+        reach = [frozenset(destinations)]
+        frontier = set(destinations)
+        for _ in range(max_legs):
+            frontier = {
+                origin
+                for airport in frontier
+                for origin in self.origins_of.get(airport, ())
+            } - reach[-1]
+            reach.append(reach[-1] | frontier)
+        return reach
+
+    def search(self, origins, destinations, *, start, end, max_legs, limit,
+               connection_time, max_layover):
+        '''
+        Up to `limit` itineraries (lists of `Leg`) from `origins` departing
+        in `[start, end)` to `destinations` in at most `max_legs` flights.
+        Connections need `connection_time(airport)` seconds on the ground
+        and at most `max_layover` seconds; no airport is visited twice.
+        Ranked by arrival, then fewer legs, then later departure.
+
+        A* over partial itineraries: each is keyed by its arrival plus a
+        lower bound of the onward trip (connection time and fastest flights,
+        no waiting), so complete itineraries come out in arrival order and
+        the search stops after `limit` of them. Only airports that can still
+        reach a destination in the legs left are tried, and each airport is
+        expanded at most `limit` times per leg count.
+        '''
+        destinations = frozenset(destinations)
+        reach = self.reaching(destinations, max_legs)
+        shortest_last_leg = min(
+            (
+                self.route_durations[origin, destination]
+                for destination in destinations
+                for origin in self.origins_of.get(destination, ())
+            ),
+            default=0
+        )
+        onward = {}
+
+        def shortest_onward(airport, legs_left):
+            '''Lower bound of the flying time from `airport` to a destination'''
+            key = (airport, legs_left)
+            if key not in onward:
+                best = float('inf')
+                for destination in destinations:
+                    best = min(best, self.route_durations.get(
+                        (airport, destination), best))
+                if legs_left > 1:
+                    best = min(
+                        best,
+                        self.shortest_departure[airport] + shortest_last_leg
+                    )
+                onward[key] = best
+            return onward[key]
+
+        # entries hold either a flight taken (`taken`, its path ends with it)
+        # or the next flight of a route (`legs[index]`) keyed by a bound that
+        # holds for it and every later flight of that route
+        queue = []
+        order = 0
+
+        def push_route(path, visited, legs, index, bound):
+            nonlocal order
+            if index < len(legs):
+                leg = legs[index]
+                order += 1
+                heapq.heappush(queue, (
+                    leg.departure + bound + self.route_durations[
+                        leg.departure_airport, leg.arrival_airport],
+                    order, path, visited, legs, index, bound, None
+                ))
+
+        def push_onward(path, airport, ready, until, visited):
+            legs_left = max_legs - len(path) - 1
+            next_airports = self.destinations_of.get(airport, frozenset())
+            for next_airport in (next_airports & reach[legs_left]) - visited:
+                bound = 0
+                if next_airport not in destinations:
+                    bound = connection_time(next_airport) + \
+                        shortest_onward(next_airport, legs_left)
+                legs = self.departing(airport, next_airport, ready, until)
+                push_route(path, visited, legs, 0, bound)
+
+        for origin in origins:
+            if origin in reach[max_legs]:
+                push_onward([], origin, start, end, {origin})
+
+        found = []
+        expanded = {}
+        while queue and len(found) < limit:
+            _, _, path, visited, legs, index, bound, taken = \
+                heapq.heappop(queue)
+            if taken is None:
+                leg = legs[index]
+                order += 1
+                heapq.heappush(queue, (
+                    leg.arrival + bound, order,
+                    path + [leg], visited | {leg.arrival_airport},
+                    None, None, None, leg
+                ))
+                push_route(path, visited, legs, index + 1, bound)
+                continue
+
+            airport = taken.arrival_airport
+            if airport in destinations:
+                found.append(path)
+                continue
+
+            expanded_key = (airport, len(path))
+            if expanded.get(expanded_key, 0) >= limit:
+                continue
+            expanded[expanded_key] = expanded.get(expanded_key, 0) + 1
+
+            ready = taken.arrival + connection_time(airport)
+            push_onward(path, airport, ready, ready + max_layover, visited)
+
+        return sorted(
+            found,
+            key=lambda path: (
+                path[-1].arrival, len(path), -path[0].departure)
+        )
+
+
+def _connection_time_(airport):
+    minutes = settings.MINIMUM_CONNECTION_MINUTES_BY_AIRPORT.get(
+        airport, settings.MINIMUM_CONNECTION_MINUTES)
+    return minutes * 60
+
+
+_lock = threading.Lock()
+# (start, end) -> (built at, index), least recently used first
+_indexes = OrderedDict()
+
+
+def get_departure_index(start, end):
+    '''
+    `DepartureIndex` for flights departing in `[start, end)`, kept per
+    window for `ITINERARY_INDEX_TIMEOUT` seconds; at most
+    `ITINERARY_INDEX_CACHE_SIZE` windows are kept, least recently used
+    dropped first
+    '''
+    key = (start, end)
+    now = time.monotonic()
+    with _lock:
+        for cached_key, (built_at, _) in list(_indexes.items()):
+            if now - built_at > settings.ITINERARY_INDEX_TIMEOUT:
+                del _indexes[cached_key]
+        if key in _indexes:
+            _indexes.move_to_end(key)
+            return _indexes[key][1]
+
+    flights = Flight.objects.filter(
+        expected_departure__gte=start,
+        expected_departure__lt=end
+    ).values_list(
+        'id',
+        'departure_airport_id',
+        'arrival_airport_id',
+        'expected_departure',
+        'expected_arrival'
+    )
+    index = DepartureIndex(
+        Leg(
+            flight_id,
+            departure_airport,
+            arrival_airport,
+            expected_departure.timestamp(),
+            expected_arrival.timestamp()
+        )
+        for (flight_id, departure_airport, arrival_airport,
+             expected_departure, expected_arrival) in flights.iterator()
+    )
+
+    with _lock:
+        _indexes[key] = (now, index)
+        _indexes.move_to_end(key)
+        while len(_indexes) > settings.ITINERARY_INDEX_CACHE_SIZE:
+            _indexes.popitem(last=False)
+    return index
+
+
+def search_itineraries(origins, destinations, departure_date, *,
+                       max_legs=3, limit=5):
+    '''
+    Itineraries (lists of `Leg`) leaving `origins` on UTC `departure_date`
+    for `destinations`, direct or connecting
+    '''
+    # no route between them, skip loading the day's flights
+    if not route_network.get_route_network().connects(
+            origins, destinations, max_legs):
+        return []
+
+    max_layover = settings.MAXIMUM_CONNECTION_HOURS * 60 * 60
+    day_start = datetime.combine(
+        departure_date, day_time.min).replace(tzinfo=timezone.utc)
+    window_end = day_start + timedelta(
+        days=1, seconds=max_layover * (max_legs - 1))
+
+    index = get_departure_index(day_start, window_end)
+    start = max(day_start, timezone.now())
+
+    return index.search(
+        origins,
+        destinations,
+        start=start.timestamp(),
+        end=(day_start + timedelta(days=1)).timestamp(),
+        max_legs=max_legs,
+        limit=limit,
+        connection_time=_connection_time_,
+        max_layover=max_layover
+    )
+
+
+def clear_departure_indexes():
+    '''Forget cached departure windows (rebuilt on next search)'''
+    with _lock:
+        _indexes.clear()
@@ -0,0 +1,93 @@
+import json
+import os
+import random
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from app.reservations.airport_index import AirportIndex
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+class Command(BaseCommand):
+    help = ('Build the airport search index over the full airports.json '
+            'catalog and time autocomplete queries (no database needed).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queries', type=int, default=20000)
+        parser.add_argument('--limit', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def _load_catalog_(self):
+        data_location = os.path.join(
+            settings.BASE_DIR,
+            'app/reservations/files/airports.json'
+        )
+        with open(data_location, encoding='utf-8') as file:
+            airports = json.load(file)
+        return [
+            (
+                airport.get('code'),
+                airport.get('icao') or '',
+                airport.get('name') or '',
+                airport.get('city') or '',
+                airport.get('country') or '',
+                _to_int(airport.get('direct_flights')),
+                _to_int(airport.get('carriers')),
+            )
+            for airport in airports
+        ]
+
+    def _make_queries_(self, catalog, count, seed):
+        '''What users type: code, icao and growing prefixes of city/name'''
+        generator = random.Random(seed)
+        queries = []
+        while len(queries) < count:
+            code, icao, name, city, *_ = generator.choice(catalog)
+            text = generator.choice((code, icao or code, city, name))
+            queries.append(text[:generator.randint(1, max(1, len(text)))])
+        return queries
+
+    def _run_(self, index, queries, limit):
+        latencies = []
+        started = time.perf_counter()
+        for query in queries:
+            start = time.perf_counter()
+            index.search(query, limit=limit)
+            latencies.append(time.perf_counter() - start)
+        elapsed = time.perf_counter() - started
+        latencies.sort()
+        return (
+            len(queries) / elapsed,
+            latencies[len(latencies) // 2] * 1e6,
+            latencies[int(len(latencies) * 0.99) - 1] * 1e6,
+            latencies[-1] * 1e6,
+        )
+
+    def handle(self, *args, **options):
+        catalog = self._load_catalog_()
+
+        started = time.perf_counter()
+        index = AirportIndex(catalog)
+        self.stdout.write('airports: {} words: {} build: {:.1f}ms'.format(
+            len(index.airports),
+            len(index.words),
+            (time.perf_counter() - started) * 1000))
+
+        queries = self._make_queries_(
+            catalog, options['queries'], options['seed'])
+
+        for label in ('first pass', 'second pass'):
+            queries_per_second, p50, p99, worst = self._run_(
+                index, queries, options['limit'])
+            self.stdout.write(
+                '{}: {:.0f} queries/s p50: {:.1f}us p99: {:.1f}us '
+                'max: {:.1f}us'.format(
+                    label, queries_per_second, p50, p99, worst))
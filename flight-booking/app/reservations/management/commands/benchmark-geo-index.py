@@ -0,0 +1,87 @@
+import json
+import os
+import random
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from app.reservations.geo_index import GeoIndex
+
+
+class Command(BaseCommand):
+    help = ('Build the airport geo index over the full airports.json catalog '
+            'and time distance queries (no database needed).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queries', type=int, default=5000)
+        parser.add_argument('--limit', type=int, default=10)
+        parser.add_argument('--radius-km', type=float, default=100)
+        parser.add_argument('--batch-size', type=int, default=25)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def _load_catalog_(self):
+        data_location = os.path.join(
+            settings.BASE_DIR,
+            'app/reservations/files/airports.json'
+        )
+        with open(data_location, encoding='utf-8') as file:
+            airports = json.load(file)
+
+        catalog = []
+        for airport in airports:
+            try:
+                catalog.append((
+                    airport['code'],
+                    float(airport['lat']),
+                    float(airport['lon'])
+                ))
+            except (KeyError, TypeError, ValueError):
+                continue
+        return catalog
+
+    def _time_(self, label, queries, run):
+        started = time.perf_counter()
+        for query in queries:
+            run(query)
+        elapsed = time.perf_counter() - started
+        self.stdout.write('{}: {:.0f} queries/s {:.1f}us/query'.format(
+            label, len(queries) / elapsed, elapsed / len(queries) * 1e6))
+
+    def handle(self, *args, **options):
+        catalog = self._load_catalog_()
+        generator = random.Random(options['seed'])
+
+        started = time.perf_counter()
+        index = GeoIndex(catalog)
+        self.stdout.write('airports: {} build: {:.1f}ms'.format(
+            len(index), (time.perf_counter() - started) * 1000))
+
+        points = [
+            (generator.uniform(-60, 70), generator.uniform(-180, 180))
+            for _ in range(options['queries'])
+        ]
+        self._time_('nearest', points, lambda point: index.nearest(
+            *point, limit=options['limit']))
+        self._time_('nearest within radius', points, lambda point: index.nearest(
+            *point, limit=options['limit'], radius_km=options['radius_km']))
+
+        codes = [
+            [generator.choice(index.codes)]
+            for _ in range(options['queries'])
+        ]
+        self._time_('alternate airports', codes, lambda airport_codes: index.within(
+            airport_codes, options['radius_km']))
+
+        batches = [
+            [
+                (generator.choice(index.codes), generator.choice(index.codes))
+                for _ in range(options['batch_size'])
+            ]
+            for _ in range(options['queries'])
+        ]
+        self._time_(
+            'route distances (batches of {})'.format(options['batch_size']),
+            batches,
+            index.route_distances
+        )
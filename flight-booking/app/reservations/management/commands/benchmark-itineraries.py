@@ -0,0 +1,98 @@
+import json
+import os
+import random
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from app.reservations.itineraries import DepartureIndex, Leg
+
+HOUR = 60 * 60
+
+
+class Command(BaseCommand):
+    help = ('Build a departure index over a synthetic day of flights between '
+            'the airports.json catalog and time itinerary searches (no '
+            'database needed).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--flights', type=int, default=100000)
+        parser.add_argument('--queries', type=int, default=200)
+        parser.add_argument('--max-stops', type=int, default=2)
+        parser.add_argument('--limit', type=int, default=5)
+        parser.add_argument('--hubs', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def _load_codes_(self):
+        data_location = os.path.join(
+            settings.BASE_DIR,
+            'app/reservations/files/airports.json'
+        )
+        with open(data_location, encoding='utf-8') as file:
+            airports = json.load(file)
+        # busiest first, so the first codes are the hubs
+        airports.sort(
+            key=lambda airport: -int(airport.get('direct_flights') or 0))
+        return [airport['code'] for airport in airports if airport.get('code')]
+
+    def _time_(self, label, queries, run):
+        timings = []
+        for query in queries:
+            started = time.perf_counter()
+            run(query)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        self.stdout.write('{}: median {:.1f}ms p95 {:.1f}ms max {:.1f}ms'.format(
+            label,
+            timings[len(timings) // 2],
+            timings[int(len(timings) * 0.95)],
+            timings[-1]
+        ))
+
+    def handle(self, *args, **options):
+        codes = self._load_codes_()
+        hubs = codes[:options['hubs']]
+        generator = random.Random(options['seed'])
+
+        # most flights touch a hub, like real networks
+        legs = []
+        for flight_id in range(options['flights']):
+            origin = generator.choice(
+                hubs if generator.random() < 0.5 else codes)
+            destination = generator.choice(hubs)
+            if generator.random() < 0.5:
+                origin, destination = destination, origin
+            if origin == destination:
+                continue
+            departure = generator.uniform(0, 36 * HOUR)
+            legs.append(Leg(
+                flight_id, origin, destination,
+                departure, departure + generator.uniform(HOUR, 12 * HOUR)))
+
+        started = time.perf_counter()
+        index = DepartureIndex(legs)
+        self.stdout.write('flights: {} airports: {} build: {:.0f}ms'.format(
+            len(legs), len(codes), (time.perf_counter() - started) * 1000))
+
+        def search(pair):
+            return index.search(
+                [pair[0]], [pair[1]],
+                start=0,
+                end=24 * HOUR,
+                max_legs=options['max_stops'] + 1,
+                limit=options['limit'],
+                connection_time=lambda airport: 45 * 60,
+                max_layover=settings.MAXIMUM_CONNECTION_HOURS * HOUR
+            )
+
+        pairs = [
+            (generator.choice(codes), generator.choice(codes))
+            for _ in range(options['queries'])
+        ]
+        self._time_('any pair', pairs, search)
+        hub_pairs = [
+            tuple(generator.sample(hubs, 2))
+            for _ in range(options['queries'])
+        ]
+        self._time_('hub to hub', hub_pairs, search)
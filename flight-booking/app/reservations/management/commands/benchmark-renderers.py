@@ -0,0 +1,43 @@
+import time
+
+from django.core.management import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from app.helpers.renderers import FastJSONRenderer
+from app.helpers.response import Response
+from app.reservations.models import Reservation
+from app.reservations.serializers import ReservationReadSerializer
+
+
+class Command(BaseCommand):
+    help = ('Time rendering one page of reservations (in the response '
+            'envelope) with the stdlib and orjson JSON renderers.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def _time_(self, label, renderer, data, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            content = renderer.render(data)
+        elapsed = time.perf_counter() - started
+        self.stdout.write('{}: {:.2f}ms/page ({} bytes)'.format(
+            label, elapsed / repeat * 1000, len(content)))
+        return content
+
+    def handle(self, *args, **options):
+        reservations = Reservation.objects.select_related(
+            *ReservationReadSerializer.Meta.select_related
+        ).order_by('id')[:options['rows']]
+        data = Response({
+            'count': len(reservations),
+            'results': ReservationReadSerializer(reservations, many=True).data
+        }).data
+        self.stdout.write('reservations: {}'.format(len(reservations)))
+
+        stdlib = self._time_(
+            'JSONRenderer', JSONRenderer(), data, options['repeat'])
+        fast = self._time_(
+            'FastJSONRenderer', FastJSONRenderer(), data, options['repeat'])
+        self.stdout.write('same output: {}'.format(stdlib == fast))
@@ -0,0 +1,105 @@
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from app.accounts.models import Accounts
+from app.helpers import utils
+from app.reservations.models import (
+    Airline,
+    Airport,
+    Flight,
+    Reservation,
+    SeatInventory
+)
+from app.reservations.serializers import ReservationSerializer
+
+
+class Command(BaseCommand):
+    help = ('Book one hot flight from many concurrent workers and check it is '
+            'never oversold (run against PostgreSQL).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bookings', type=int, default=500)
+        parser.add_argument('--capacity', type=int, default=200)
+        parser.add_argument('--workers', type=int, default=50)
+
+    def _book_(self, account_id, flight_id):
+        start = time.perf_counter()
+        try:
+            serializer = ReservationSerializer(data={
+                'author': account_id,
+                'first_flight': flight_id,
+                'flight_class': Reservation.ECONOMY_CLASS,
+                'ticket_type': Reservation.ONE_WAY,
+            })
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+            booked = True
+        except utils.FieldErrorExceptions:
+            booked = False
+        finally:
+            connection.close()
+        return booked, time.perf_counter() - start
+
+    def handle(self, *args, **options):
+        user = User.objects.create(
+            username='seat-benchmark-{}'.format(uuid.uuid4().hex[:8]))
+        account = Accounts.objects.create(user=user)
+        flight = Flight(
+            airline=Airline.objects.order_by('code').first(),
+            departure_airport=Airport.objects.get(code='LHR'),
+            arrival_airport=Airport.objects.get(code='JFK'),
+            expected_departure=timezone.now() + timedelta(days=1),
+            expected_arrival=timezone.now() + timedelta(days=1, hours=8),
+            flight_number=uuid.uuid4().hex[:4],
+        )
+        flight.save()
+        SeatInventory.objects.create(
+            flight=flight,
+            flight_class=Reservation.ECONOMY_CLASS,
+            capacity=options['capacity'],
+            remaining=options['capacity']
+        )
+
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+                results = list(pool.map(
+                    lambda _: self._book_(account.id, flight.id),
+                    range(options['bookings'])
+                ))
+            elapsed = time.perf_counter() - started
+
+            booked = sum(1 for is_booked, _ in results if is_booked)
+            latencies = sorted(latency for _, latency in results)
+            reservations = Reservation.objects.filter(
+                first_flight=flight).count()
+            remaining = SeatInventory.objects.get(flight=flight).remaining
+
+            self.stdout.write(
+                'bookings: {} workers: {} capacity: {}'.format(
+                    options['bookings'], options['workers'],
+                    options['capacity']))
+            self.stdout.write(
+                'booked: {} rejected: {} reservations: {} remaining: {}'.format(
+                    booked, len(results) - booked, reservations, remaining))
+            self.stdout.write(
+                'total: {:.2f}s p50: {:.1f}ms p99: {:.1f}ms'.format(
+                    elapsed,
+                    latencies[len(latencies) // 2] * 1000,
+                    latencies[int(len(latencies) * 0.99) - 1] * 1000))
+
+            if reservations > options['capacity'] or \
+                    reservations + remaining != options['capacity']:
+                self.stderr.write('OVERSOLD')
+            else:
+                self.stdout.write('No oversell.')
+        finally:
+            flight.delete()
+            user.delete()
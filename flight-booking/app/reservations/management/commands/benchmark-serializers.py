@@ -0,0 +1,49 @@
+import time
+
+from django.core.management import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from app.reservations.models import Flight, Reservation
+from app.reservations.serializers import (
+    FlightReadSerializer,
+    FlightSerializer,
+    ReservationReadSerializer,
+    ReservationSerializer
+)
+
+
+class Command(BaseCommand):
+    help = ('Time the list serializers against their read only fast paths '
+            'on rows already in the database (rows are loaded once).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def _time_(self, label, serializer, rows, repeat):
+        renderer = JSONRenderer()
+        started = time.perf_counter()
+        for _ in range(repeat):
+            renderer.render(serializer(rows, many=True).data)
+        elapsed = time.perf_counter() - started
+        self.stdout.write('{}: {:.0f} rows/s'.format(
+            label, len(rows) * repeat / elapsed))
+
+    def handle(self, *args, **options):
+        flights = list(Flight.objects.all()[:options['rows']])
+        reservations = list(Reservation.objects.select_related(
+            *ReservationReadSerializer.Meta.select_related
+        )[:options['rows']])
+        self.stdout.write('flights: {} reservations: {}'.format(
+            len(flights), len(reservations)))
+
+        if flights:
+            self._time_('FlightSerializer', FlightSerializer,
+                        flights, options['repeat'])
+            self._time_('FlightReadSerializer', FlightReadSerializer,
+                        flights, options['repeat'])
+        if reservations:
+            self._time_('ReservationSerializer', ReservationSerializer,
+                        reservations, options['repeat'])
+            self._time_('ReservationReadSerializer', ReservationReadSerializer,
+                        reservations, options['repeat'])
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from app.reservations.route_network import RouteNetwork, scheduled_routes
+
+
+class Command(BaseCommand):
+    help = ('Write the route network of upcoming flights and schedules to a '
+            'file (ROUTE_NETWORK_FILE by default) to be memory mapped.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=settings.ROUTE_NETWORK_FILE)
+
+    def handle(self, *args, **options):
+        if not options['output']:
+            raise CommandError('Set ROUTE_NETWORK_FILE or pass --output.')
+
+        network = RouteNetwork.from_routes(scheduled_routes())
+        network.save(options['output'])
+        self.stdout.write('airports: {} routes: {} written to {}'.format(
+            len(network), len(network.targets), options['output']))
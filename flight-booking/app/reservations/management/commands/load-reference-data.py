@@ -0,0 +1,51 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from app.reservations import reference_loader
+
+
+def _data_file_(name):
+    return os.path.join(settings.BASE_DIR, 'app/reservations/files', name)
+
+
+class Command(BaseCommand):
+    help = ('Insert or update airports and airlines from their JSON files; '
+            'unchanged rows are not written, so it is safe to run on deploy.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--airports', default=_data_file_('airports.json'),
+            help='airports.json style file ("" to skip)')
+        parser.add_argument(
+            '--airlines', default=_data_file_('airlines.json'),
+            help='airlines.json style file ("" to skip)')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def _load_(self, label, path, load, batch_size):
+        started = time.perf_counter()
+        with open(path, encoding='utf-8') as file:
+            counts = load(file, batch_size=batch_size)
+        self.stdout.write(
+            '{}: {} created, {} updated, {} unchanged, {} skipped '
+            'in {:.2f}s'.format(
+                label,
+                counts[reference_loader.CREATED],
+                counts[reference_loader.UPDATED],
+                counts[reference_loader.UNCHANGED],
+                counts[reference_loader.SKIPPED],
+                time.perf_counter() - started
+            )
+        )
+
+    def handle(self, *args, **options):
+        if options['airports']:
+            self._load_(
+                'airports', options['airports'],
+                reference_loader.load_airports, options['batch_size'])
+        if options['airlines']:
+            self._load_(
+                'airlines', options['airlines'],
+                reference_loader.load_airlines, options['batch_size'])
@@ -0,0 +1,53 @@
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def populate_departure_date(apps, schema_editor):
+    Flight = apps.get_model('reservations', 'Flight')
+    db_alias = schema_editor.connection.alias
+
+    flights = Flight.objects.using(db_alias).only('id', 'expected_departure')
+    for flight in flights.iterator():
+        departure = flight.expected_departure
+        if timezone.is_aware(departure):
+            departure = departure.astimezone(timezone.utc)
+
+        Flight.objects.using(db_alias).filter(pk=flight.pk).update(
+            departure_date=departure.date()
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0005_auto_20190124_1612'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='flight',
+            name='departure_date',
+            field=models.DateField(editable=False, null=True),
+        ),
+        migrations.RunPython(
+            populate_departure_date,
+            migrations.RunPython.noop
+        ),
+        migrations.AlterField(
+            model_name='flight',
+            name='departure_date',
+            field=models.DateField(editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='flight',
+            index=models.Index(fields=['airline', 'flight_number', 'departure_date'], name='flight_designation_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flight',
+            index=models.Index(fields=['departure_airport', 'expected_departure'], name='flight_departure_airport_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flight',
+            index=models.Index(fields=['arrival_airport', 'expected_departure'], name='flight_arrival_airport_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0006_flight_departure_date'),
+    ]
+
+    operations = [
+        # superseded by the unique constraint's own index
+        migrations.RemoveIndex(
+            model_name='flight',
+            name='flight_designation_date_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='flight',
+            constraint=models.UniqueConstraint(fields=('airline', 'flight_number', 'departure_date'), name='unique_flight_designation_date'),
+        ),
+    ]
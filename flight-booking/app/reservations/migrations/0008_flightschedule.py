@@ -0,0 +1,38 @@
+# Generated by Django 2.2.24 on 2026-10-18 19:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0007_flight_unique_designation_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FlightSchedule',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('flight_number', models.CharField(max_length=4)),
+                ('time_of_flight', models.TimeField()),
+                ('flight_duration', models.DurationField()),
+                ('days_of_week', models.PositiveSmallIntegerField()),
+                ('valid_from', models.DateField()),
+                ('valid_until', models.DateField()),
+                ('excluded_dates', models.TextField(blank=True, default='')),
+                ('materialized_until', models.DateField(blank=True, null=True)),
+                ('airline', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='flightschedule_airline', to='reservations.Airline')),
+                ('arrival_airport', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='flightschedule_arrival_schedule', to='reservations.Airport')),
+                ('departure_airport', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='flightschedule_departure_schedule', to='reservations.Airport')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='flightschedule',
+            index=models.Index(fields=['valid_until', 'materialized_until'], name='flight_schedule_horizon_idx'),
+        ),
+    ]
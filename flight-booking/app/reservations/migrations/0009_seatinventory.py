@@ -0,0 +1,27 @@
+# Generated by Django 2.2.24 on 2026-10-18 19:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0008_flightschedule'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeatInventory',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('flight_class', models.IntegerField(choices=[(0, 'First Class'), (1, 'Business Class'), (2, 'Economy Class')])),
+                ('capacity', models.PositiveIntegerField()),
+                ('remaining', models.PositiveIntegerField()),
+                ('flight', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seatinventory_flight', to='reservations.Flight')),
+            ],
+            options={
+                'unique_together': {('flight', 'flight_class')},
+            },
+        ),
+    ]
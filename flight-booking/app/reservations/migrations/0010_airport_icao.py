@@ -0,0 +1,41 @@
+import os
+import json
+from django.conf import settings
+from django.db import migrations, models
+
+
+def load_airport_icao(apps, schema_editor):
+    Airport = apps.get_model('reservations', 'Airport')
+    db_alias = schema_editor.connection.alias
+
+    data_location = os.path.join(
+        settings.BASE_DIR,
+        'app/reservations/files/airports.json'
+    )
+    with open(data_location, encoding='utf-8') as file:
+        airports = json.load(file)
+
+    for airport in airports:
+        if airport.get('icao'):
+            Airport.objects.using(db_alias).filter(
+                code=airport.get('code')
+            ).update(icao=airport.get('icao'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0009_seatinventory'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='airport',
+            name='icao',
+            field=models.CharField(blank=True, default='', max_length=4),
+        ),
+        migrations.RunPython(
+            load_airport_icao,
+            migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,55 @@
+import os
+import json
+from django.conf import settings
+from django.db import migrations, models
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def load_airport_traffic(apps, schema_editor):
+    Airport = apps.get_model('reservations', 'Airport')
+    db_alias = schema_editor.connection.alias
+
+    data_location = os.path.join(
+        settings.BASE_DIR,
+        'app/reservations/files/airports.json'
+    )
+    with open(data_location, encoding='utf-8') as file:
+        airports = json.load(file)
+
+    for airport in airports:
+        direct_flights = _to_int(airport.get('direct_flights'))
+        carriers = _to_int(airport.get('carriers'))
+        if direct_flights or carriers:
+            Airport.objects.using(db_alias).filter(
+                code=airport.get('code')
+            ).update(direct_flights=direct_flights, carriers=carriers)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0010_airport_icao'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='airport',
+            name='carriers',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='airport',
+            name='direct_flights',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(
+            load_airport_traffic,
+            migrations.RunPython.noop
+        ),
+    ]
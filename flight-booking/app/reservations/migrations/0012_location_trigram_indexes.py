@@ -0,0 +1,47 @@
+from django.db import migrations
+
+# (index, table, indexed expression) - expressions match the SQL Django
+# generates on PostgreSQL: `icontains` for airports, `contains` for airlines
+TRIGRAM_INDEXES = (
+    ('airport_city_trgm_idx', 'reservations_airport', 'UPPER(city::text)'),
+    ('airport_country_trgm_idx', 'reservations_airport',
+     'UPPER(country::text)'),
+    ('airport_name_trgm_idx', 'reservations_airport',
+     'UPPER(airport_name::text)'),
+    ('airline_code_trgm_idx', 'reservations_airline', 'code::text'),
+    ('airline_name_trgm_idx', 'reservations_airline', 'airline_name::text'),
+)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, expression in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS {} ON {} '
+            'USING gin (({}) gin_trgm_ops)'.format(name, table, expression)
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    for name, _, _ in TRIGRAM_INDEXES:
+        schema_editor.execute('DROP INDEX IF EXISTS {}'.format(name))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0011_airport_traffic'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            create_trigram_indexes,
+            drop_trigram_indexes
+        ),
+    ]
@@ -0,0 +1,129 @@
+import os
+import json
+from datetime import timedelta
+
+import pytz
+from django.conf import settings
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+
+def _get_timezone(name):
+    try:
+        return pytz.timezone(name or 'UTC')
+    except pytz.UnknownTimeZoneError:
+        return pytz.utc
+
+
+def load_airport_timezones(apps, schema_editor):
+    Airport = apps.get_model('reservations', 'Airport')
+    db_alias = schema_editor.connection.alias
+
+    data_location = os.path.join(
+        settings.BASE_DIR,
+        'app/reservations/files/airports.json'
+    )
+    with open(data_location, encoding='utf-8') as file:
+        airports = json.load(file)
+
+    for airport in airports:
+        if airport.get('tz'):
+            Airport.objects.using(db_alias).filter(
+                code=airport.get('code')
+            ).update(timezone=airport.get('tz'))
+
+
+def populate_local_times(apps, schema_editor):
+    Airport = apps.get_model('reservations', 'Airport')
+    Flight = apps.get_model('reservations', 'Flight')
+    db_alias = schema_editor.connection.alias
+
+    timezones = {
+        code: _get_timezone(name)
+        for code, name in Airport.objects.using(db_alias).values_list(
+            'code', 'timezone')
+    }
+
+    def local_time(moment, code):
+        local = moment.astimezone(timezones.get(code, pytz.utc))
+        return local.date(), local.utcoffset() // timedelta(minutes=1)
+
+    flights = Flight.objects.using(db_alias).only(
+        'id', 'expected_departure', 'expected_arrival',
+        'departure_airport', 'arrival_airport'
+    )
+    batch = []
+    for flight in flights.iterator():
+        flight.departure_local_date, flight.departure_utc_offset = local_time(
+            flight.expected_departure, flight.departure_airport_id)
+        flight.arrival_local_date, flight.arrival_utc_offset = local_time(
+            flight.expected_arrival, flight.arrival_airport_id)
+        batch.append(flight)
+        if len(batch) >= BATCH_SIZE:
+            Flight.objects.using(db_alias).bulk_update(batch, [
+                'departure_local_date', 'departure_utc_offset',
+                'arrival_local_date', 'arrival_utc_offset'
+            ])
+            batch = []
+    Flight.objects.using(db_alias).bulk_update(batch, [
+        'departure_local_date', 'departure_utc_offset',
+        'arrival_local_date', 'arrival_utc_offset'
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0012_location_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='airport',
+            name='timezone',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.RunPython(
+            load_airport_timezones,
+            migrations.RunPython.noop
+        ),
+        migrations.AddField(
+            model_name='flight',
+            name='departure_local_date',
+            field=models.DateField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='flight',
+            name='arrival_local_date',
+            field=models.DateField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='flight',
+            name='departure_utc_offset',
+            field=models.SmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='flight',
+            name='arrival_utc_offset',
+            field=models.SmallIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(
+            populate_local_times,
+            migrations.RunPython.noop
+        ),
+        migrations.AlterField(
+            model_name='flight',
+            name='departure_local_date',
+            field=models.DateField(editable=False),
+        ),
+        migrations.AlterField(
+            model_name='flight',
+            name='arrival_local_date',
+            field=models.DateField(editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='flight',
+            index=models.Index(fields=['departure_airport', 'departure_local_date'], name='flight_departure_local_idx'),
+        ),
+    ]
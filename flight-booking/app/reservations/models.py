@@ -1,6 +1,10 @@
+import struct
 import uuid
+from datetime import date, datetime, timedelta, timezone as fixed_timezone
 
-from django.db import models
+import pytz
+from django.db import models, transaction, IntegrityError
+from django.utils import timezone
 from app.accounts import models as user_models
 from rest_framework import (
     exceptions,
@@ -17,6 +21,18 @@ class Airport(models.Model):
     city = models.CharField(max_length=100)
     country = models.CharField(max_length=100)
     code = models.CharField(max_length=5, primary_key=True)
+    icao = models.CharField(max_length=4, blank=True, default='')
+    # traffic from airports.json, used to rank airport search results
+    direct_flights = models.PositiveIntegerField(default=0)
+    carriers = models.PositiveIntegerField(default=0)
+    # IANA time zone name (`Africa/Lagos`), blank when unknown (UTC)
+    timezone = models.CharField(max_length=64, blank=True, default='')
+
+    def get_timezone(self):
+        try:
+            return pytz.timezone(self.timezone or 'UTC')
+        except pytz.UnknownTimeZoneError:
+            return pytz.utc
 
 
 class Airline(models.Model):
@@ -33,6 +49,70 @@ class Airline(models.Model):
         )
 
 
+class FlightQuerySet(models.QuerySet):
+    '''Flight queries'''
+
+    def insert_ignore_duplicates(self, flights, *, batch_size=500):
+        '''
+        Insert flights with `INSERT ... ON CONFLICT DO NOTHING`, skipping any
+        that clash with an existing airline/flight number/departure date.
+        Returns a `(created, skipped)` tuple of flight lists.
+        '''
+        flights = list(flights)
+        for flight in flights:
+            flight.set_local_times()
+
+        self.bulk_create(
+            flights,
+            batch_size=batch_size,
+            ignore_conflicts=True
+        )
+
+        flight_ids = [flight.pk for flight in flights]
+        created_ids = set()
+        for start in range(0, len(flight_ids), batch_size):
+            created_ids.update(
+                self.model._default_manager.using(self.db).filter(
+                    pk__in=flight_ids[start:start + batch_size]
+                ).values_list('pk', flat=True)
+            )
+
+        created = []
+        skipped = []
+        for flight in flights:
+            if flight.pk in created_ids:
+                created.append(flight)
+            else:
+                flight._state.adding = True
+                skipped.append(flight)
+
+        return created, skipped
+
+    def refresh_local_times(self, *, batch_size=500):
+        '''
+        Recompute the local dates/UTC offsets of these flights, after an
+        airport's time zone changed. Returns the number of flights updated.
+        '''
+        fields = [
+            'departure_local_date', 'departure_utc_offset',
+            'arrival_local_date', 'arrival_utc_offset'
+        ]
+        manager = self.model._default_manager.using(self.db)
+        flights = self.select_related('departure_airport', 'arrival_airport')
+
+        updated = 0
+        batch = []
+        for flight in flights.iterator():
+            flight.set_local_times()
+            batch.append(flight)
+            if len(batch) >= batch_size:
+                manager.bulk_update(batch, fields)
+                updated += len(batch)
+                batch = []
+        manager.bulk_update(batch, fields)
+        return updated + len(batch)
+
+
 class Flight(models.Model):
     '''Model containing Flight data'''
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -43,6 +123,17 @@ class Flight(models.Model):
     expected_departure = models.DateTimeField()
     expected_arrival = models.DateTimeField()
 
+    # UTC date of `expected_departure`, kept in sync on save so
+    # "flights on day X" lookups can use an index instead of a cast
+    departure_date = models.DateField(editable=False)
+
+    # local calendar dates and UTC offsets (minutes) at the departure and
+    # arrival airports, set on save like `departure_date`
+    departure_local_date = models.DateField(editable=False)
+    arrival_local_date = models.DateField(editable=False)
+    departure_utc_offset = models.SmallIntegerField(default=0, editable=False)
+    arrival_utc_offset = models.SmallIntegerField(default=0, editable=False)
+
     departure = models.DateTimeField(null=True, blank=True)
     arrival = models.DateTimeField(null=True, blank=True)
 
@@ -63,8 +154,44 @@ class Flight(models.Model):
     )
     flight_number = models.CharField(max_length=4)
 
+    objects = FlightQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['airline', 'flight_number', 'departure_date'],
+                name='unique_flight_designation_date'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['departure_airport', 'expected_departure'],
+                name='flight_departure_airport_idx'
+            ),
+            models.Index(
+                fields=['arrival_airport', 'expected_departure'],
+                name='flight_arrival_airport_idx'
+            ),
+            models.Index(
+                fields=['departure_airport', 'departure_local_date'],
+                name='flight_departure_local_idx'
+            ),
+            # `?local_date=` without an airport
+            models.Index(
+                fields=['departure_local_date', 'expected_departure'],
+                name='flight_local_date_idx'
+            ),
+        ]
+
+    @staticmethod
+    def get_departure_date(expected_departure):
+        '''UTC calendar date of a departure time'''
+        if timezone.is_aware(expected_departure):
+            expected_departure = expected_departure.astimezone(timezone.utc)
+        return expected_departure.date()
+
     def get_flight_designation(self):
-        return '{}{}'.format(self.airline.code, self.flight_number)
+        return '{}{}'.format(self.airline_id, self.flight_number)
 
     def get_flight_duration(self):
         departure = self.expected_departure
@@ -77,21 +204,194 @@ class Flight(models.Model):
 
         flight_duration = arrival - departure
 
-        flight_hours, remainder = divmod(flight_duration.seconds, 3600)
-        flight_minutes, _ = divmod(remainder, 60)
+        # total_seconds: `timedelta.seconds` drops whole days
+        flight_minutes = int(flight_duration.total_seconds()) // 60
+        flight_hours, flight_minutes = divmod(flight_minutes, 60)
 
         return '{} Hour(s) {} Minute(s)'.format(flight_hours,
                                                 flight_minutes)
 
+    @staticmethod
+    def _local_time_(moment, utc_offset):
+        return moment.astimezone(
+            fixed_timezone(timedelta(minutes=utc_offset)))
+
+    def get_local_departure(self):
+        '''`expected_departure` in the departure airport's time zone'''
+        return self._local_time_(
+            self.expected_departure, self.departure_utc_offset)
+
+    def get_local_arrival(self):
+        '''`expected_arrival` in the arrival airport's time zone'''
+        return self._local_time_(
+            self.expected_arrival, self.arrival_utc_offset)
+
+    def set_local_times(self):
+        '''
+        Derive `departure_date` and the local dates/UTC offsets from the
+        expected times and the airports' time zones
+        '''
+        self.departure_date = self.get_departure_date(self.expected_departure)
+
+        departure, arrival = self.expected_departure, self.expected_arrival
+        if timezone.is_naive(departure):
+            departure = timezone.make_aware(departure, timezone.utc)
+        if timezone.is_naive(arrival):
+            arrival = timezone.make_aware(arrival, timezone.utc)
+        departure = departure.astimezone(self.departure_airport.get_timezone())
+        arrival = arrival.astimezone(self.arrival_airport.get_timezone())
+        self.departure_local_date = departure.date()
+        self.arrival_local_date = arrival.date()
+        self.departure_utc_offset = departure.utcoffset() // timedelta(minutes=1)
+        self.arrival_utc_offset = arrival.utcoffset() // timedelta(minutes=1)
+
     def save(self, *args, **kwargs):
-        created_flight = Flight.objects.filter(
+        self.set_local_times()
+
+        if not self._state.adding:
+            return super(Flight, self).save(*args, **kwargs)
+
+        # The unique constraint decides duplicates (no pre-insert lookup);
+        # a flight already scheduled for that day is silently kept
+        try:
+            with transaction.atomic(using=kwargs.get('using')):
+                super(Flight, self).save(*args, **kwargs)
+        except IntegrityError:
+            duplicate = Flight.objects.using(kwargs.get('using')).filter(
+                airline=self.airline_id,
+                flight_number=self.flight_number,
+                departure_date=self.departure_date,
+            )
+            if not duplicate.exists():
+                raise
+
+
+# departure date (ordinal) in the last bytes of an expanded flight's id
+_FLIGHT_DATE = struct.Struct('>I')
+
+
+class FlightSchedule(models.Model):
+    '''
+    Recurring flight timetable (RRULE style: weekdays, validity window and
+    excluded dates). Concrete `Flight` rows are only materialized for a
+    rolling horizon, later departures are expanded on demand.
+    '''
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    airline = models.ForeignKey(
+        Airline,
+        related_name='%(class)s_airline',
+        on_delete=models.CASCADE
+    )
+    flight_number = models.CharField(max_length=4)
+    departure_airport = models.ForeignKey(
+        Airport,
+        related_name='%(class)s_departure_schedule',
+        on_delete=models.CASCADE
+    )
+    arrival_airport = models.ForeignKey(
+        Airport,
+        related_name='%(class)s_arrival_schedule',
+        on_delete=models.CASCADE
+    )
+
+    # UTC departure time and block time of every occurrence
+    time_of_flight = models.TimeField()
+    flight_duration = models.DurationField()
+
+    # bitmask of weekdays flown, Monday is bit 0 (`date.weekday()`)
+    days_of_week = models.PositiveSmallIntegerField()
+    valid_from = models.DateField()
+    valid_until = models.DateField()
+    # comma separated ISO dates the flight does not operate
+    excluded_dates = models.TextField(default='', blank=True)
+
+    # last departure date with a concrete `Flight` row
+    materialized_until = models.DateField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['valid_until', 'materialized_until'],
+                name='flight_schedule_horizon_idx'
+            ),
+        ]
+
+    def get_days_of_week(self):
+        return [day for day in range(7) if self.days_of_week & (1 << day)]
+
+    def get_excluded_dates(self):
+        return {
+            datetime.strptime(excluded_date, '%Y-%m-%d').date()
+            for excluded_date in self.excluded_dates.split(',')
+            if excluded_date
+        }
+
+    def get_departure_dates(self, start_date, end_date):
+        '''Dates between `start_date` and `end_date` (inclusive) flown'''
+        start_date = max(start_date, self.valid_from)
+        end_date = min(end_date, self.valid_until)
+        excluded_dates = self.get_excluded_dates()
+
+        departure_date = start_date
+        while departure_date <= end_date:
+            if (self.days_of_week & (1 << departure_date.weekday()) and
+                    departure_date not in excluded_dates):
+                yield departure_date
+            departure_date += timedelta(days=1)
+
+    def flight_id(self, departure_date):
+        '''
+        Id of the occurrence on `departure_date`: the schedule id with its
+        last four bytes replaced by the date (see `parse_flight_id`)
+        '''
+        return uuid.UUID(bytes=self.id.bytes[:12] + _FLIGHT_DATE.pack(
+            departure_date.toordinal()))
+
+    @staticmethod
+    def parse_flight_id(flight_id):
+        '''
+        `((lowest, highest) schedule id, departure date)` a `flight_id`
+        may have been built from, None when it can not be one
+        '''
+        try:
+            flight_id = uuid.UUID(str(flight_id))
+            departure_date = date.fromordinal(
+                _FLIGHT_DATE.unpack(flight_id.bytes[12:])[0])
+        except (ValueError, OverflowError):
+            return None
+        prefix = flight_id.bytes[:12]
+        return (
+            (uuid.UUID(bytes=prefix + b'\0' * 4),
+             uuid.UUID(bytes=prefix + b'\xff' * 4)),
+            departure_date
+        )
+
+    def build_flight(self, departure_date):
+        '''
+        Unsaved `Flight` for the occurrence on `departure_date`.
+        The id is derived from the schedule and date so an expanded flight
+        keeps its id once materialized, and can be materialized from it.
+        '''
+        expected_departure = datetime.combine(
+            departure_date,
+            self.time_of_flight
+        ).replace(tzinfo=timezone.utc)
+
+        flight = Flight(
+            id=self.flight_id(departure_date),
             airline=self.airline,
             flight_number=self.flight_number,
-            expected_departure__contains=self.expected_departure.date(),
+            departure_airport=self.departure_airport,
+            arrival_airport=self.arrival_airport,
+            expected_departure=expected_departure,
+            expected_arrival=expected_departure + self.flight_duration,
         )
-
-        if not created_flight.exists():
-            super(Flight, self).save(*args, **kwargs)
+        flight.set_local_times()
+        return flight
 
 
 class Reservation(models.Model):
@@ -210,3 +510,36 @@ class Reservation(models.Model):
             self.return_flight = None
 
         super(Reservation, self).save(*args, **kwargs)
+
+
+class SeatInventory(models.Model):
+    '''Seats per flight and flight class'''
+    flight = models.ForeignKey(
+        Flight,
+        related_name='%(class)s_flight',
+        on_delete=models.CASCADE
+    )
+    flight_class = models.IntegerField(choices=Reservation.FLIGHT_CLASS)
+    capacity = models.PositiveIntegerField()
+    remaining = models.PositiveIntegerField()
+
+    class Meta:
+        unique_together = ('flight', 'flight_class')
+
+    @classmethod
+    def reserve_seats(cls, flights, flight_class):
+        '''
+        Take one seat of `flight_class` on each flight.
+        Every seat is a single conditional `UPDATE ... WHERE remaining > 0`
+        so concurrent bookings can never oversell; flights are locked in pk
+        order to avoid deadlocks. Flights without inventory are not capacity
+        limited. Must run inside a transaction.
+        '''
+        for flight in sorted(flights, key=lambda flight: str(flight.pk)):
+            seats = cls.objects.filter(flight=flight, flight_class=flight_class)
+            reserved = seats.filter(remaining__gt=0).update(
+                remaining=models.F('remaining') - 1
+            )
+            if not reserved and seats.exists():
+                return flight
+        return None
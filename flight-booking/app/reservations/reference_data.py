@@ -0,0 +1,91 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+class _LocalCache_(object):
+    '''Thread safe, size bounded LRU whose entries expire'''
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (
+                time.monotonic() + settings.REFERENCE_CACHE_LOCAL_TIMEOUT,
+                value
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > settings.REFERENCE_CACHE_LOCAL_SIZE:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_local_cache = _LocalCache_()
+
+
+def _cache_key_(model, pk):
+    return 'reference-data:{}:{}'.format(model._meta.label_lower, pk)
+
+
+def get_representation(serializer_class, pk):
+    '''
+    Serialized `serializer_class` representation of the row `pk`, read
+    through the process LRU, then the shared cache, then the database.
+    One representation is kept per model, so use the model's default
+    serializer (`AirportSerializer`, `AirlineSerializer`).
+    '''
+    model = serializer_class.Meta.model
+    key = _cache_key_(model, pk)
+
+    representation = _local_cache.get(key)
+    if representation is None:
+        representation = cache.get(key)
+        if representation is None:
+            instance = model.objects.filter(pk=pk).first()
+            if instance is None:
+                return None
+            representation = dict(serializer_class(instance).data)
+            cache.set(key, representation, settings.REFERENCE_CACHE_TIMEOUT)
+        _local_cache.set(key, representation)
+
+    return dict(representation)
+
+
+def invalidate(model, pk):
+    '''
+    Forget the cached representation of a changed or deleted row.
+    Other processes see the change once their LRU entry expires
+    (`REFERENCE_CACHE_LOCAL_TIMEOUT`).
+    '''
+    key = _cache_key_(model, pk)
+    _local_cache.delete(key)
+    cache.delete(key)
+
+
+def clear_local_cache():
+    '''Empty this process's LRU (the shared cache is left alone)'''
+    _local_cache.clear()
@@ -0,0 +1,186 @@
+from collections import Counter
+from decimal import Decimal, InvalidOperation
+
+from django.db import models, transaction
+from django.db.backends.utils import format_number
+
+from app.helpers.json_stream import iter_json
+from app.reservations import airport_index, geo_index, reference_data
+
+from .models import Airline, Airport, Flight
+
+
+CREATED = 'created'
+UPDATED = 'updated'
+UNCHANGED = 'unchanged'
+SKIPPED = 'skipped'
+
+# rows per UPDATE: bulk_update writes one CASE WHEN per row and field,
+# which gets slower per row as the statement grows
+_UPDATE_BATCH_SIZE = 100
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _to_decimal(model, field_name, value):
+    '''`value` as the column stores it (rounded to the field's places)'''
+    field = model._meta.get_field(field_name)
+    return Decimal(format_number(
+        Decimal(value), field.max_digits, field.decimal_places))
+
+
+def airport_fields(airport):
+    '''`Airport` fields of an airports.json record (None when unusable)'''
+    try:
+        return {
+            'code': airport['code'],
+            'airport_name': airport.get('name') or '',
+            'city': airport.get('city') or '',
+            'country': airport.get('country') or '',
+            'latitude': _to_decimal(Airport, 'latitude', airport['lat']),
+            'longitude': _to_decimal(Airport, 'longitude', airport['lon']),
+            'icao': airport.get('icao') or '',
+            'direct_flights': _to_int(airport.get('direct_flights')),
+            'carriers': _to_int(airport.get('carriers')),
+            'timezone': airport.get('tz') or '',
+        }
+    except (KeyError, TypeError, InvalidOperation):
+        return None
+
+
+def airline_fields(airline):
+    '''`Airline` fields of an airlines.json `(code, name)` pair'''
+    code, airline_name = airline
+    if not isinstance(airline_name, str):
+        return None
+    return {'code': code, 'airline_name': airline_name}
+
+
+def _is_valid_(model, fields):
+    code = fields.get('code')
+    return (
+        isinstance(code, str) and
+        0 < len(code) <= model._meta.pk.max_length
+    )
+
+
+def _stored_rows_(model, codes, field_names):
+    return {
+        row['code']: row
+        for row in model.objects.filter(
+            pk__in=codes).values('code', *field_names)
+    }
+
+
+def _apply_batch_(model, batch, counts, changed_pks, retimed_pks):
+    '''Insert new rows and update changed ones of one batch of records'''
+    field_names = [name for name in batch[0] if name != 'code']
+    existing = _stored_rows_(
+        model, [fields['code'] for fields in batch], field_names)
+
+    new_codes = [
+        fields['code'] for fields in batch if fields['code'] not in existing
+    ]
+    model.objects.bulk_create(
+        [model(**fields) for fields in batch if fields['code'] not in existing],
+        ignore_conflicts=True
+    )
+    # rows another load inserted meanwhile were kept (conflicts are
+    # ignored): they are compared and updated like the existing ones
+    inserted = _stored_rows_(model, new_codes, field_names)
+
+    # rows grouped by the fields that changed, so each UPDATE only sets those
+    updated = {}
+    for fields in batch:
+        row = existing.get(fields['code'])
+        if row is None:
+            row = inserted[fields['code']]
+        changed = tuple(
+            name for name in field_names if row[name] != fields[name])
+        if changed:
+            updated.setdefault(changed, []).append(model(**fields))
+        elif fields['code'] in existing:
+            counts[UNCHANGED] += 1
+        else:
+            counts[CREATED] += 1
+            changed_pks.append(fields['code'])
+
+    for changed, instances in updated.items():
+        model.objects.bulk_update(
+            instances, changed, batch_size=_UPDATE_BATCH_SIZE)
+        counts[UPDATED] += len(instances)
+        changed_pks.extend(instance.pk for instance in instances)
+        if 'timezone' in changed:
+            retimed_pks.extend(instance.pk for instance in instances)
+
+
+def load_reference_data(model, records, *, to_fields, batch_size=1000):
+    '''
+    Insert or update `model` rows from `records` (decoded JSON items,
+    turned into field dicts by `to_fields`). Records are compared with the
+    stored rows a batch at a time, so only new or changed rows are written
+    and a rerun with the same data writes nothing. Rows missing from
+    `records` are left alone; of records sharing a code the first is used.
+    Returns counts per outcome.
+    '''
+    counts = Counter({CREATED: 0, UPDATED: 0, UNCHANGED: 0, SKIPPED: 0})
+    changed_pks = []
+    retimed_pks = []
+
+    with transaction.atomic():
+        seen_codes = set()
+        batch = {}
+        for record in records:
+            fields = to_fields(record)
+            if fields is None or not _is_valid_(model, fields):
+                counts[SKIPPED] += 1
+                continue
+            # the first record of a code is kept
+            if fields['code'] in seen_codes:
+                counts[SKIPPED] += 1
+                continue
+            seen_codes.add(fields['code'])
+            batch[fields['code']] = fields
+            if len(batch) >= batch_size:
+                _apply_batch_(
+                    model, list(batch.values()), counts, changed_pks,
+                    retimed_pks)
+                batch = {}
+        if batch:
+            _apply_batch_(
+                model, list(batch.values()), counts, changed_pks,
+                retimed_pks)
+        # local dates/offsets of flights follow their airports' time zones
+        if retimed_pks:
+            Flight.objects.filter(
+                models.Q(departure_airport__in=retimed_pks) |
+                models.Q(arrival_airport__in=retimed_pks)
+            ).refresh_local_times()
+
+    # bulk writes send no signals
+    for pk in changed_pks:
+        reference_data.invalidate(model, pk)
+    if model is Airport and changed_pks:
+        airport_index.reset_airport_index()
+        geo_index.reset_geo_index()
+
+    return counts
+
+
+def load_airports(file, *, batch_size=1000):
+    '''Load an airports.json style file (array of airport objects)'''
+    return load_reference_data(
+        Airport, iter_json(file),
+        to_fields=airport_fields, batch_size=batch_size)
+
+
+def load_airlines(file, *, batch_size=1000):
+    '''Load an airlines.json style file (object of code: name)'''
+    return load_reference_data(
+        Airline, iter_json(file),
+        to_fields=airline_fields, batch_size=batch_size)
@@ -0,0 +1,259 @@
+import bisect
+import mmap
+import struct
+import threading
+import time
+import uuid
+from array import array
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import Flight, FlightSchedule
+
+
+# file layout: header, airport codes (fixed width), offsets, targets;
+# arrays are written in the byte order of the machine that built them
+_MAGIC = b'RTN1'
+_BYTE_ORDER_MARK = 0x01020304
+_HEADER = struct.Struct('=4sIII')
+_CODE_WIDTH = 5
+
+
+class RouteNetwork(object):
+    '''
+    Airport to airport routes as compressed adjacency lists (CSR):
+    - `codes`: sorted airport codes, an airport is its position here
+    - `targets[offsets[i]:offsets[i + 1]]`: sorted positions of the
+      airports flown to from airport `i`
+    Two flat integer arrays, so a network loaded from a file is served
+    straight from the memory map.
+    '''
+
+    def __init__(self, codes, offsets, targets):
+        self.codes = codes
+        self.offsets = offsets
+        self.targets = targets
+        self.positions = {code: position for position, code in enumerate(codes)}
+
+    @classmethod
+    def from_routes(cls, routes):
+        '''Build from `(departure airport, arrival airport)` code pairs'''
+        destinations = {}
+        for origin, destination in routes:
+            if origin == destination:
+                continue
+            destinations.setdefault(origin, set()).add(destination)
+            destinations.setdefault(destination, set())
+
+        codes = sorted(destinations)
+        positions = {code: position for position, code in enumerate(codes)}
+        offsets = array('I', [0])
+        targets = array('I')
+        for code in codes:
+            targets.extend(sorted(
+                positions[destination] for destination in destinations[code]))
+            offsets.append(len(targets))
+        return cls(codes, offsets, targets)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def _targets_(self, position):
+        return self.targets[self.offsets[position]:self.offsets[position + 1]]
+
+    def destinations(self, origin):
+        '''Codes of the airports flown to directly from `origin`'''
+        position = self.positions.get(origin)
+        if position is None:
+            return []
+        return [self.codes[target] for target in self._targets_(position)]
+
+    def has_route(self, origin, destination):
+        '''Whether `origin` -> `destination` is flown'''
+        position = self.positions.get(origin)
+        target = self.positions.get(destination)
+        if position is None or target is None:
+            return False
+        low, high = self.offsets[position], self.offsets[position + 1]
+        index = bisect.bisect_left(self.targets, target, low, high)
+        return index < high and self.targets[index] == target
+
+    def reachable(self, origins, max_legs):
+        '''
+        Airports reachable from `origins` in at most `max_legs` flights:
+        `{code: fewest flights}` (breadth first, origins excluded)
+        '''
+        seen = {
+            self.positions[origin] for origin in origins
+            if origin in self.positions
+        }
+        frontier = list(seen)
+        legs = {}
+        for leg_count in range(1, max_legs + 1):
+            next_frontier = []
+            for position in frontier:
+                for target in self._targets_(position):
+                    if target not in seen:
+                        seen.add(target)
+                        legs[self.codes[target]] = leg_count
+                        next_frontier.append(target)
+            frontier = next_frontier
+        return legs
+
+    def connects(self, origins, destinations, max_legs):
+        '''Whether any of `destinations` is within `max_legs` of `origins`'''
+        reachable = self.reachable(origins, max_legs)
+        return any(destination in reachable for destination in destinations)
+
+    def save(self, path):
+        '''Write the network to `path` (see `load`)'''
+        codes = b''.join(
+            code.encode('ascii').ljust(_CODE_WIDTH, b'\0') for code in self.codes)
+        with open(path, 'wb') as file:
+            file.write(_HEADER.pack(
+                _MAGIC, _BYTE_ORDER_MARK, len(self.codes), len(self.targets)))
+            file.write(codes)
+            array('I', self.offsets).tofile(file)
+            array('I', self.targets).tofile(file)
+
+    @classmethod
+    def load(cls, path):
+        '''
+        Memory map a network written by `save`; the adjacency arrays are
+        read from the page cache (shared by every process on the host)
+        rather than copied into each process
+        '''
+        with open(path, 'rb') as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, byte_order, airport_count, route_count = \
+            _HEADER.unpack_from(mapped)
+        if magic != _MAGIC or byte_order != _BYTE_ORDER_MARK:
+            raise ValueError('{} is not a route network file'.format(path))
+
+        start = _HEADER.size
+        end = start + airport_count * _CODE_WIDTH
+        codes = [
+            mapped[offset:offset + _CODE_WIDTH].rstrip(b'\0').decode('ascii')
+            for offset in range(start, end, _CODE_WIDTH)
+        ]
+
+        item_size = array('I').itemsize
+        view = memoryview(mapped)
+        offsets = view[end:end + (airport_count + 1) * item_size].cast('I')
+        start = end + (airport_count + 1) * item_size
+        targets = view[start:start + route_count * item_size].cast('I')
+        return cls(codes, offsets, targets)
+
+
+def scheduled_routes():
+    '''
+    Distinct routes of upcoming flights and of recurring schedules still
+    in force. airports.json only has a count of each airport's direct
+    flights, so the network comes from what airlines actually schedule.
+    '''
+    now = timezone.now()
+    flights = Flight.objects.filter(
+        expected_departure__gte=now
+    ).values_list('departure_airport_id', 'arrival_airport_id').distinct()
+    flight_schedules = FlightSchedule.objects.filter(
+        valid_until__gte=now.date()
+    ).values_list('departure_airport_id', 'arrival_airport_id').distinct()
+    return set(flights.iterator()) | set(flight_schedules.iterator())
+
+
+# bumped in the shared cache when a route is added, so every worker
+# rebuilds its network rather than waiting for ROUTE_NETWORK_TIMEOUT
+VERSION_KEY = 'route-network:version'
+
+_lock = threading.Lock()
+_network = None
+_built_at = None
+_version = None
+
+
+def get_route_network():
+    '''
+    This process's `RouteNetwork`: the `ROUTE_NETWORK_FILE` artifact when
+    one is configured, otherwise built from `scheduled_routes()` and rebuilt
+    after `ROUTE_NETWORK_TIMEOUT` seconds or once any worker adds a route
+    '''
+    global _network, _built_at, _version
+
+    if settings.ROUTE_NETWORK_FILE:
+        with _lock:
+            if _network is None:
+                _network = RouteNetwork.load(settings.ROUTE_NETWORK_FILE)
+            return _network
+
+    version = cache.get(VERSION_KEY)
+    with _lock:
+        now = time.monotonic()
+        if (_network is None or version != _version or
+                now - _built_at > settings.ROUTE_NETWORK_TIMEOUT):
+            _network = RouteNetwork.from_routes(scheduled_routes())
+            _built_at = now
+            _version = version
+        return _network
+
+
+def reset_route_network():
+    '''Rebuild (or reload) the network on next use'''
+    global _network
+
+    with _lock:
+        _network = None
+
+
+def _scheduled_before_(origin, destination, added_at):
+    '''Whether the route had upcoming flights or schedules before `added_at`'''
+    now = timezone.now()
+    route = {'departure_airport': origin, 'arrival_airport': destination}
+    return (
+        Flight.objects.filter(
+            expected_departure__gte=now, created_at__lt=added_at, **route
+        ).exists() or
+        FlightSchedule.objects.filter(
+            valid_until__gte=now.date(), created_at__lt=added_at, **route
+        ).exists()
+    )
+
+
+def route_added(origin, destination, *, added_at=None):
+    '''
+    Flights were scheduled `origin` -> `destination` (call once committed):
+    every worker rebuilds a network derived from the schedules on next use
+    if it may lack the route. Without a network of its own this process
+    takes a route already scheduled before `added_at` to be in the others'.
+    Removed routes linger until `ROUTE_NETWORK_TIMEOUT`, a superset is
+    harmless.
+    '''
+    global _network
+
+    if settings.ROUTE_NETWORK_FILE:
+        return
+    with _lock:
+        network = _network
+    if network is not None:
+        if network.has_route(origin, destination):
+            return
+    elif (added_at is not None and
+            _scheduled_before_(origin, destination, added_at)):
+        return
+
+    with _lock:
+        _network = None
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def is_published_route(origin, destination):
+    '''
+    Whether flights may be scheduled `origin` -> `destination`: any route
+    when the network is derived from the schedules themselves, only the
+    routes of the `ROUTE_NETWORK_FILE` artifact when one is published
+    '''
+    if not settings.ROUTE_NETWORK_FILE:
+        return True
+    return get_route_network().has_route(origin, destination)
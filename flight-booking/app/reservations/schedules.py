@@ -0,0 +1,136 @@
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
+
+from .models import Flight, FlightSchedule
+
+
+def materialize_flight_schedules(*, horizon_days=None, schedule_pk=None):
+    '''
+    Create concrete `Flight` rows for schedules up to the rolling horizon
+    (`FLIGHT_SCHEDULE_HORIZON_DAYS` from today).
+    Returns the number of flights created.
+    '''
+    if horizon_days is None:
+        horizon_days = settings.FLIGHT_SCHEDULE_HORIZON_DAYS
+
+    now = timezone.now()
+    today = now.date()
+    horizon = today + timedelta(days=horizon_days)
+
+    schedules = FlightSchedule.objects.filter(
+        valid_from__lte=horizon,
+        valid_until__gte=today
+    ).filter(
+        models.Q(materialized_until=None) |
+        models.Q(materialized_until__lt=horizon) &
+        models.Q(materialized_until__lt=models.F('valid_until'))
+    ).select_related('airline', 'departure_airport', 'arrival_airport')
+
+    if schedule_pk is not None:
+        schedules = schedules.filter(pk=schedule_pk)
+
+    created_count = 0
+    for schedule in schedules.iterator():
+        start_date = today
+        if schedule.materialized_until is not None:
+            start_date = max(
+                start_date,
+                schedule.materialized_until + timedelta(days=1)
+            )
+        end_date = min(horizon, schedule.valid_until)
+
+        flights = [
+            flight for flight in (
+                schedule.build_flight(departure_date)
+                for departure_date in schedule.get_departure_dates(
+                    start_date, end_date)
+            )
+            if flight.expected_departure >= now
+        ]
+
+        with transaction.atomic():
+            created, _ = Flight.objects.insert_ignore_duplicates(flights)
+            FlightSchedule.objects.filter(pk=schedule.pk).update(
+                materialized_until=end_date
+            )
+        created_count += len(created)
+
+    return created_count
+
+
+def expand_flight_schedules(schedules, departure_date, *, flights=()):
+    '''
+    Flights from `schedules` departing on `departure_date` that have no
+    `Flight` row yet (past the materialized horizon). `flights` already
+    found for that day are not repeated.
+    '''
+    now = timezone.now()
+    scheduled = {
+        (flight.airline_id, flight.flight_number) for flight in flights
+    }
+
+    schedules = schedules.filter(
+        valid_from__lte=departure_date,
+        valid_until__gte=departure_date
+    ).filter(
+        models.Q(materialized_until=None) |
+        models.Q(materialized_until__lt=departure_date)
+    ).select_related('airline', 'departure_airport', 'arrival_airport')
+
+    expanded_flights = []
+    for schedule in schedules:
+        if (schedule.airline_id, schedule.flight_number) in scheduled:
+            continue
+        for flight_date in schedule.get_departure_dates(
+                departure_date, departure_date):
+            flight = schedule.build_flight(flight_date)
+            if flight.expected_departure >= now:
+                expanded_flights.append(flight)
+
+    return expanded_flights
+
+
+def expand_flight(flight_id):
+    '''
+    Unsaved flight `expand_flight_schedules` returned as `flight_id`, None
+    when it is not an upcoming occurrence of a schedule past the horizon
+    '''
+    parsed = FlightSchedule.parse_flight_id(flight_id)
+    if parsed is None:
+        return None
+    schedule_ids, departure_date = parsed
+    flight_id = uuid.UUID(str(flight_id))
+
+    for flight in expand_flight_schedules(
+            FlightSchedule.objects.filter(id__range=schedule_ids),
+            departure_date):
+        if flight.id == flight_id:
+            return flight
+    return None
+
+
+def materialize_flight(flight_id):
+    '''
+    Create the `Flight` row of a flight `expand_flight_schedules` returned
+    once it is booked by its id. Returns the flight, or None when
+    `flight_id` is not an upcoming occurrence of a schedule.
+    '''
+    if FlightSchedule.parse_flight_id(flight_id) is None:
+        return None
+    flight = Flight.objects.filter(pk=flight_id).first()
+    if flight is not None:
+        return flight
+
+    flight = expand_flight(flight_id)
+    if flight is None:
+        return None
+
+    created, _ = Flight.objects.insert_ignore_duplicates([flight])
+    if created:
+        return created[0]
+    # materialized meanwhile, or clashes with a flight scheduled by hand
+    return Flight.objects.filter(pk=flight.id).first()
@@ -1,9 +1,14 @@
+from collections import OrderedDict
 from datetime import timedelta
+from functools import lru_cache
+from django.db import models, transaction
 from rest_framework import (
     serializers,
     validators,
 )
 from app.accounts import serializer as accounts_serializers
+from app.helpers import utils
+from app.reservations import geo_index, reference_data, route_network
 from . import models as reservation_models
 
 
@@ -21,6 +26,44 @@ class AirportSerializer(serializers.ModelSerializer):
         fields = ('__all__')
 
 
+class ReferenceDataField(serializers.Field):
+    '''
+    Read only Airport/Airline representation from the reference data
+    cache, keyed by the related code (e.g. `source='airline_id'`)
+    '''
+
+    def __init__(self, serializer_class, **kwargs):
+        kwargs['read_only'] = True
+        self.serializer_class = serializer_class
+        super(ReferenceDataField, self).__init__(**kwargs)
+
+    def to_representation(self, value):
+        return reference_data.get_representation(self.serializer_class, value)
+
+
+def _validate_route_(data, instance=None):
+    '''Flights may only be scheduled on published routes'''
+    departure_airport = data.get(
+        'departure_airport', getattr(instance, 'departure_airport', None))
+    arrival_airport = data.get(
+        'arrival_airport', getattr(instance, 'arrival_airport', None))
+    if departure_airport is None or arrival_airport is None:
+        return
+    if not route_network.is_published_route(
+            departure_airport.code, arrival_airport.code):
+        raise serializers.ValidationError({
+            'arrival_airport': 'No published route from {} to {}.'.format(
+                departure_airport.code, arrival_airport.code)
+        })
+
+
+class LocalDateTimeField(serializers.DateTimeField):
+    '''Datetime rendered at its own UTC offset (not converted to UTC)'''
+
+    def enforce_timezone(self, value):
+        return value
+
+
 class FlightSchedulerSerializer(serializers.Serializer):
     period = serializers.IntegerField(required=True)
     time_of_flight = serializers.TimeField(required=True)
@@ -51,6 +94,109 @@ class FlightSchedulerSerializer(serializers.Serializer):
                 'Arrival airport cant be same as departure.')
         return departure_airport
 
+    def validate(self, data):
+        _validate_route_(data, self.instance)
+        return data
+
+
+class DaysOfWeekField(serializers.ListField):
+    '''Weekdays (0 = Monday) stored as a bitmask'''
+    child = serializers.IntegerField(min_value=0, max_value=6)
+
+    def to_internal_value(self, data):
+        days_of_week = 0
+        for day in super(DaysOfWeekField, self).to_internal_value(data):
+            days_of_week |= 1 << day
+        return days_of_week
+
+    def to_representation(self, days_of_week):
+        return [day for day in range(7) if days_of_week & (1 << day)]
+
+
+class ExcludedDatesField(serializers.ListField):
+    '''Dates stored as comma separated ISO dates'''
+    child = serializers.DateField()
+
+    def to_internal_value(self, data):
+        excluded_dates = super(ExcludedDatesField, self).to_internal_value(data)
+        return ','.join(
+            excluded_date.isoformat()
+            for excluded_date in sorted(set(excluded_dates))
+        )
+
+    def to_representation(self, excluded_dates):
+        return [
+            excluded_date for excluded_date in excluded_dates.split(',')
+            if excluded_date
+        ]
+
+
+class FlightScheduleSerializer(serializers.ModelSerializer):
+    days_of_week = DaysOfWeekField(allow_empty=False)
+    excluded_dates = ExcludedDatesField(required=False)
+    flight_duration = serializers.DurationField(
+        max_value=timedelta(hours=24),
+        required=True
+    )
+    departure_airport_view = ReferenceDataField(
+        AirportSerializer,
+        source='departure_airport_id'
+    )
+    arrival_airport_view = ReferenceDataField(
+        AirportSerializer,
+        source='arrival_airport_id'
+    )
+    airline_view = ReferenceDataField(
+        AirlineSerializer,
+        source='airline_id'
+    )
+
+    class Meta:
+        model = reservation_models.FlightSchedule
+        exclude = ('created_at', 'updated_at')
+        read_only_fields = ('materialized_until',)
+
+    def validate_arrival_airport(self, arrival_airport):
+        if self.initial_data.get('departure_airport', None) == arrival_airport.code:
+            raise serializers.ValidationError(
+                'Arrival airport cant be same as departure.')
+        return arrival_airport
+
+    def validate(self, data):
+        if data['valid_until'] < data['valid_from']:
+            raise serializers.ValidationError({
+                'valid_until': 'Must not be before valid_from.'
+            })
+        _validate_route_(data, self.instance)
+        return data
+
+
+def _route_distances_(flights):
+    '''Great circle distance of every route flown by `flights`, in one pass'''
+    routes = list({
+        (flight.departure_airport_id, flight.arrival_airport_id)
+        for flight in flights
+    })
+    return dict(zip(routes, geo_index.get_geo_index().route_distances(routes)))
+
+
+def _distance_km_(flight, route_distances):
+    route = (flight.departure_airport_id, flight.arrival_airport_id)
+    if route in route_distances:
+        distance = route_distances[route]
+    else:
+        distance = geo_index.get_geo_index().route_distances([route])[0]
+    return None if distance is None else round(distance, 1)
+
+
+class FlightListSerializer(serializers.ListSerializer):
+    '''Flight lists compute the distance of all their routes in one pass'''
+
+    def to_representation(self, data):
+        flights = list(data.all() if isinstance(data, models.Manager) else data)
+        self.child.route_distances = _route_distances_(flights)
+        return super(FlightListSerializer, self).to_representation(flights)
+
 
 class FlightSerializer(serializers.ModelSerializer):
     flight_duration = serializers.CharField(
@@ -61,25 +207,39 @@ class FlightSerializer(serializers.ModelSerializer):
         source='get_flight_designation',
         read_only=True
     )
-    departure_airport_view = AirportSerializer(
-        source='departure_airport',
+    local_departure = LocalDateTimeField(
+        source='get_local_departure',
         read_only=True
     )
-    arrival_airport_view = AirportSerializer(
-        source='arrival_airport',
+    local_arrival = LocalDateTimeField(
+        source='get_local_arrival',
         read_only=True
     )
-    airline_view = AirlineSerializer(
-        source='airline',
-        read_only=True
+    departure_airport_view = ReferenceDataField(
+        AirportSerializer,
+        source='departure_airport_id'
+    )
+    arrival_airport_view = ReferenceDataField(
+        AirportSerializer,
+        source='arrival_airport_id'
+    )
+    airline_view = ReferenceDataField(
+        AirlineSerializer,
+        source='airline_id'
     )
     flight_number = serializers.CharField(
         write_only=True
     )
+    distance_km = serializers.SerializerMethodField()
 
     class Meta:
         model = reservation_models.Flight
         exclude = ('created_at', 'updated_at')
+        list_serializer_class = FlightListSerializer
+
+    def get_distance_km(self, flight):
+        '''Great circle distance of the route'''
+        return _distance_km_(flight, getattr(self, 'route_distances', {}))
 
     def validate_arrival_airport(self, arrival_airport):
         if self.initial_data.get('departure_airport', None) == arrival_airport.code:
@@ -93,6 +253,10 @@ class FlightSerializer(serializers.ModelSerializer):
                 'Arrival airport cant be same as departure.')
         return departure_airport
 
+    def validate(self, data):
+        _validate_route_(data, self.instance)
+        return data
+
 
 class ReservationSerializer(serializers.ModelSerializer):
     first_flight_view = FlightSerializer(read_only=True, source='first_flight')
@@ -116,6 +280,172 @@ class ReservationSerializer(serializers.ModelSerializer):
         model = reservation_models.Reservation
         exclude = ('created_at', 'updated_at', 'deleted_at')
 
+    def create(self, validated_data):
+        flights = [validated_data['first_flight']]
+        if (validated_data.get('ticket_type') == reservation_models.Reservation.RETURN and
+                validated_data.get('return_flight')):
+            flights.append(validated_data['return_flight'])
+
+        with transaction.atomic():
+            sold_out_flight = reservation_models.SeatInventory.reserve_seats(
+                flights,
+                validated_data.get(
+                    'flight_class',
+                    reservation_models.Reservation.ECONOMY_CLASS
+                )
+            )
+            if sold_out_flight is not None:
+                field = 'first_flight'
+                if sold_out_flight != validated_data['first_flight']:
+                    field = 'return_flight'
+                raise utils.FieldErrorExceptions({
+                    field: {
+                        'message': 'No seats left in this class.',
+                        'type': 'sold_out'
+                    }
+                })
+
+            return super(ReservationSerializer, self).create(validated_data)
+
+
+_DATETIME_FIELD = serializers.DateTimeField()
+_LOCAL_DATETIME_FIELD = LocalDateTimeField()
+_DATE_FIELD = serializers.DateField()
+
+
+@lru_cache(maxsize=None)
+def _output_fields_(serializer_class):
+    '''Names `serializer_class` outputs, in order'''
+    return tuple(
+        name for name, field in serializer_class().fields.items()
+        if not field.write_only
+    )
+
+
+def _ordered_(serializer_class, values):
+    '''
+    `values` keyed and ordered as `serializer_class` outputs them; a field
+    added there but not to `values` raises KeyError rather than dropping out
+    '''
+    return OrderedDict(
+        (name, values[name]) for name in _output_fields_(serializer_class))
+
+
+def _flight_representation_(flight, route_distances):
+    '''`FlightSerializer` output of `flight`'''
+    return _ordered_(FlightSerializer, dict([
+        ('id', str(flight.id)),
+        ('flight_duration', flight.get_flight_duration()),
+        ('flight_designation', flight.get_flight_designation()),
+        ('local_departure', _LOCAL_DATETIME_FIELD.to_representation(
+            flight.get_local_departure())),
+        ('local_arrival', _LOCAL_DATETIME_FIELD.to_representation(
+            flight.get_local_arrival())),
+        ('departure_airport_view', reference_data.get_representation(
+            AirportSerializer, flight.departure_airport_id)),
+        ('arrival_airport_view', reference_data.get_representation(
+            AirportSerializer, flight.arrival_airport_id)),
+        ('airline_view', reference_data.get_representation(
+            AirlineSerializer, flight.airline_id)),
+        ('distance_km', _distance_km_(flight, route_distances)),
+        ('expected_departure', _DATETIME_FIELD.to_representation(
+            flight.expected_departure)),
+        ('expected_arrival', _DATETIME_FIELD.to_representation(
+            flight.expected_arrival)),
+        ('departure_date', _DATE_FIELD.to_representation(
+            flight.departure_date)),
+        ('departure_local_date', _DATE_FIELD.to_representation(
+            flight.departure_local_date)),
+        ('arrival_local_date', _DATE_FIELD.to_representation(
+            flight.arrival_local_date)),
+        ('departure_utc_offset', flight.departure_utc_offset),
+        ('arrival_utc_offset', flight.arrival_utc_offset),
+        ('departure', _DATETIME_FIELD.to_representation(flight.departure)),
+        ('arrival', _DATETIME_FIELD.to_representation(flight.arrival)),
+        ('departure_airport', flight.departure_airport_id),
+        ('arrival_airport', flight.arrival_airport_id),
+        ('airline', flight.airline_id),
+    ]))
+
+
+class FlightReadSerializer(serializers.BaseSerializer):
+    '''
+    Read only fast path of `FlightSerializer` for list endpoints: the
+    same output, built directly from the flight's attributes instead of
+    through per field `to_representation` calls
+    '''
+    class Meta:
+        list_serializer_class = FlightListSerializer
+
+    def to_representation(self, flight):
+        return _flight_representation_(
+            flight, getattr(self, 'route_distances', {}))
+
+
+class ReservationReadListSerializer(serializers.ListSerializer):
+    '''Reservation lists compute the distance of all their routes in one pass'''
+
+    def to_representation(self, data):
+        reservations = list(
+            data.all() if isinstance(data, models.Manager) else data)
+        self.child.route_distances = _route_distances_(
+            flight
+            for reservation in reservations
+            for flight in (reservation.first_flight, reservation.return_flight)
+            if flight is not None
+        )
+        return super(ReservationReadListSerializer, self).to_representation(
+            reservations)
+
+
+class ReservationReadSerializer(serializers.BaseSerializer):
+    '''Read only fast path of `ReservationSerializer` for list endpoints'''
+
+    class Meta:
+        list_serializer_class = ReservationReadListSerializer
+        select_related = ('first_flight', 'return_flight', 'author__user')
+
+    def to_representation(self, reservation):
+        route_distances = getattr(self, 'route_distances', {})
+        author = reservation.author
+        return_view = None
+        if reservation.return_flight is not None:
+            return_view = _flight_representation_(
+                reservation.return_flight, route_distances)
+
+        return _ordered_(ReservationSerializer, dict([
+            ('id', str(reservation.id)),
+            ('first_flight_view', _flight_representation_(
+                reservation.first_flight, route_distances)),
+            ('return_view', return_view),
+            ('reserved_by', _ordered_(
+                accounts_serializers.CompactAccountsViewSerializer, dict([
+                    ('full_name', author.get_full_name()),
+                    ('user_name', author.user.username),
+                    ('id', str(author.id)),
+                ]))),
+            ('reservation_type', reservation.get_ticket_type_display()),
+            ('reservation_class', reservation.get_flight_class_display()),
+            ('flight_class', reservation.flight_class),
+            ('is_reminder_sent', reservation.is_reminder_sent),
+            ('ticket_type', reservation.ticket_type),
+            ('author', reservation.author_id),
+            ('first_flight', reservation.first_flight_id),
+            ('return_flight', reservation.return_flight_id),
+        ]))
+
+
+class SeatInventorySerializer(serializers.ModelSerializer):
+    flight_class_name = serializers.CharField(
+        read_only=True,
+        source='get_flight_class_display'
+    )
+
+    class Meta:
+        model = reservation_models.SeatInventory
+        fields = ('flight_class', 'flight_class_name', 'capacity', 'remaining')
+        read_only_fields = ('remaining',)
+
 
 class AirlineSerializer(serializers.ModelSerializer):
 
@@ -1,8 +1,10 @@
-from datetime import timedelta, datetime, date
+from datetime import timedelta, datetime, date, time
 from dateutil.parser import parse
 from dateutil.relativedelta import relativedelta
+from django.conf import settings
 from django.utils import timezone
 from django.db import transaction, models
+from django.http import Http404
 
 from rest_framework import (
     generics,
@@ -11,15 +13,48 @@ from rest_framework import (
 )
 from app.reservations.serializers import (
     FlightSchedulerSerializer,
+    FlightScheduleSerializer,
     FlightSerializer,
     ReservationSerializer,
+    SeatInventorySerializer,
     AirlineSerializer
 )
-from app.reservations import tasks
+from app.reservations import (
+    airport_index,
+    geo_index,
+    itineraries,
+    route_network,
+    schedules,
+    tasks
+)
+from app.helpers.queries import optimize_queryset
 
+from app.accounts import permissions
 from app.accounts.models import Accounts
+from app.helpers import utils
+
+from .models import(
+    Flight,
+    FlightSchedule,
+    Airline,
+    Airport,
+    Reservation,
+    SeatInventory
+)
 
-from .models import(Flight, Airline, Reservation)
+BULK_SCHEDULE_BATCH_SIZE = 500
+AIRPORT_SEARCH_LIMIT = 10
+AIRPORT_SEARCH_MAX_LIMIT = 50
+SEARCH_BACKEND_INDEX = 'index'
+SEARCH_BACKEND_TRIGRAM = 'trigram'
+ITINERARY_LIMIT = 5
+ITINERARY_MAX_LIMIT = 20
+ITINERARY_MAX_STOPS = 2
+NEAREST_AIRPORTS_LIMIT = 10
+NEAREST_AIRPORTS_MAX_LIMIT = 50
+# about half the earth's circumference
+NEAREST_AIRPORTS_MAX_KM = 20000
+ALTERNATE_AIRPORTS_MAX_KM = 300
 
 
 def _validate_schedule_details_(data, airline_code):
@@ -33,9 +68,30 @@ def _validate_schedule_details_(data, airline_code):
     return schedule_serializer.validated_data
 
 
+def _parse_filter_date_(filter_date):
+    '''Parse a `date` filter into a date (None when it is not one)'''
+    if isinstance(filter_date, str):
+        try:
+            filter_date = parse(filter_date)
+        except ValueError:
+            return None
+    if isinstance(filter_date, datetime):
+        return filter_date.date()
+    if isinstance(filter_date, date):
+        return filter_date
+    return None
+
+
+def _departure_range_(filter_date):
+    '''UTC day range for `filter_date` (keeps departure lookups indexable)'''
+    start = datetime.combine(filter_date, time.min).replace(
+        tzinfo=timezone.utc)
+    return start, start + timedelta(days=1)
+
+
 def bulk_schedule_flight(requestor, *, period_type='days', airline_code, data):
     '''Bulk schedule regular flights (days or weeks)'''
-    if not requestor.has_perm('reservations.add_flights'):
+    if not permissions.has_perm(requestor, 'reservations.add_flights'):
         raise exceptions.PermissionDenied('Insufficient Permission.')
 
     assert period_type == 'days' or period_type == 'weeks'
@@ -54,35 +110,63 @@ def bulk_schedule_flight(requestor, *, period_type='days', airline_code, data):
         second=0
     )
 
+    departures = []
+    for period_change in range(0, period):
+        if period_type == 'days':
+            period_change_weeks = 0
+            period_change_days = period_change
+        else:
+            period_change_weeks = period_change
+            period_change_days = 0
+
+        departures.append(flight_schedule_time + timedelta(
+            weeks=period_change_weeks,
+            days=period_change_days,
+        ))
+
+    departure_dates = [
+        Flight.get_departure_date(departure) for departure in departures
+    ]
+    scheduled_dates = set()
+    if departure_dates:
+        scheduled_dates = set(airline.flight_airline.filter(
+            flight_number=validated_data.get('flight_number'),
+            departure_date__range=[departure_dates[0], departure_dates[-1]]
+        ).values_list('departure_date', flat=True))
+
+    flights = [
+        Flight(
+            **validated_data,
+            airline=airline,
+            expected_departure=expected_departure,
+            expected_arrival=expected_departure + flight_duration
+        )
+        for expected_departure, departure_date in zip(
+            departures, departure_dates)
+        if departure_date not in scheduled_dates
+    ]
+
     with transaction.atomic():
-        for period_change in range(0, period):
-            if period_type == 'days':
-                period_change_weeks = 0
-                period_change_days = period_change
-            else:
-                period_change_weeks = period_change
-                period_change_days = 0
-
-            expected_departure = flight_schedule_time + timedelta(
-                weeks=period_change_weeks,
-                days=period_change_days,
-            )
-            expected_arrival = expected_departure + flight_duration
+        created_flights, _ = Flight.objects.insert_ignore_duplicates(
+            flights,
+            batch_size=BULK_SCHEDULE_BATCH_SIZE
+        )
+    # bulk inserts send no post_save
+    if created_flights:
+        origin = validated_data['departure_airport'].code
+        destination = validated_data['arrival_airport'].code
+        added_at = created_flights[0].created_at
+        transaction.on_commit(lambda: route_network.route_added(
+            origin, destination, added_at=added_at))
 
-            airline.flight_airline.create(
-                **validated_data,
-                expected_arrival=expected_arrival,
-                expected_departure=expected_departure
-            )
-    flight_number = validated_data.get('flight_number')
     return FlightSerializer(
-        airline.flight_airline,
+        created_flights,
         many=True).data
 
 
 def schedule_flight(requestor, *, airline_code, data):
     '''Schedule single flight'''
-    if not requestor.has_perm('reservations.add_flights'):
+    if not permissions.has_perm(requestor, 'reservations.add_flights'):
         raise exceptions.PermissionDenied('Insufficient Permission.')
 
     flight_details = data.copy()
@@ -100,106 +184,359 @@ def schedule_flight(requestor, *, airline_code, data):
     return serializer.data
 
 
+def create_flight_schedule(requestor, *, airline_code, data):
+    '''Publish a recurring flight schedule (flights materialized lazily)'''
+    if not permissions.has_perm(requestor, 'reservations.add_flights'):
+        raise exceptions.PermissionDenied('Insufficient Permission.')
+
+    schedule_details = data.copy()
+
+    airline = generics.get_object_or_404(Airline, pk=airline_code)
+
+    schedule_details['airline'] = airline.code
+
+    serializer = FlightScheduleSerializer(data=schedule_details)
+
+    serializer.is_valid(raise_exception=True)
+
+    schedule = serializer.save()
+
+    transaction.on_commit(
+        lambda: tasks.materialize_flight_schedules.delay(str(schedule.id))
+    )
+
+    return serializer.data
+
+
+def filter_flight_schedules(requestor, *, airline_code):
+    '''List recurring flight schedules for Airline'''
+    if not permissions.has_perm(requestor, 'reservations.view_flights'):
+        raise exceptions.PermissionDenied('Insufficient Permission.')
+
+    airline = generics.get_object_or_404(Airline, pk=airline_code)
+
+    return airline.flightschedule_airline.order_by('valid_from', 'flight_number')
+
+
+def _airport_filter_(field_name, location, *, within_km=None):
+    '''
+    Filter `field_name` (an Airport relation) by free text `location`,
+    resolved with `LOCATION_SEARCH_BACKEND`:
+    - `index`: the in process airport index (list of codes)
+    - `trigram`: case insensitive substring subquery on city, country and
+      name (pg_trgm indexed on PostgreSQL)
+    `within_km` adds the alternate airports that close to a match.
+    '''
+    if settings.LOCATION_SEARCH_BACKEND == SEARCH_BACKEND_TRIGRAM:
+        airports = Airport.objects.filter(
+            models.Q(city__icontains=location) |
+            models.Q(country__icontains=location) |
+            models.Q(airport_name__icontains=location)
+        ).values('code')
+        if within_km is not None:
+            airports = [airport['code'] for airport in airports]
+    else:
+        airports = airport_index.resolve_location(location)
+
+    if within_km is not None:
+        airports = geo_index.get_geo_index().within(airports, within_km)
+
+    return models.Q(**{'{}__in'.format(field_name): airports})
+
+
+def _float_param_(query_params, name, *, minimum, maximum):
+    '''`name` as a float within `[minimum, maximum]` (None when absent)'''
+    value = query_params.get(name, None)
+    if value is None:
+        return None
+    try:
+        value = float(value)
+    except ValueError:
+        value = None
+    if value is None or not minimum <= value <= maximum:
+        raise utils.FieldErrorExceptions({
+            name: {
+                'message': 'Enter a number between {} and {}.'.format(
+                    minimum, maximum),
+                'type': 'invalid'
+            }
+        })
+    return value
+
+
+def _schedule_dates_(filter_date, filter_local_date):
+    '''UTC departure dates to expand schedules for (local dates are a day either side)'''
+    if filter_local_date is None:
+        return [filter_date]
+    local_dates = [
+        filter_local_date + timedelta(days=days) for days in (-1, 0, 1)
+    ]
+    if filter_date is None:
+        return local_dates
+    return [filter_date] if filter_date in local_dates else []
+
+
 def filter_flights(requestor, *, query_params):
     '''Filter available flights'''
-    if not requestor.has_perm('reservations.view_flights'):
+    if not permissions.has_perm(requestor, 'reservations.view_flights'):
         raise exceptions.PermissionDenied('Insufficient Permission.')
 
     filter_date = query_params.get('date', None)
-    filter_departure_location = query_params.get('from', None)
-    filter_destination = query_params.get('destination', None)
+    filter_local_date = query_params.get('local_date', None)
+    # a blank location (`?from=`) does not filter
+    filter_departure_location = query_params.get('from', '').strip()
+    filter_destination = query_params.get('destination', '').strip()
+    within_km = _float_param_(
+        query_params, 'within_km',
+        minimum=0, maximum=ALTERNATE_AIRPORTS_MAX_KM)
 
     today = timezone.now()
 
     flights = Flight.objects.filter(
         expected_departure__gte=today
-    ).order_by('expected_departure')
+    ).order_by('expected_departure', 'id')
 
+    filter_date = _parse_filter_date_(filter_date)
     if filter_date is not None:
-        if isinstance(filter_date, datetime):
-            filter_date = filter_date.date()
-        elif isinstance(filter_date, str):
-            try:
-                filter_date = parse(filter_date)
-            except ValueError:
-                pass
-        if isinstance(filter_date, date):
-            flights = flights.filter(
-                expected_departure__contains=filter_date
-            )
-    if filter_departure_location is not None:
+        start_range, end_range = _departure_range_(filter_date)
         flights = flights.filter(
-            models.Q(
-                departure_airport__city__contains=filter_departure_location
-            ) | models.Q(
-                departure_airport__country__contains=filter_departure_location
-            ) | models.Q(
-                departure_airport__airport_name__contains=filter_departure_location
-            )
+            expected_departure__gte=start_range,
+            expected_departure__lt=end_range
         )
-    if filter_destination is not None:
-        flights = flights.filter(
-            models.Q(
-                arrival_airport__city__contains=filter_destination
-            ) | models.Q(
-                arrival_airport__country__contains=filter_destination
-            ) | models.Q(
-                arrival_airport__airport_name__contains=filter_destination
+    # date at the departure airport
+    filter_local_date = _parse_filter_date_(filter_local_date)
+    if filter_local_date is not None:
+        flights = flights.filter(departure_local_date=filter_local_date)
+    # Flight and FlightSchedule share the airport field names
+    location_filters = models.Q()
+    if filter_departure_location:
+        location_filters &= _airport_filter_(
+            'departure_airport', filter_departure_location,
+            within_km=within_km)
+    if filter_destination:
+        location_filters &= _airport_filter_(
+            'arrival_airport', filter_destination, within_km=within_km)
+    flights = flights.filter(location_filters)
+
+    if filter_date is not None or filter_local_date is not None:
+        # departures past the materialized horizon come from the schedules
+        flights = list(optimize_queryset(flights, FlightSerializer))
+        expanded_flights = []
+        for departure_date in _schedule_dates_(filter_date, filter_local_date):
+            expanded_flights += schedules.expand_flight_schedules(
+                FlightSchedule.objects.filter(location_filters),
+                departure_date,
+                flights=flights
             )
-        )
+        flights += [
+            flight for flight in expanded_flights
+            if filter_local_date in (None, flight.departure_local_date)
+        ]
+        flights.sort(key=lambda flight: flight.expected_departure)
 
-    return FlightSerializer(
-        flights,
-        many=True).data
+    return flights
+
+
+def _bounded_int_param_(query_params, name, *, default, minimum, maximum):
+    try:
+        value = int(query_params.get(name, default))
+    except ValueError:
+        value = default
+    return max(minimum, min(value, maximum))
+
+
+def search_itineraries(requestor, *, query_params):
+    '''Direct and connecting itineraries between two locations on a date'''
+    if not permissions.has_perm(requestor, 'reservations.view_flights'):
+        raise exceptions.PermissionDenied('Insufficient Permission.')
+
+    fields = utils.validate_fields_present(
+        query_params, 'from', 'to', 'date', raise_exception=True)
+
+    departure_date = _parse_filter_date_(fields['date'])
+    if departure_date is None:
+        raise utils.FieldErrorExceptions({
+            'date': {
+                'message': 'Enter a valid date.',
+                'type': 'invalid'
+            }
+        })
+
+    max_stops = _bounded_int_param_(
+        query_params, 'max_stops',
+        default=ITINERARY_MAX_STOPS, minimum=0, maximum=ITINERARY_MAX_STOPS)
+    limit = _bounded_int_param_(
+        query_params, 'limit',
+        default=ITINERARY_LIMIT, minimum=1, maximum=ITINERARY_MAX_LIMIT)
+
+    found = itineraries.search_itineraries(
+        airport_index.resolve_location(fields['from']),
+        airport_index.resolve_location(fields['to']),
+        departure_date,
+        max_legs=max_stops + 1,
+        limit=limit
+    )
+
+    flights = optimize_queryset(Flight.objects.all(), FlightSerializer).in_bulk(
+        [leg.flight_id for itinerary in found for leg in itinerary]
+    )
+    results = []
+    for itinerary in found:
+        if any(leg.flight_id not in flights for leg in itinerary):
+            # deleted since the departure index was built
+            continue
+        itinerary_flights = [flights[leg.flight_id] for leg in itinerary]
+        departure = itinerary_flights[0].expected_departure
+        arrival = itinerary_flights[-1].expected_arrival
+        results.append({
+            'departure': departure,
+            'arrival': arrival,
+            'duration': str(arrival - departure),
+            'stops': len(itinerary_flights) - 1,
+            'flights': FlightSerializer(itinerary_flights, many=True).data,
+        })
+    return results
 
 
 def retrieve_flight_for_airline(requestor, *, airline_code, query_params):
     '''Retrieve Flight Schedule for Airline'''
-    if not requestor.has_perm('reservations.view_flights'):
+    if not permissions.has_perm(requestor, 'reservations.view_flights'):
         raise exceptions.PermissionDenied('Insufficient Permission.')
 
     airline = generics.get_object_or_404(Airline, pk=airline_code)
 
-    flights = airline.flight_airline.order_by('expected_departure')
+    flights = airline.flight_airline.order_by('expected_departure', 'id')
 
     filter_date = query_params.get('date', None)
     filter_flight_number = query_params.get('flight_number', None)
 
+    filter_date = _parse_filter_date_(filter_date)
     if filter_date is not None:
-        if isinstance(filter_date, datetime.datetime):
-            filter_date = filter_date.date()
-        elif isinstance(filter_date, str):
-            try:
-                filter_date = parse(filter_date)
-            except ValueError:
-                pass
-        if isinstance(filter_date, datetime.date):
-            flights = flights.filter(
-                expected_departure__contains=filter_date
-            )
+        flights = flights.filter(departure_date=filter_date)
     if filter_flight_number is not None:
         flights = flights.filter(flight_number=filter_flight_number)
 
-    return FlightSerializer(
-        flights,
-        many=True).data
+    return flights
+
+
+def _get_flight_or_404_(queryset, flight_pk):
+    '''
+    Flight by id, or the unsaved flight expanded from a schedule past the
+    materialized horizon that has this id
+    '''
+    try:
+        return generics.get_object_or_404(queryset, pk=flight_pk)
+    except Http404:
+        flight = schedules.expand_flight(flight_pk)
+        if flight is None:
+            raise
+    return flight
+
+
+def _save_reservation_(reservation_data):
+    '''
+    Validate and save a reservation. Expanded flights being booked get
+    their rows in the same transaction, so a booking that fails leaves
+    none behind.
+    '''
+    with transaction.atomic():
+        for field in ('first_flight', 'return_flight'):
+            flight_pk = reservation_data.get(field)
+            if flight_pk:
+                schedules.materialize_flight(flight_pk)
+
+        serializer = ReservationSerializer(
+            data=reservation_data
+        )
+        serializer.is_valid(raise_exception=True)
+
+        serializer.save()
+
+    return serializer.data
 
 
 def retrieve_flight(requestor, flight_pk):
     '''Retrieve Information about a flight'''
-    if not requestor.has_perm('reservations.view_flight'):
+    if not permissions.has_perm(requestor, 'reservations.view_flight'):
         raise exceptions.PermissionDenied('Insufficient Permission.')
 
-    flight = generics.get_object_or_404(Flight, pk=flight_pk)
+    flight = _get_flight_or_404_(
+        optimize_queryset(Flight.objects.all(), FlightSerializer),
+        flight_pk
+    )
 
     return FlightSerializer(flight).data
 
 
+def retrieve_seat_inventory(requestor, flight_pk):
+    '''Retrieve seats (capacity/remaining) per class for a flight'''
+    if not permissions.has_perm(requestor, 'reservations.view_flight'):
+        raise exceptions.PermissionDenied('Insufficient Permission.')
+
+    flight = generics.get_object_or_404(Flight, pk=flight_pk)
+
+    return SeatInventorySerializer(
+        flight.seatinventory_flight.order_by('flight_class'),
+        many=True).data
+
+
+def update_seat_inventory(requestor, *, flight_pk, data):
+    '''Set the seat capacity of a flight class, keeping booked seats'''
+    if not permissions.has_perm(requestor, 'reservations.change_flight'):
+        raise exceptions.PermissionDenied('Insufficient Permission.')
+
+    flight = generics.get_object_or_404(Flight, pk=flight_pk)
+
+    serializer = SeatInventorySerializer(data=data)
+    serializer.is_valid(raise_exception=True)
+
+    flight_class = serializer.validated_data['flight_class']
+    capacity = serializer.validated_data['capacity']
+
+    with transaction.atomic():
+        # the row exists before it is locked, so concurrent updates queue up
+        # on it (`get_or_create` fetches a row inserted meanwhile) and
+        # bookings take seats from it from here on
+        _, created = SeatInventory.objects.get_or_create(
+            flight=flight,
+            flight_class=flight_class,
+            defaults={'capacity': capacity, 'remaining': capacity}
+        )
+        seats = SeatInventory.objects.select_for_update().get(
+            flight=flight,
+            flight_class=flight_class
+        )
+
+        if created:
+            booked = Reservation.objects.filter(
+                models.Q(first_flight=flight) | models.Q(return_flight=flight),
+                flight_class=flight_class,
+                deleted_at=None
+            ).count()
+        else:
+            booked = seats.capacity - seats.remaining
+
+        if capacity < booked:
+            raise utils.FieldErrorExceptions({
+                'capacity': {
+                    'message': 'Capacity cannot be less than booked seats ({}).'.format(
+                        booked),
+                    'type': 'invalid'
+                }
+            })
+
+        seats.capacity = capacity
+        seats.remaining = capacity - booked
+        seats.save()
+
+    return SeatInventorySerializer(seats).data
+
+
 def make_reservation(requestor, *, account_pk, data):
     '''Make Flight Reservations'''
-    if requestor.has_perm('reservations.create_any_reservation'):
+    if permissions.has_perm(requestor, 'reservations.create_any_reservation'):
         pass
-    elif requestor.has_perm('reservations.add_reservation'):
+    elif permissions.has_perm(requestor, 'reservations.add_reservation'):
         if str(requestor.account.id) != str(account_pk):
             raise exceptions.PermissionDenied('Insufficient Permission.')
     else:
@@ -211,19 +548,12 @@ def make_reservation(requestor, *, account_pk, data):
 
     reservation_data['author'] = user_account.id
 
-    serializer = ReservationSerializer(
-        data=reservation_data
-    )
-    serializer.is_valid(raise_exception=True)
-
-    serializer.save()
-
-    return serializer.data
+    return _save_reservation_(reservation_data)
 
 
 def make_flight_reservation(requestor, *, flight_pk, data):
     '''Make Flight Reservations For self'''
-    if not requestor.has_perm('reservations.add_reservation'):
+    if not permissions.has_perm(requestor, 'reservations.add_reservation'):
         raise exceptions.PermissionDenied('Insufficient Permission.')
 
     account_pk = requestor.account.id
@@ -232,27 +562,20 @@ def make_flight_reservation(requestor, *, flight_pk, data):
 
     reservation_data['author'] = account_pk
 
-    flight = generics.get_object_or_404(Flight, pk=flight_pk)
+    flight = _get_flight_or_404_(Flight.objects.all(), flight_pk)
 
     reservation_data['first_flight'] = flight.id
 
-    serializer = ReservationSerializer(
-        data=reservation_data
-    )
-    serializer.is_valid(raise_exception=True)
-
-    serializer.save()
-
-    return serializer.data
+    return _save_reservation_(reservation_data)
 
 
 def filter_reservations(requestor, query_params, *, account_pk=None):
     '''List and filter reservations'''
     reservations = Reservation.objects.filter(deleted_at=None)
-    if requestor.has_perm('reservations.retrieve_any_reservations'):
+    if permissions.has_perm(requestor, 'reservations.retrieve_any_reservations'):
         if account_pk is not None:
             reservations.filter(author=account_pk)
-    elif requestor.has_perm('reservations.retrieve_own_reservations'):
+    elif permissions.has_perm(requestor, 'reservations.retrieve_own_reservations'):
         if account_pk is not None and account_pk != str(requestor.account.id):
             raise exceptions.PermissionDenied('Insufficient Permission.')
 
@@ -270,32 +593,36 @@ def filter_reservations(requestor, query_params, *, account_pk=None):
             return_flight__flight_number=filter_flight_number
         ))
 
+    filter_date = _parse_filter_date_(filter_date)
     if filter_date is not None:
-        if isinstance(filter_date, datetime):
-            filter_date = filter_date.date()
-        elif isinstance(filter_date, str):
-            try:
-                filter_date = parse(filter_date)
-            except ValueError:
-                pass
-    if isinstance(filter_date, date):
+        start_range, end_range = _departure_range_(filter_date)
         reservations = reservations.filter(models.Q(
-            first_flight__expected_departure__contains=filter_date
+            first_flight__expected_departure__gte=start_range,
+            first_flight__expected_departure__lt=end_range
         ) | models.Q(
-            return_flight__expected_departure__contains=filter_date
+            return_flight__expected_departure__gte=start_range,
+            return_flight__expected_departure__lt=end_range
         ))
 
+    reservations = optimize_queryset(reservations, ReservationSerializer)
+
     return reservations.order_by('first_flight__expected_departure')
 
 
 def filter_flight_reservations(requestor, flight_pk):
-    if not requestor.has_perm('reservations.retrieve_any_reservations'):
+    if not permissions.has_perm(requestor, 'reservations.retrieve_any_reservations'):
         raise exceptions.PermissionDenied('Insufficient Permission.')
 
     flight = generics.get_object_or_404(Flight, pk=flight_pk)
 
-    combined_reservations = flight.reservation_departure.order_by('first_flight').union(
-        flight.reservation_return.order_by('return_flight'))
+    combined_reservations = Reservation.objects.filter(
+        models.Q(first_flight=flight) | models.Q(return_flight=flight)
+    ).order_by('first_flight', 'return_flight')
+
+    combined_reservations = optimize_queryset(
+        combined_reservations,
+        ReservationSerializer
+    )
 
     return ReservationSerializer(combined_reservations, many=True).data
 
@@ -303,7 +630,7 @@ def filter_flight_reservations(requestor, flight_pk):
 def make_own_reservation(requestor, *, data):
     '''Make Flight Reservations For self'''
     # TODO: Ensure reservation is not in the past
-    if not requestor.has_perm('reservations.add_reservation'):
+    if not permissions.has_perm(requestor, 'reservations.add_reservation'):
         raise exceptions.PermissionDenied('Insufficient Permission.')
 
     account_pk = requestor.account.id
@@ -312,22 +639,15 @@ def make_own_reservation(requestor, *, data):
 
     reservation_data['author'] = account_pk
 
-    serializer = ReservationSerializer(
-        data=reservation_data
-    )
-    serializer.is_valid(raise_exception=True)
-
-    serializer.save()
-
-    return serializer.data
+    return _save_reservation_(reservation_data)
 
 
 def filter_reservations_by_period(requestor, *, month, year, query_params, period):
     '''List and filter reservations by period'''
     reservations = Reservation.objects.filter(deleted_at=None)
-    if requestor.has_perm('reservations.retrieve_any_reservations'):
+    if permissions.has_perm(requestor, 'reservations.retrieve_any_reservations'):
         pass
-    elif requestor.has_perm('reservations.retrieve_own_reservations'):
+    elif permissions.has_perm(requestor, 'reservations.retrieve_own_reservations'):
         reservations = Reservation.objects.filter(author=requestor.account.id)
     else:
         raise exceptions.PermissionDenied('Insufficient Permission.')
@@ -348,17 +668,22 @@ def filter_reservations_by_period(requestor, *, month, year, query_params, perio
         return_flight__expected_departure__range=[start_range, end_range]
     ))
 
+    reservations = optimize_queryset(reservations, ReservationSerializer)
+
     return reservations.order_by('first_flight__expected_departure')
 
 
 def _retrieve_single_reservation_(requestor, reservation_pk):
     '''Retrieve SIngle Reservation Infop, check permissions'''
 
-    reservation = generics.get_object_or_404(Reservation, pk=reservation_pk)
+    reservation = generics.get_object_or_404(
+        optimize_queryset(Reservation.objects.all(), ReservationSerializer),
+        pk=reservation_pk
+    )
 
-    if requestor.has_perm('reservations.retrieve_any_reservations'):
+    if permissions.has_perm(requestor, 'reservations.retrieve_any_reservations'):
         pass
-    elif requestor.has_perm('reservations.retrieve_own_reservations'):
+    elif permissions.has_perm(requestor, 'reservations.retrieve_own_reservations'):
         if requestor.account.id != reservation.author.id:
             raise exceptions.NotFound()
     else:
@@ -375,7 +700,7 @@ def retrieve_reservation(requestor, *, reservation_pk, query_params):
 
 def filter_airlines(requestor, query_params):
     '''Filter Airline Information'''
-    if not requestor.has_perm('reservations.view_airline'):
+    if not permissions.has_perm(requestor, 'reservations.view_airline'):
         raise exceptions.PermissionDenied('Insufficient Permission.')
 
     airlines = Airline.objects.all().order_by('code')
@@ -390,6 +715,69 @@ def filter_airlines(requestor, query_params):
     return airlines
 
 
+def search_airports(requestor, query_params):
+    '''Airport autocomplete (served from the airport index)'''
+    if not permissions.has_perm(requestor, 'reservations.view_airport'):
+        raise exceptions.PermissionDenied('Insufficient Permission.')
+
+    limit = _bounded_int_param_(
+        query_params, 'limit',
+        default=AIRPORT_SEARCH_LIMIT, minimum=1, maximum=AIRPORT_SEARCH_MAX_LIMIT)
+
+    return airport_index.search_airports(
+        query_params.get('q', ''),
+        limit=limit
+    )
+
+
+def nearest_airports(requestor, query_params):
+    '''Airports closest to a point (`lat`, `lon`), optionally within `radius_km`'''
+    if not permissions.has_perm(requestor, 'reservations.view_airport'):
+        raise exceptions.PermissionDenied('Insufficient Permission.')
+
+    utils.validate_fields_present(
+        query_params, 'lat', 'lon', raise_exception=True)
+    latitude = _float_param_(query_params, 'lat', minimum=-90, maximum=90)
+    longitude = _float_param_(query_params, 'lon', minimum=-180, maximum=180)
+    radius_km = _float_param_(
+        query_params, 'radius_km', minimum=0, maximum=NEAREST_AIRPORTS_MAX_KM)
+    limit = _bounded_int_param_(
+        query_params, 'limit',
+        default=NEAREST_AIRPORTS_LIMIT, minimum=1,
+        maximum=NEAREST_AIRPORTS_MAX_LIMIT)
+
+    airports = airport_index.get_airport_index().airports
+    return [
+        dict(airports[code], distance_km=round(distance, 1))
+        for code, distance in geo_index.get_geo_index().nearest(
+            latitude, longitude, limit=limit, radius_km=radius_km)
+        if code in airports
+    ]
+
+
+def filter_destinations(requestor, *, airport_code, query_params):
+    '''Airports flown to from an airport, direct or with `max_stops` stops'''
+    if not permissions.has_perm(requestor, 'reservations.view_airport'):
+        raise exceptions.PermissionDenied('Insufficient Permission.')
+
+    airports = airport_index.get_airport_index().airports
+    if airport_code not in airports:
+        raise exceptions.NotFound()
+
+    max_stops = _bounded_int_param_(
+        query_params, 'max_stops',
+        default=0, minimum=0, maximum=ITINERARY_MAX_STOPS)
+
+    reachable = route_network.get_route_network().reachable(
+        [airport_code], max_stops + 1)
+    return [
+        dict(airports[code], stops=legs - 1)
+        for code, legs in sorted(
+            reachable.items(), key=lambda item: (item[1], item[0]))
+        if code in airports
+    ]
+
+
 def send_reservation_email(requestor, reservation_pk):
     '''Send Reservation Email'''
     reservation = _retrieve_single_reservation_(requestor, reservation_pk)
@@ -0,0 +1,46 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from app.reservations import (
+    airport_index,
+    geo_index,
+    reference_data,
+    route_network
+)
+
+from .models import Airline, Airport, Flight, FlightSchedule
+
+
+@receiver(post_save, sender=Airport)
+@receiver(post_delete, sender=Airport)
+@receiver(post_save, sender=Airline)
+@receiver(post_delete, sender=Airline)
+def invalidate_reference_data(sender, instance, **kwargs):
+    '''
+    Drop cached Airport/Airline representations when they change, once
+    committed so another worker can not cache the old row again meanwhile
+    '''
+    pk = instance.pk
+    transaction.on_commit(lambda: reference_data.invalidate(sender, pk))
+
+
+@receiver(post_save, sender=Airport)
+@receiver(post_delete, sender=Airport)
+def reset_airport_index(sender, **kwargs):
+    '''Rebuild the airport search and geo indexes after an airport changes'''
+    airport_index.reset_airport_index()
+    geo_index.reset_geo_index()
+
+
+@receiver(post_save, sender=Flight)
+@receiver(post_save, sender=FlightSchedule)
+def add_route(sender, instance, created, **kwargs):
+    '''Keep the route network in step with newly scheduled routes'''
+    if not created:
+        return
+    origin, destination = (
+        instance.departure_airport_id, instance.arrival_airport_id)
+    added_at = instance.created_at
+    transaction.on_commit(lambda: route_network.route_added(
+        origin, destination, added_at=added_at))
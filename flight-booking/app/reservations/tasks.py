@@ -6,6 +6,7 @@ from app.reservations.models import Reservation
 from django.conf import settings
 
 from app.helpers import mails
+from app.reservations import schedules
 
 
 @decorators.task(name='send_reservation_information',
@@ -54,3 +55,9 @@ def send_reservation_information(self, reservation_id):
         pass
     except Exception as exc:
         self.retry(exc=exc)
+
+
+@decorators.task(name='materialize_flight_schedules')
+def materialize_flight_schedules(schedule_id=None):
+    '''Create flights for recurring schedules up to the rolling horizon'''
+    return schedules.materialize_flight_schedules(schedule_pk=schedule_id)
@@ -0,0 +1,32 @@
+from django.test import TestCase
+
+from app.reservations import airport_index
+
+
+class AirportIndexTests(TestCase):
+    '''Airport search index - free text location to airport codes'''
+
+    def setUp(self):
+        airport_index.reset_airport_index()
+
+    def test_resolve_words(self):
+        '''Airport index - every word must start a city/country/name word'''
+        self.assertEqual(
+            airport_index.resolve_location('London Heathrow'), {'LHR'}
+        )
+        self.assertEqual(
+            airport_index.resolve_location('heath lond'), {'LHR'}
+        )
+        self.assertIn('LOS', airport_index.resolve_location('Lagos'))
+        self.assertEqual(airport_index.resolve_location('Xyzzy'), set())
+
+    def test_resolve_accent_folded(self):
+        '''Airport index - accents and case are ignored'''
+        self.assertIn('RAO', airport_index.resolve_location('ribeirao preto'))
+        self.assertIn('MID', airport_index.resolve_location('MÉRIDA'))
+
+    def test_resolve_codes(self):
+        '''Airport index - IATA and ICAO codes'''
+        self.assertEqual(airport_index.resolve_location('LOS'), {'LOS'})
+        self.assertEqual(airport_index.resolve_location('EGLL'), {'LHR'})
+        self.assertIn('LOS', airport_index.resolve_location('los'))
@@ -13,6 +13,7 @@ from django.test import override_settings, utils as django_utils
 from app.accounts.tests import factory as user_factory
 from app.helpers import utils
 from app.reservations.tests import factory as reservation_factory
+from app.reservations.models import Flight
 
 
 class AirlineSchedule(APITestCase):
@@ -762,4 +763,159 @@ class AirlineScheduleValid(AirlineSchedule):
         )
         payload = response.data.get('payload')
         self.assertTrue(response.data.get('success'))
-        self.assertGreaterEqual(len(payload), 1)
+        self.assertGreaterEqual(len(payload.get('results')), 1)
+
+    def test_filter_airline_schedule_by_date(self):
+        '''List/Filter Airline Flight Schedule - Valid :- Filter by date'''
+        expected_departure = timezone.now() + timedelta(days=2)
+        reservation_factory.create_single_flight(
+            airline='WT',
+            expected_departure=expected_departure,
+            expected_arrival=expected_departure + timedelta(hours=6),
+        )
+        reservation_factory.create_single_flight(
+            airline='WT',
+            expected_departure=expected_departure + timedelta(days=1),
+            expected_arrival=expected_departure + timedelta(days=1, hours=6),
+        )
+        response = self.client.get(
+            reverse(
+                'airlines-schedule',
+                kwargs={
+                    'version': 'v1',
+                    'pk': 'WT'
+                }
+            ),
+            data={
+                'date': expected_departure.date().isoformat()
+            },
+            HTTP_AUTHORIZATION=utils.generate_token(self.super_user)
+        )
+        payload = response.data.get('payload')
+        self.assertTrue(response.data.get('success'))
+        self.assertEqual(len(payload.get('results')), 1)
+
+    def test_schedule_airline_daily_flights_returns_only_new(self):
+        '''Create Daily Schedule Flight for Airline - Valid :- Already scheduled days skipped'''
+        url = reverse(
+            'airlines-daily-schedule',
+            kwargs={
+                'version': 'v1',
+                'pk': 'BA'
+            }
+        )
+        self.client.post(
+            url,
+            data={**self.flight_schedule, 'period': 5},
+            HTTP_AUTHORIZATION=utils.generate_token(self.super_user)
+        )
+        response = self.client.post(
+            url,
+            data=self.flight_schedule,
+            HTTP_AUTHORIZATION=utils.generate_token(self.super_user)
+        )
+        payload = response.data.get('payload')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            len(payload), self.flight_schedule.get('period') - 5
+        )
+
+    def test_publish_airline_recurring_schedule(self):
+        '''Publish Recurring Schedule for Airline - Valid :- No flights written up front'''
+        today = timezone.now().date()
+        response = self.client.post(
+            reverse(
+                'airlines-recurring-schedule',
+                kwargs={
+                    'version': 'v1',
+                    'pk': 'BA'
+                }
+            ),
+            data={
+                'flight_number': '0808',
+                'departure_airport': 'LHR',
+                'arrival_airport': 'LOS',
+                'time_of_flight': '17:00:00',
+                'flight_duration': '6:00:00',
+                'days_of_week': [0, 2, 4],
+                'valid_from': today,
+                'valid_until': today + timedelta(days=180),
+                'excluded_dates': [today + timedelta(days=7)],
+            },
+            HTTP_AUTHORIZATION=utils.generate_token(self.super_user)
+        )
+        payload = response.data.get('payload')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(payload.get('days_of_week'), [0, 2, 4])
+        self.assertEqual(
+            payload.get('excluded_dates'),
+            [(today + timedelta(days=7)).isoformat()]
+        )
+        self.assertFalse(
+            Flight.objects.filter(flight_number='0808').exists()
+        )
+
+    def test_publish_airline_recurring_schedule_invalid_window(self):
+        '''Publish Recurring Schedule for Airline - Invalid :- valid_until before valid_from'''
+        today = timezone.now().date()
+        response = self.client.post(
+            reverse(
+                'airlines-recurring-schedule',
+                kwargs={
+                    'version': 'v1',
+                    'pk': 'BA'
+                }
+            ),
+            data={
+                'flight_number': '0808',
+                'departure_airport': 'LHR',
+                'arrival_airport': 'LOS',
+                'time_of_flight': '17:00:00',
+                'flight_duration': '6:00:00',
+                'days_of_week': [0],
+                'valid_from': today,
+                'valid_until': today - timedelta(days=1),
+            },
+            HTTP_AUTHORIZATION=utils.generate_token(self.super_user)
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data.get('errors').get('valid_until')['message'],
+            'Must not be before valid_from.'
+        )
+
+    def test_filter_airlines_cursor_pagination(self):
+        '''Filter list of all Airlines - Valid: Cursor pagination'''
+        url = reverse(
+            'airlines-list',
+            kwargs={
+                'version': 'v1',
+            }
+        )
+        first_page = self.client.get(
+            url,
+            data={
+                'pagination': 'cursor',
+                'page_size': 3
+            },
+            HTTP_AUTHORIZATION=utils.generate_token(self.super_user)
+        ).data.get('payload')
+        second_page = self.client.get(
+            first_page.get('next'),
+            HTTP_AUTHORIZATION=utils.generate_token(self.super_user)
+        ).data.get('payload')
+        page_number_results = self.client.get(
+            url,
+            data={
+                'page_size': 6
+            },
+            HTTP_AUTHORIZATION=utils.generate_token(self.super_user)
+        ).data.get('payload').get('results')
+
+        self.assertEqual(
+            first_page.get('results') + second_page.get('results'),
+            page_number_results
+        )
@@ -0,0 +1,78 @@
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from app.accounts.tests import factory as user_factory
+
+from app.helpers import utils
+from app.reservations import airport_index
+
+
+class AirportSearch(APITestCase):
+    def setUp(self):
+        self.user = user_factory.create_user(
+            email='test@example.com',
+            password='testuserpassword',
+            username='testuser',
+            first_name='example',
+            last_name='demo'
+        )
+        airport_index.reset_airport_index()
+
+    def tearDown(self):
+        self.user.delete()
+
+    def _search_(self, **data):
+        return self.client.get(
+            reverse(
+                'airports-list',
+                kwargs={
+                    'version': 'v1',
+                }
+            ),
+            data=data,
+            HTTP_AUTHORIZATION=utils.generate_token(self.user)
+        )
+
+    def test_search_airports_no_permission(self):
+        '''Search Airports - Invalid :- No permission (not logged in maybe)'''
+        response = self.client.get(
+            reverse(
+                'airports-list',
+                kwargs={
+                    'version': 'v1',
+                }
+            ),
+            data={
+                'q': 'london'
+            }
+        )
+        self.assertFalse(response.data.get('success'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_search_airports_ranked(self):
+        '''Search Airports - Valid :- Busiest matching airports first'''
+        response = self._search_(q='london', limit=3)
+        payload = response.data.get('payload')
+
+        self.assertTrue(response.data.get('success'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(payload), 3)
+        self.assertEqual(payload[0].get('code'), 'LHR')
+        self.assertEqual(payload[0].get('icao'), 'EGLL')
+
+    def test_search_airports_code(self):
+        '''Search Airports - Valid :- Exact IATA/ICAO code first'''
+        self.assertEqual(
+            self._search_(q='LOS').data.get('payload')[0].get('code'), 'LOS'
+        )
+        self.assertEqual(
+            self._search_(q='dnmm').data.get('payload')[0].get('code'), 'LOS'
+        )
+
+    def test_search_airports_empty_query(self):
+        '''Search Airports - Valid :- No query'''
+        response = self._search_()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data.get('payload'), [])
@@ -1,3 +1,4 @@
+import json
 import uuid
 from django.utils import timezone
 from datetime import timedelta
@@ -16,7 +17,8 @@ from app.reservations.tests.factory import create_return_flight, make_reservatio
 
 from app.helpers import utils
 from app.reservations.models import (
-    Reservation
+    Reservation,
+    SeatInventory
 )
 
 
@@ -289,7 +291,7 @@ class FlightReservationValid(FlightReservation):
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(
-            len(payload), 2
+            len(payload.get('results')), 2
         )
 
     def test_list_flights_filter_dates(self):
@@ -334,7 +336,7 @@ class FlightReservationValid(FlightReservation):
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(
-            len(payload), 1
+            len(payload.get('results')), 1
         )
 
     def test_list_flights_filter_by_arrival_airport(self):
@@ -358,7 +360,101 @@ class FlightReservationValid(FlightReservation):
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(
-            len(payload), 1
+            len(payload.get('results')), 1
+        )
+
+    @override_settings(LOCATION_SEARCH_BACKEND='trigram')
+    def test_list_flights_filter_trigram_backend(self):
+        '''List/Filter Flights - Valid :-Filter by Airports (database search backend)'''
+        response = self.client.get(
+            reverse(
+                'flights-list',
+                kwargs={
+                    'version': 'v1',
+                }
+            ),
+            data={
+                'from': 'heathrow',
+                'destination': 'lagos'
+            },
+            HTTP_AUTHORIZATION=utils.generate_token(self.user)
+        )
+        payload = response.data.get('payload')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(payload.get('results')), 1)
+        self.assertEqual(
+            payload.get('results')[0].get('departure_airport'), 'LHR'
+        )
+
+    def test_list_flights_filter_blank_location(self):
+        '''List/Filter Flights - Valid :- Blank airport filters are ignored'''
+        response = self.client.get(
+            reverse(
+                'flights-list',
+                kwargs={
+                    'version': 'v1',
+                }
+            ),
+            data={
+                'from': '',
+                'destination': ' '
+            },
+            HTTP_AUTHORIZATION=utils.generate_token(self.user)
+        )
+        payload = response.data.get('payload')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(payload.get('results')), 2)
+
+    def test_list_flights_paginated(self):
+        '''List/Filter Flights - Valid :- Paginated'''
+        response = self.client.get(
+            reverse(
+                'flights-list',
+                kwargs={
+                    'version': 'v1',
+                }
+            ),
+            data={
+                'page_size': 1
+            },
+            HTTP_AUTHORIZATION=utils.generate_token(self.user)
+        )
+        payload = response.data.get('payload')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(payload.get('count'), 2)
+        self.assertEqual(payload.get('total_pages'), 2)
+        self.assertEqual(len(payload.get('results')), 1)
+        self.assertIsNotNone(payload.get('next'))
+
+    def test_list_flights_stream_ndjson(self):
+        '''List/Filter Flights - Valid :- Streamed as NDJSON'''
+        response = self.client.get(
+            reverse(
+                'flights-list',
+                kwargs={
+                    'version': 'v1',
+                }
+            ),
+            data={
+                'stream': 'ndjson',
+                'from': 'London Heathrow'
+            },
+            HTTP_AUTHORIZATION=utils.generate_token(self.user)
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+
+        flights = [
+            json.loads(line)
+            for line in b''.join(response.streaming_content).splitlines()
+        ]
+        self.assertEqual(len(flights), 1)
+        self.assertEqual(
+            flights[0].get('departure_airport_view').get('code'), 'LHR'
         )
 
     def test_make_reservation_for_flight(self):
@@ -391,3 +487,119 @@ class FlightReservationValid(FlightReservation):
             response.data.get('message'),
             'Reservation made Successfully.'
         )
+
+
+class FlightSeats(FlightReservation):
+    '''Flight seat inventory tests'''
+
+    def _set_capacity_(self, flight, capacity):
+        return self.client.put(
+            reverse(
+                'flights-seats',
+                kwargs={
+                    'version': 'v1',
+                    'pk': flight.id
+                }
+            ),
+            data={
+                'flight_class': Reservation.BUSINESS_CLASS,
+                'capacity': capacity
+            },
+            HTTP_AUTHORIZATION=utils.generate_token(self.super_user)
+        )
+
+    def _book_(self):
+        return self.client.post(
+            reverse(
+                'flights-reservations',
+                kwargs={
+                    'version': 'v1',
+                    'pk': self.flight.id
+                }
+            ),
+            HTTP_AUTHORIZATION=utils.generate_token(self.user),
+            data=self.valid_reservation_data
+        )
+
+    def test_set_flight_seats_bad_permission(self):
+        '''Set Flight Seats - Invalid :- When User does not have sufficient permission'''
+        response = self.client.put(
+            reverse(
+                'flights-seats',
+                kwargs={
+                    'version': 'v1',
+                    'pk': self.flight.id
+                }
+            ),
+            data={
+                'flight_class': Reservation.BUSINESS_CLASS,
+                'capacity': 1
+            },
+            HTTP_AUTHORIZATION=utils.generate_token(self.user)
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_make_reservation_for_flight_sold_out(self):
+        '''Make Reservation for Flight - Invalid :- No seats left in class'''
+        self._set_capacity_(self.flight, 1)
+
+        self.assertEqual(self._book_().status_code, status.HTTP_201_CREATED)
+
+        response = self._book_()
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data.get('errors').get('first_flight')['type'],
+            'sold_out'
+        )
+        self.assertEqual(
+            Reservation.objects.filter(first_flight=self.flight).count(), 1
+        )
+
+    def test_make_reservation_for_flight_return_sold_out(self):
+        '''Make Reservation for Flight - Invalid :- Return flight sold out, no seat taken'''
+        self._set_capacity_(self.flight, 5)
+        self._set_capacity_(self.flight2, 0)
+
+        response = self._book_()
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data.get('errors').get('return_flight')['type'],
+            'sold_out'
+        )
+
+        response = self.client.get(
+            reverse(
+                'flights-seats',
+                kwargs={
+                    'version': 'v1',
+                    'pk': self.flight.id
+                }
+            ),
+            HTTP_AUTHORIZATION=utils.generate_token(self.user)
+        )
+        self.assertEqual(response.data.get('payload')[0].get('remaining'), 5)
+
+    def test_set_flight_seats_after_bookings(self):
+        '''Set Flight Seats - Valid :- Bookings made before any capacity count'''
+        self._book_()
+
+        response = self._set_capacity_(self.flight, 0)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(SeatInventory.objects.filter(flight=self.flight).exists())
+
+        response = self._set_capacity_(self.flight, 3)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data.get('payload').get('remaining'), 2)
+
+    def test_set_flight_seats_below_booked(self):
+        '''Set Flight Seats - Invalid :- Capacity below booked seats'''
+        self._set_capacity_(self.flight, 2)
+        self._book_()
+
+        response = self._set_capacity_(self.flight, 0)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self._set_capacity_(self.flight, 10)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data.get('payload').get('remaining'), 9)
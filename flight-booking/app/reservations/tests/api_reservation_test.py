@@ -8,6 +8,8 @@ from rest_framework.test import APITestCase
 from rest_framework import status
 from unittest.mock import patch
 
+from django.core.cache import cache
+from django.db import connection
 from django.test import override_settings, utils as django_utils
 
 from app.accounts.tests import factory as user_factory
@@ -599,3 +601,170 @@ class ReservationValid(ReservationTests):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(payload.get('flight_class'),
                          self.return_ticket_reservation.flight_class)
+
+
+class ReservationQueryCount(ReservationTests):
+    '''Reservations tests - Query count'''
+
+    def _count_list_queries_(self, page_size):
+        with django_utils.CaptureQueriesContext(connection) as context:
+            response = self.client.get(
+                reverse(
+                    'reservations-list',
+                    kwargs={
+                        'version': 'v1',
+                    }
+                ),
+                data={
+                    'page_size': page_size
+                },
+                HTTP_AUTHORIZATION=utils.generate_token(self.super_user)
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            len(response.data.get('payload').get('results')),
+            page_size
+        )
+        return len(context.captured_queries)
+
+    def test_list_reservations_query_count_constant(self):
+        '''List/Filter All Reservations - Valid :- Query count independent of page size'''
+        for _ in range(8):
+            make_reservation_return(
+                user_account=self.user2.account,
+                first_flight=self.flight1,
+                return_flight=self.flight2,
+            )
+        # airports/airlines come from the reference data cache once warm
+        self._count_list_queries_(10)
+
+        self.assertEqual(
+            self._count_list_queries_(1),
+            self._count_list_queries_(10)
+        )
+
+
+class ReservationCursorPagination(ReservationTests):
+    '''Reservations tests - Cursor pagination'''
+
+    def test_list_reservations_cursor_pagination(self):
+        '''List/Filter All Reservations - Valid :- Cursor pages cover every reservation once'''
+        for _ in range(3):
+            make_reservation_single(
+                user_account=self.user2.account,
+                flight=self.flight,
+            )
+
+        response = self.client.get(
+            reverse(
+                'reservations-list',
+                kwargs={
+                    'version': 'v1',
+                }
+            ),
+            data={
+                'pagination': 'cursor',
+                'page_size': 2
+            },
+            HTTP_AUTHORIZATION=utils.generate_token(self.super_user)
+        )
+        reservation_ids = []
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            payload = response.data.get('payload')
+            self.assertNotIn('count', payload)
+            reservation_ids += [
+                reservation.get('id') for reservation in payload.get('results')
+            ]
+            if payload.get('next') is None:
+                break
+            response = self.client.get(
+                payload.get('next'),
+                HTTP_AUTHORIZATION=utils.generate_token(self.super_user)
+            )
+
+        self.assertEqual(len(reservation_ids), 5)
+        self.assertEqual(len(set(reservation_ids)), 5)
+
+    def test_list_reservations_invalid_cursor(self):
+        '''List/Filter All Reservations - Invalid :- Bad cursor'''
+        response = self.client.get(
+            reverse(
+                'reservations-list',
+                kwargs={
+                    'version': 'v1',
+                }
+            ),
+            data={
+                'cursor': 'not-a-cursor'
+            },
+            HTTP_AUTHORIZATION=utils.generate_token(self.super_user)
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(
+            response.data.get('errors').get('global'),
+            'Invalid cursor'
+        )
+
+
+class ReservationPaginationCount(ReservationTests):
+    '''Reservations tests - Pagination counts'''
+
+    def setUp(self):
+        super(ReservationPaginationCount, self).setUp()
+        cache.clear()
+
+    def _list_reservations_(self, **data):
+        return self.client.get(
+            reverse(
+                'reservations-list',
+                kwargs={
+                    'version': 'v1',
+                }
+            ),
+            data=data,
+            HTTP_AUTHORIZATION=utils.generate_token(self.super_user)
+        ).data.get('payload')
+
+    def test_list_reservations_total_pages(self):
+        '''List/Filter All Reservations - Valid :- total pages rounded up'''
+        payload = self._list_reservations_(page_size=1)
+
+        self.assertEqual(payload.get('count'), 2)
+        self.assertTrue(payload.get('count_is_exact'))
+        self.assertEqual(payload.get('total_pages'), 2)
+
+    @override_settings(
+        PAGINATION_COUNT_STRATEGY='capped',
+        PAGINATION_COUNT_CAP=1
+    )
+    def test_list_reservations_capped_count(self):
+        '''List/Filter All Reservations - Valid :- Capped count still pages every row'''
+        payload = self._list_reservations_(page_size=1)
+
+        self.assertEqual(payload.get('count'), 1)
+        self.assertFalse(payload.get('count_is_exact'))
+        self.assertIsNotNone(payload.get('next'))
+
+        payload = self._list_reservations_(page_size=1, page=2)
+        self.assertEqual(len(payload.get('results')), 1)
+        self.assertIsNone(payload.get('next'))
+
+    @override_settings(PAGINATION_COUNT_STRATEGY='capped')
+    def test_list_reservations_cached_count(self):
+        '''List/Filter All Reservations - Valid :- Capped count cached per filters'''
+        self.assertEqual(
+            self._list_reservations_(flight_number='0101').get('count'), 1
+        )
+
+        make_reservation_return(
+            user_account=self.user2.account,
+            first_flight=self.flight1,
+            return_flight=self.flight2,
+        )
+
+        payload = self._list_reservations_(flight_number='0101')
+        self.assertEqual(payload.get('count'), 1)
+        self.assertEqual(len(payload.get('results')), 2)
+        self.assertEqual(self._list_reservations_().get('count'), 3)
@@ -0,0 +1,355 @@
+import uuid
+from datetime import date, datetime, time, timedelta
+from django.utils import timezone
+
+from django.test import TestCase
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from app.accounts.tests import factory as user_factory
+from app.helpers import utils
+
+from app.reservations import schedules
+from app.reservations.models import (
+    Airline,
+    Airport,
+    Flight,
+    FlightSchedule,
+    Reservation
+)
+from app.reservations.tests import factory as reservation_factory
+
+
+class FlightInsertTests(TestCase):
+    '''Flight inserts - duplicates (airline, flight number, departure date)'''
+
+    def setUp(self):
+        self.expected_departure = timezone.now() + timedelta(days=2)
+
+    def _make_flight_(self, *, flight_number='0701', days=0):
+        expected_departure = self.expected_departure + timedelta(days=days)
+        return Flight(
+            airline=Airline.objects.get(code='BA'),
+            departure_airport=Airport.objects.get(code='LHR'),
+            arrival_airport=Airport.objects.get(code='LOS'),
+            expected_departure=expected_departure,
+            expected_arrival=expected_departure + timedelta(hours=6),
+            flight_number=flight_number
+        )
+
+    def test_save_duplicate_flight_skipped(self):
+        '''Flight save - duplicate flight on same day is not inserted'''
+        self._make_flight_().save()
+        self._make_flight_().save()
+
+        self.assertEqual(
+            Flight.objects.filter(flight_number='0701').count(), 1
+        )
+
+    def test_save_existing_flight_updates(self):
+        '''Flight save - saving an existing flight updates it'''
+        flight = reservation_factory.create_single_flight(
+            flight_number='0702'
+        )
+        flight.departure = flight.expected_departure
+        flight.save()
+
+        flight.refresh_from_db()
+        self.assertIsNotNone(flight.departure)
+
+    def test_insert_ignore_duplicates(self):
+        '''Flight bulk insert - reports created and skipped flights'''
+        self._make_flight_().save()
+
+        created, skipped = Flight.objects.insert_ignore_duplicates([
+            self._make_flight_(),
+            self._make_flight_(days=1),
+            self._make_flight_(days=2),
+            self._make_flight_(days=2),
+        ], batch_size=2)
+
+        self.assertEqual(len(created), 2)
+        self.assertEqual(len(skipped), 2)
+        self.assertEqual(
+            Flight.objects.filter(flight_number='0701').count(), 3
+        )
+        for flight in created:
+            self.assertEqual(
+                flight.departure_date,
+                Flight.get_departure_date(flight.expected_departure)
+            )
+
+
+class FlightLocalTimeTests(TestCase):
+    '''Flight local times - airport time zones'''
+
+    def _make_flight_(self, expected_departure, duration):
+        return Flight(
+            airline=Airline.objects.get(code='BA'),
+            departure_airport=Airport.objects.get(code='LOS'),
+            arrival_airport=Airport.objects.get(code='JFK'),
+            expected_departure=expected_departure,
+            expected_arrival=expected_departure + duration,
+            flight_number='0703'
+        )
+
+    def test_set_local_times(self):
+        '''Flight local times - local dates and UTC offsets per airport'''
+        flight = self._make_flight_(
+            datetime(2030, 1, 15, 23, 30, tzinfo=timezone.utc),
+            timedelta(hours=4))
+        flight.set_local_times()
+
+        self.assertEqual(flight.departure_date, date(2030, 1, 15))
+        self.assertEqual(flight.departure_local_date, date(2030, 1, 16))
+        self.assertEqual(flight.departure_utc_offset, 60)
+        self.assertEqual(flight.arrival_local_date, date(2030, 1, 15))
+        self.assertEqual(flight.arrival_utc_offset, -5 * 60)
+        self.assertEqual(
+            flight.get_local_departure().isoformat(),
+            '2030-01-16T00:30:00+01:00'
+        )
+        self.assertEqual(
+            flight.get_local_arrival().isoformat(),
+            '2030-01-15T22:30:00-05:00'
+        )
+
+    def test_flight_duration_past_a_day(self):
+        '''Flight duration - whole days count as hours'''
+        flight = self._make_flight_(
+            datetime(2030, 7, 1, 8, tzinfo=timezone.utc),
+            timedelta(hours=26, minutes=5))
+
+        self.assertEqual(flight.get_flight_duration(), '26 Hour(s) 5 Minute(s)')
+
+    def test_schedule_flights_local_times(self):
+        '''Flight local times - set on flights built from schedules'''
+        schedule = FlightSchedule.objects.create(
+            airline=Airline.objects.get(code='BA'),
+            flight_number='0910',
+            departure_airport=Airport.objects.get(code='LHR'),
+            arrival_airport=Airport.objects.get(code='LOS'),
+            time_of_flight=time(23, 30),
+            flight_duration=timedelta(hours=6),
+            days_of_week=0b1111111,
+            valid_from=date(2030, 7, 1),
+            valid_until=date(2030, 7, 31),
+        )
+        flight = schedule.build_flight(date(2030, 7, 1))
+
+        self.assertEqual(flight.departure_local_date, date(2030, 7, 2))
+        self.assertEqual(flight.departure_utc_offset, 60)
+        self.assertEqual(flight.arrival_local_date, date(2030, 7, 2))
+
+
+class FlightLocalDateFilter(APITestCase):
+    def setUp(self):
+        self.user = user_factory.create_user(
+            email='test@example.com',
+            password='testuserpassword',
+            username='testuser',
+            first_name='example',
+            last_name='demo'
+        )
+        # 23:30 UTC is 00:30 the next day in Lagos
+        self.departure_date = timezone.now().date() + timedelta(days=3)
+        departure = datetime.combine(
+            self.departure_date, time(23, 30)).replace(tzinfo=timezone.utc)
+        self.flight = reservation_factory.create_single_flight(
+            departure_airport='LOS',
+            arrival_airport='LHR',
+            expected_departure=departure,
+            expected_arrival=departure + timedelta(hours=6),
+            flight_number='0704'
+        )
+
+    def tearDown(self):
+        self.user.delete()
+
+    def _flights_(self, **data):
+        return self.client.get(
+            reverse(
+                'flights-list',
+                kwargs={
+                    'version': 'v1',
+                }
+            ),
+            data=data,
+            HTTP_AUTHORIZATION=utils.generate_token(self.user)
+        )
+
+    def test_filter_flights_local_date(self):
+        '''List Flights - Valid :- Filter by date at the departure airport'''
+        next_day = self.departure_date + timedelta(days=1)
+
+        response = self._flights_(local_date=self.departure_date.isoformat())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data.get('payload').get('results'), [])
+
+        response = self._flights_(local_date=next_day.isoformat())
+        results = response.data.get('payload').get('results')
+        self.assertEqual(
+            [flight['id'] for flight in results], [str(self.flight.id)])
+        self.assertEqual(results[0]['departure_local_date'], next_day.isoformat())
+        self.assertTrue(results[0]['local_departure'].endswith('+01:00'))
+
+
+class FlightScheduleTests(TestCase):
+    '''Recurring flight schedules - materialization and expansion'''
+
+    def setUp(self):
+        self.today = timezone.now().date()
+        self.schedule = FlightSchedule.objects.create(
+            airline=Airline.objects.get(code='BA'),
+            flight_number='0909',
+            departure_airport=Airport.objects.get(code='LHR'),
+            arrival_airport=Airport.objects.get(code='LOS'),
+            time_of_flight=time(23, 59),
+            flight_duration=timedelta(hours=6),
+            days_of_week=0b1111111,
+            valid_from=self.today,
+            valid_until=self.today + timedelta(days=365),
+            excluded_dates=(self.today + timedelta(days=3)).isoformat(),
+        )
+
+    def test_materialize_flight_schedules_horizon(self):
+        '''Materialize schedules - only flights within the horizon are created'''
+        created = schedules.materialize_flight_schedules(horizon_days=10)
+
+        self.assertEqual(created, 10)
+        self.assertEqual(
+            Flight.objects.filter(flight_number='0909').count(), 10
+        )
+        self.schedule.refresh_from_db()
+        self.assertEqual(
+            self.schedule.materialized_until,
+            self.today + timedelta(days=10)
+        )
+
+        created = schedules.materialize_flight_schedules(horizon_days=12)
+        self.assertEqual(created, 2)
+
+    def test_expand_flight_schedules_past_horizon(self):
+        '''Expand schedules - flights past the horizon built in memory'''
+        schedules.materialize_flight_schedules(horizon_days=10)
+        departure_date = self.today + timedelta(days=100)
+
+        flights = schedules.expand_flight_schedules(
+            FlightSchedule.objects.all(),
+            departure_date
+        )
+
+        self.assertEqual(len(flights), 1)
+        self.assertEqual(flights[0].departure_date, departure_date)
+        self.assertEqual(
+            flights[0].id,
+            self.schedule.build_flight(departure_date).id
+        )
+        self.assertEqual(
+            schedules.expand_flight_schedules(
+                FlightSchedule.objects.all(),
+                self.today + timedelta(days=5)
+            ),
+            []
+        )
+
+    def test_materialize_flight_schedules_departed(self):
+        '''Materialize schedules - flights already departed are not created'''
+        self.schedule.time_of_flight = time(0, 0)
+        self.schedule.excluded_dates = ''
+        self.schedule.save()
+
+        created = schedules.materialize_flight_schedules(horizon_days=2)
+
+        self.assertEqual(created, 2)
+        self.assertFalse(
+            Flight.objects.filter(departure_date=self.today).exists())
+
+    def test_materialize_flight(self):
+        '''Materialize flight - an expanded flight is created from its id'''
+        schedules.materialize_flight_schedules(horizon_days=10)
+        expanded = self.schedule.build_flight(self.today + timedelta(days=100))
+
+        flight = schedules.materialize_flight(str(expanded.id))
+
+        self.assertEqual(flight.id, expanded.id)
+        self.assertEqual(flight.departure_date, expanded.departure_date)
+        self.assertTrue(Flight.objects.filter(pk=expanded.id).exists())
+        self.assertEqual(schedules.materialize_flight(expanded.id), flight)
+
+    def test_materialize_flight_not_scheduled(self):
+        '''Materialize flight - ids of no upcoming occurrence are ignored'''
+        self.assertIsNone(schedules.materialize_flight('not-an-id'))
+        self.assertIsNone(schedules.materialize_flight(uuid.uuid4()))
+        self.assertIsNone(schedules.materialize_flight(
+            self.schedule.build_flight(self.today + timedelta(days=3)).id))
+        self.assertIsNone(schedules.materialize_flight(
+            self.schedule.build_flight(self.today + timedelta(days=400)).id))
+        self.assertFalse(Flight.objects.filter(flight_number='0909').exists())
+
+
+class ExpandedFlightTests(APITestCase):
+    '''Flights past the materialized horizon fetched and booked by id'''
+
+    def setUp(self):
+        self.user = user_factory.create_user()
+        today = timezone.now().date()
+        schedule = FlightSchedule.objects.create(
+            airline=Airline.objects.get(code='BA'),
+            flight_number='0909',
+            departure_airport=Airport.objects.get(code='LHR'),
+            arrival_airport=Airport.objects.get(code='LOS'),
+            time_of_flight=time(12, 0),
+            flight_duration=timedelta(hours=6),
+            days_of_week=0b1111111,
+            valid_from=today,
+            valid_until=today + timedelta(days=365),
+        )
+        self.flight_id = schedule.build_flight(today + timedelta(days=100)).id
+
+    def test_retrieve_expanded_flight(self):
+        '''Retrieve Flight - Valid :- Flight expanded from a schedule'''
+        response = self.client.get(
+            reverse('flights-detail', kwargs={
+                'version': 'v1',
+                'pk': self.flight_id
+            }),
+            HTTP_AUTHORIZATION=utils.generate_token(self.user)
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data.get('payload').get('id'), str(self.flight_id))
+        self.assertFalse(Flight.objects.filter(pk=self.flight_id).exists())
+
+    def test_book_expanded_flight(self):
+        '''Make Reservation - Valid :- Flight expanded from a schedule'''
+        response = self.client.post(
+            reverse('reservations-list', kwargs={'version': 'v1'}),
+            data={
+                'first_flight': self.flight_id,
+                'flight_class': Reservation.ECONOMY_CLASS,
+                'ticket_type': Reservation.ONE_WAY,
+            },
+            HTTP_AUTHORIZATION=utils.generate_token(self.user)
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(
+            Reservation.objects.filter(first_flight=self.flight_id).exists())
+
+    def test_book_expanded_flight_invalid(self):
+        '''Make Reservation - Invalid :- Failed booking leaves no flight behind'''
+        response = self.client.post(
+            reverse('reservations-list', kwargs={'version': 'v1'}),
+            data={
+                'first_flight': self.flight_id,
+                'flight_class': 'none',
+                'ticket_type': Reservation.ONE_WAY,
+            },
+            HTTP_AUTHORIZATION=utils.generate_token(self.user)
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Flight.objects.filter(pk=self.flight_id).exists())
@@ -0,0 +1,193 @@
+from datetime import timedelta
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from app.accounts.tests import factory as user_factory
+from app.helpers import utils
+from app.reservations import airport_index, geo_index
+from app.reservations.geo_index import GeoIndex
+from app.reservations.tests import factory as reservation_factory
+
+AIRPORTS = [
+    ('LHR', '51.4703', '-0.45342'),
+    ('LGW', '51.1568', '-0.16988'),
+    ('LCY', '51.5039', '0.04981'),
+    ('JFK', '40.6437', '-73.79'),
+    ('LOS', '6.575', '3.3222'),
+]
+
+
+class GeoIndexTests(SimpleTestCase):
+    '''Airport geo index - great circle distances'''
+
+    def test_route_distances(self):
+        '''Geo index - distances of code pairs, None for unknown airports'''
+        index = GeoIndex(AIRPORTS)
+        heathrow_jfk, heathrow_gatwick, unknown = index.route_distances([
+            ('LHR', 'JFK'), ('LHR', 'LGW'), ('LHR', 'XXX')
+        ])
+
+        self.assertAlmostEqual(heathrow_jfk, 5540.7, delta=0.1)
+        self.assertAlmostEqual(heathrow_gatwick, 40.0, delta=0.1)
+        self.assertIsNone(unknown)
+        self.assertEqual(index.route_distances([]), [])
+
+    def test_nearest(self):
+        '''Geo index - closest airports first, optionally within a radius'''
+        index = GeoIndex(AIRPORTS)
+
+        self.assertEqual(
+            [code for code, _ in index.nearest(51.5, -0.1, limit=3)],
+            ['LCY', 'LHR', 'LGW']
+        )
+        nearest = index.nearest(51.4703, -0.45342, limit=10, radius_km=100)
+        self.assertEqual(
+            [code for code, _ in nearest], ['LHR', 'LCY', 'LGW'])
+        self.assertAlmostEqual(nearest[0][1], 0, delta=0.001)
+
+    def test_within(self):
+        '''Geo index - alternate airports near any of the codes'''
+        index = GeoIndex(AIRPORTS)
+
+        self.assertEqual(index.within(['LHR'], 10), {'LHR'})
+        self.assertEqual(index.within(['LHR'], 50), {'LHR', 'LGW', 'LCY'})
+        self.assertEqual(
+            index.within(['LGW', 'LOS'], 45), {'LGW', 'LHR', 'LCY', 'LOS'})
+        self.assertEqual(index.within(['XXX'], 50), {'XXX'})
+
+    def test_within_broad_match(self):
+        '''Geo index - a match of many airports is not expanded'''
+        index = GeoIndex(AIRPORTS)
+
+        self.assertEqual(
+            index.within(['LHR', 'LOS'], 50, max_codes=1), {'LHR', 'LOS'})
+        self.assertEqual(
+            index.within(['LHR', 'LOS'], 50, max_codes=2),
+            {'LHR', 'LGW', 'LCY', 'LOS'}
+        )
+
+
+class NearestAirports(APITestCase):
+    def setUp(self):
+        self.user = user_factory.create_user(
+            email='test@example.com',
+            password='testuserpassword',
+            username='testuser',
+            first_name='example',
+            last_name='demo'
+        )
+        geo_index.reset_geo_index()
+
+    def tearDown(self):
+        self.user.delete()
+
+    def _nearest_(self, **data):
+        return self.client.get(
+            reverse(
+                'airports-nearest',
+                kwargs={
+                    'version': 'v1',
+                }
+            ),
+            data=data,
+            HTTP_AUTHORIZATION=utils.generate_token(self.user)
+        )
+
+    def test_nearest_airports(self):
+        '''Nearest Airports - Valid :- Closest first with distance'''
+        response = self._nearest_(lat=51.4703, lon=-0.45342, limit=3)
+        payload = response.data.get('payload')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(payload), 3)
+        self.assertEqual(payload[0]['code'], 'LHR')
+        self.assertEqual(payload[0]['distance_km'], 0)
+        self.assertLessEqual(
+            payload[1]['distance_km'], payload[2]['distance_km'])
+
+    def test_nearest_airports_invalid_point(self):
+        '''Nearest Airports - Invalid :- Latitude out of range'''
+        response = self._nearest_(lat=95, lon=0)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('lat', response.data.get('errors'))
+
+    def test_nearest_airports_missing_point(self):
+        '''Nearest Airports - Invalid :- Missing fields'''
+        response = self._nearest_(lat=51)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('lon', response.data.get('errors'))
+
+
+class AlternateAirportFlights(APITestCase):
+    def setUp(self):
+        self.user = user_factory.create_user(
+            email='test@example.com',
+            password='testuserpassword',
+            username='testuser',
+            first_name='example',
+            last_name='demo'
+        )
+        geo_index.reset_geo_index()
+        departure = timezone.now() + timedelta(days=1)
+        self.gatwick_flight = reservation_factory.create_single_flight(
+            departure_airport='LGW',
+            arrival_airport='LOS',
+            expected_departure=departure,
+            expected_arrival=departure + timedelta(hours=6),
+            flight_number='0901'
+        )
+
+    def tearDown(self):
+        self.user.delete()
+
+    def _flights_(self, **data):
+        return self.client.get(
+            reverse(
+                'flights-list',
+                kwargs={
+                    'version': 'v1',
+                }
+            ),
+            data=data,
+            HTTP_AUTHORIZATION=utils.generate_token(self.user)
+        )
+
+    def test_filter_flights_alternate_airports(self):
+        '''List Flights - Valid :- Departures from airports within_km'''
+        response = self._flights_(**{'from': 'LHR'})
+        self.assertEqual(response.data.get('payload').get('results'), [])
+
+        response = self._flights_(**{'from': 'LHR', 'within_km': 50})
+        results = response.data.get('payload').get('results')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [flight['id'] for flight in results], [str(self.gatwick_flight.id)])
+        self.assertGreater(results[0]['distance_km'], 4000)
+
+    def test_filter_flights_broad_location(self):
+        '''List Flights - Valid :- within_km of a location matching many airports'''
+        self.assertGreater(
+            len(airport_index.resolve_location('a')), geo_index.WITHIN_MAX_CODES)
+
+        response = self._flights_(**{'from': 'a', 'within_km': 300})
+        results = response.data.get('payload').get('results')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            results,
+            self._flights_(**{'from': 'a'}).data.get('payload').get('results')
+        )
+
+    def test_filter_flights_invalid_radius(self):
+        '''List Flights - Invalid :- within_km out of range'''
+        response = self._flights_(**{'from': 'LHR', 'within_km': 'far'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('within_km', response.data.get('errors'))
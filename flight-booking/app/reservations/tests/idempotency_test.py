@@ -0,0 +1,98 @@
+import uuid
+from unittest.mock import patch
+
+from django.core.cache import cache
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from app.accounts.tests import factory as user_factory
+from app.helpers import idempotency, utils
+from app.reservations.models import Reservation
+from app.reservations.tests.factory import create_single_flight
+
+
+class IdempotencyKeyTests(APITestCase):
+    '''Idempotency-Key on reservation creation'''
+
+    def setUp(self):
+        self.user = user_factory.create_user()
+        self.other_user = user_factory.create_user(
+            email='other@example.com', username='otheruser')
+        self.flight = create_single_flight()
+        self.url = reverse('reservations-list', kwargs={'version': 'v1'})
+        self.data = {
+            'first_flight': self.flight.id,
+            'flight_class': Reservation.ECONOMY_CLASS,
+            'ticket_type': Reservation.ONE_WAY,
+        }
+        self.key = uuid.uuid4().hex
+
+    def _post_(self, data, *, user=None, key=None):
+        return self.client.post(
+            self.url,
+            data=data,
+            HTTP_AUTHORIZATION=utils.generate_token(user or self.user),
+            HTTP_IDEMPOTENCY_KEY=key or self.key
+        )
+
+    def test_retry_is_replayed(self):
+        '''Idempotency-Key - retries get the first response, one reservation'''
+        first = self._post_(self.data)
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn(idempotency.REPLAYED_HEADER, first)
+
+        with self.assertNumQueries(0):
+            retry = self._post_(self.data)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry[idempotency.REPLAYED_HEADER], 'true')
+        self.assertEqual(
+            retry.data.get('payload').get('id'),
+            first.data.get('payload').get('id')
+        )
+        self.assertEqual(
+            Reservation.objects.filter(first_flight=self.flight).count(), 1)
+
+    def test_keys_are_per_user(self):
+        '''Idempotency-Key - the same key from another user is a new request'''
+        self._post_(self.data)
+        response = self._post_(self.data, user=self.other_user)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn(idempotency.REPLAYED_HEADER, response)
+        self.assertEqual(
+            Reservation.objects.filter(first_flight=self.flight).count(), 2)
+
+    def test_key_reused_for_other_request(self):
+        '''Idempotency-Key - a key can not be reused with a different body'''
+        self._post_(self.data)
+        response = self._post_(dict(self.data, flight_class=Reservation.FIRST_CLASS))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data.get('errors').get('Idempotency-Key').get('type'),
+            'mismatch'
+        )
+
+    def test_failed_request_is_not_kept(self):
+        '''Idempotency-Key - a failed request can be retried with its key'''
+        response = self._post_({})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self._post_(self.data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn(idempotency.REPLAYED_HEADER, response)
+
+    def test_request_in_progress(self):
+        '''Idempotency-Key - a retry while the first still runs is a conflict'''
+        cache.set(
+            idempotency._cache_key_(self.user.pk, self.key),
+            {'fingerprint': 'first request'}
+        )
+        with patch.object(
+                idempotency, '_fingerprint_', return_value='first request'):
+            response = self._post_(self.data)
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(
+            Reservation.objects.filter(first_flight=self.flight).exists())
@@ -0,0 +1,181 @@
+from datetime import datetime, time, timedelta
+
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from app.accounts.tests import factory as user_factory
+from app.helpers import utils
+from app.reservations import itineraries
+from app.reservations.itineraries import DepartureIndex, Leg
+from app.reservations.tests import factory as reservation_factory
+
+HOUR = 60 * 60
+
+
+class DepartureIndexTests(SimpleTestCase):
+    '''Itinerary search - departure index'''
+
+    def setUp(self):
+        self.index = DepartureIndex([
+            Leg(1, 'LOS', 'JFK', 1 * HOUR, 13 * HOUR),
+            Leg(2, 'LOS', 'LHR', 0 * HOUR, 6 * HOUR),
+            Leg(3, 'LHR', 'JFK', 6 * HOUR + 30 * 60, 14 * HOUR),
+            Leg(4, 'LHR', 'JFK', 8 * HOUR, 15 * HOUR),
+            Leg(5, 'LOS', 'CDG', 0 * HOUR, 6 * HOUR),
+            Leg(6, 'CDG', 'LHR', 7 * HOUR, 8 * HOUR),
+            Leg(7, 'LHR', 'LOS', 9 * HOUR, 15 * HOUR),
+            Leg(8, 'LHR', 'JFK', 9 * HOUR, 16 * HOUR),
+        ])
+
+    def _search_(self, **kwargs):
+        options = {
+            'start': 0,
+            'end': 24 * HOUR,
+            'max_legs': 3,
+            'limit': 5,
+            'connection_time': lambda airport: HOUR,
+            'max_layover': 12 * HOUR,
+        }
+        options.update(kwargs)
+        return [
+            [leg.flight_id for leg in itinerary]
+            for itinerary in self.index.search(['LOS'], ['JFK'], **options)
+        ]
+
+    def test_search_ranked_by_arrival(self):
+        '''Itinerary search - direct and connecting, earliest arrival first'''
+        self.assertEqual(self._search_(), [[1], [2, 4], [2, 8], [5, 6, 8]])
+        self.assertEqual(
+            self._search_(max_legs=2), [[1], [2, 4], [2, 8]]
+        )
+
+    def test_search_minimum_connection_time(self):
+        '''Itinerary search - connections shorter than the minimum are skipped'''
+        self.assertNotIn([2, 3], self._search_())
+        self.assertIn(
+            [2, 3],
+            self._search_(connection_time=lambda airport: 15 * 60)
+        )
+
+    def test_search_max_legs_and_limit(self):
+        '''Itinerary search - bounded number of flights and results'''
+        self.assertEqual(self._search_(max_legs=1), [[1]])
+        self.assertEqual(self._search_(limit=1), [[1]])
+        self.assertEqual(self._search_(start=2 * HOUR), [])
+
+
+class ItinerarySearch(APITestCase):
+    def setUp(self):
+        self.user = user_factory.create_user(
+            email='test@example.com',
+            password='testuserpassword',
+            username='testuser',
+            first_name='example',
+            last_name='demo'
+        )
+        itineraries.clear_departure_indexes()
+
+        self.departure_date = timezone.now().date() + timedelta(days=3)
+        departure = datetime.combine(
+            self.departure_date, time(6)).replace(tzinfo=timezone.utc)
+        self.first_flight = reservation_factory.create_single_flight(
+            departure_airport='LOS',
+            arrival_airport='LHR',
+            expected_departure=departure,
+            expected_arrival=departure + timedelta(hours=6),
+            flight_number='0801'
+        )
+        self.second_flight = reservation_factory.create_single_flight(
+            departure_airport='LHR',
+            arrival_airport='JFK',
+            expected_departure=departure + timedelta(hours=8),
+            expected_arrival=departure + timedelta(hours=16),
+            flight_number='0802'
+        )
+
+    def tearDown(self):
+        self.user.delete()
+        itineraries.clear_departure_indexes()
+
+    def _search_(self, data):
+        return self.client.get(
+            reverse(
+                'itineraries-list',
+                kwargs={
+                    'version': 'v1',
+                }
+            ),
+            data=data,
+            HTTP_AUTHORIZATION=utils.generate_token(self.user)
+        )
+
+    def test_search_itineraries_connecting(self):
+        '''Search Itineraries - Valid :- One stop'''
+        response = self._search_({
+            'from': 'LOS',
+            'to': 'JFK',
+            'date': self.departure_date.isoformat()
+        })
+        payload = response.data.get('payload')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(payload), 1)
+        self.assertEqual(payload[0].get('stops'), 1)
+        self.assertEqual(
+            [flight.get('id') for flight in payload[0].get('flights')],
+            [str(self.first_flight.id), str(self.second_flight.id)]
+        )
+
+    def test_search_itineraries_deleted_flight(self):
+        '''Search Itineraries - Valid :- Flight deleted after indexing'''
+        data = {
+            'from': 'LOS',
+            'to': 'JFK',
+            'date': self.departure_date.isoformat()
+        }
+        self.assertEqual(len(self._search_(data).data.get('payload')), 1)
+
+        self.second_flight.delete()
+        response = self._search_(data)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data.get('payload'), [])
+
+    @override_settings(ITINERARY_INDEX_CACHE_SIZE=2)
+    def test_departure_indexes_bounded(self):
+        '''Search Itineraries - Least recently used departure windows dropped'''
+        start = timezone.now()
+        windows = [
+            (start + timedelta(days=day), start + timedelta(days=day + 1))
+            for day in range(3)
+        ]
+        first = itineraries.get_departure_index(*windows[0])
+        itineraries.get_departure_index(*windows[1])
+        self.assertIs(itineraries.get_departure_index(*windows[0]), first)
+        itineraries.get_departure_index(*windows[2])
+
+        self.assertEqual(
+            list(itineraries._indexes), [windows[0], windows[2]])
+
+    def test_search_itineraries_direct_only(self):
+        '''Search Itineraries - Valid :- No stops allowed'''
+        response = self._search_({
+            'from': 'LOS',
+            'to': 'JFK',
+            'date': self.departure_date.isoformat(),
+            'max_stops': 0
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data.get('payload'), [])
+
+    def test_search_itineraries_missing_fields(self):
+        '''Search Itineraries - Invalid :- Missing fields'''
+        response = self._search_({'from': 'LOS'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('to', response.data.get('errors'))
+        self.assertIn('date', response.data.get('errors'))
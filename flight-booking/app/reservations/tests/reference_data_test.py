@@ -0,0 +1,89 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from app.reservations import reference_data
+from app.reservations.models import Airline, Airport
+from app.reservations.serializers import AirlineSerializer, AirportSerializer
+
+
+class ReferenceDataTests(TestCase):
+    '''Airport/Airline reference data cache'''
+
+    def setUp(self):
+        cache.clear()
+        reference_data.clear_local_cache()
+
+    def tearDown(self):
+        # rolled back rows do not send signals
+        cache.clear()
+        reference_data.clear_local_cache()
+
+    def test_get_representation_read_through(self):
+        '''Reference data - database read once, then served from cache'''
+        with self.assertNumQueries(1):
+            airport = reference_data.get_representation(
+                AirportSerializer, 'LHR')
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                reference_data.get_representation(AirportSerializer, 'LHR'),
+                airport
+            )
+
+        reference_data.clear_local_cache()
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                reference_data.get_representation(AirportSerializer, 'LHR'),
+                airport
+            )
+        self.assertEqual(airport.get('code'), 'LHR')
+
+    def test_get_representation_missing(self):
+        '''Reference data - unknown code'''
+        self.assertIsNone(
+            reference_data.get_representation(AirlineSerializer, 'ZZZZ')
+        )
+
+    def test_invalidate_after_commit(self):
+        '''Reference data - the cached copy is kept until the save commits'''
+        reference_data.get_representation(AirlineSerializer, 'BA')
+
+        airline = Airline.objects.get(code='BA')
+        airline.airline_name = 'Speedbird'
+        airline.save()
+        # each test runs in a transaction that is never committed
+        self.assertNotEqual(
+            reference_data.get_representation(
+                AirlineSerializer, 'BA').get('airline_name'),
+            'Speedbird'
+        )
+
+    @patch('app.reservations.signals.transaction.on_commit',
+           side_effect=lambda func: func())
+    def test_save_and_delete_invalidate(self, on_commit):
+        '''Reference data - saving or deleting a row drops its cached copy'''
+        reference_data.get_representation(AirlineSerializer, 'BA')
+
+        airline = Airline.objects.get(code='BA')
+        airline.airline_name = 'Speedbird'
+        airline.save()
+        self.assertEqual(
+            reference_data.get_representation(
+                AirlineSerializer, 'BA').get('airline_name'),
+            'Speedbird'
+        )
+
+        airport = Airport.objects.create(
+            code='ZZZ',
+            airport_name='Test Airport',
+            city='Test',
+            country='Test',
+            latitude=0,
+            longitude=0
+        )
+        reference_data.get_representation(AirportSerializer, 'ZZZ')
+        airport.delete()
+        self.assertIsNone(
+            reference_data.get_representation(AirportSerializer, 'ZZZ')
+        )
@@ -0,0 +1,163 @@
+import io
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from app.helpers.json_stream import iter_json
+from app.reservations import reference_loader
+from app.reservations.models import Airline, Airport, Flight
+from app.reservations.tests.factory import create_single_flight
+
+
+class IterJsonTests(SimpleTestCase):
+    '''Streaming JSON decoding'''
+
+    def test_array(self):
+        '''Streaming JSON - array items across chunk boundaries'''
+        items = [{'code': 'LOS', 'lat': '6.575'}, 12345, 'text', [1, 2], None]
+        for chunk_size in (1, 3, 1024):
+            self.assertEqual(
+                list(iter_json(
+                    io.StringIO(json.dumps(items, indent=2)),
+                    chunk_size=chunk_size)),
+                items
+            )
+
+    def test_object(self):
+        '''Streaming JSON - object members as key, value pairs'''
+        members = {'BA': 'British Airways', 'DL': 'Delta Air Lines'}
+        self.assertEqual(
+            list(iter_json(io.StringIO(json.dumps(members)), chunk_size=2)),
+            list(members.items())
+        )
+
+    def test_empty_and_invalid(self):
+        '''Streaming JSON - empty documents and truncated input'''
+        self.assertEqual(list(iter_json(io.StringIO(' [ ] '))), [])
+        self.assertEqual(list(iter_json(io.StringIO('{}'))), [])
+        with self.assertRaises(ValueError):
+            list(iter_json(io.StringIO('[1, {"a": '), chunk_size=4))
+        with self.assertRaises(ValueError):
+            list(iter_json(io.StringIO('"text"')))
+
+
+class ReferenceLoaderTests(TestCase):
+    '''Reference data loader'''
+
+    def _airports_(self, *airports):
+        return io.StringIO(json.dumps(list(airports)))
+
+    def test_reload_shipped_data(self):
+        '''Reference data loader - the migrated data is already up to date'''
+        output = io.StringIO()
+        call_command('load-reference-data', stdout=output)
+
+        self.assertIn('airports: 0 created, 0 updated', output.getvalue())
+        self.assertIn('airlines: 0 created, 0 updated', output.getvalue())
+
+    def test_load_airports(self):
+        '''Reference data loader - inserts, updates and skips'''
+        counts = reference_loader.load_airports(self._airports_(
+            {
+                'code': 'ZZZ', 'name': 'Test Airport', 'city': 'Test',
+                'country': 'Nowhere', 'lat': '1.2345678', 'lon': '-2.5',
+                'icao': 'ZZZZ', 'direct_flights': '3', 'carriers': '1'
+            },
+            {
+                'code': 'LHR', 'name': 'London Heathrow Airport',
+                'city': 'Hounslow', 'country': 'United Kingdom',
+                'lat': '51.4703', 'lon': '-0.45342', 'icao': 'EGLL',
+                'direct_flights': '200', 'carriers': '99'
+            },
+            {'code': 'YYY', 'name': 'No coordinates'},
+            {'code': 'TOOLONG', 'lat': '0', 'lon': '0'},
+        ))
+
+        self.assertEqual(counts[reference_loader.CREATED], 1)
+        self.assertEqual(counts[reference_loader.UPDATED], 1)
+        self.assertEqual(counts[reference_loader.SKIPPED], 2)
+
+        airport = Airport.objects.get(code='ZZZ')
+        self.assertEqual(airport.latitude, Decimal('1.234568'))
+        self.assertEqual(airport.direct_flights, 3)
+        heathrow = Airport.objects.get(code='LHR')
+        self.assertEqual(heathrow.city, 'Hounslow')
+        self.assertEqual(heathrow.carriers, 99)
+
+    def test_load_airports_timezone_change(self):
+        '''Reference data loader - flights follow an airport's new time zone'''
+        departure = datetime(2030, 1, 1, 23, 30, tzinfo=timezone.utc)
+        flight = create_single_flight(
+            departure_airport='LHR',
+            arrival_airport='LOS',
+            expected_departure=departure,
+            expected_arrival=departure + timedelta(hours=6)
+        )
+        self.assertEqual(flight.departure_utc_offset, 0)
+
+        heathrow = Airport.objects.filter(code='LHR').values().get()
+        reference_loader.load_airports(self._airports_({
+            'code': 'LHR', 'name': heathrow['airport_name'],
+            'city': heathrow['city'], 'country': heathrow['country'],
+            'lat': str(heathrow['latitude']), 'lon': str(heathrow['longitude']),
+            'icao': heathrow['icao'],
+            'direct_flights': heathrow['direct_flights'],
+            'carriers': heathrow['carriers'], 'tz': 'Europe/Paris'
+        }))
+
+        flight = Flight.objects.get(pk=flight.pk)
+        self.assertEqual(flight.departure_utc_offset, 60)
+        self.assertEqual(
+            flight.departure_local_date, departure.date() + timedelta(days=1))
+
+    def test_load_airlines(self):
+        '''Reference data loader - airlines by code'''
+        counts = reference_loader.load_airlines(io.StringIO(json.dumps({
+            'BA': 'Speedbird', 'ZZ': 'Test Air', 'XX': None
+        })))
+
+        self.assertEqual(counts[reference_loader.CREATED], 1)
+        self.assertEqual(counts[reference_loader.UPDATED], 1)
+        self.assertEqual(counts[reference_loader.SKIPPED], 1)
+        self.assertEqual(Airline.objects.get(code='BA').airline_name, 'Speedbird')
+        self.assertTrue(Airline.objects.filter(code='ZZ').exists())
+
+    def test_load_duplicate_codes(self):
+        '''Reference data loader - the first record of a code is kept'''
+        counts = reference_loader.load_reference_data(
+            Airline,
+            [('ZZ', 'First Air'), ('YY', 'Other Air'), ('ZZ', 'Second Air')],
+            to_fields=reference_loader.airline_fields,
+            batch_size=1
+        )
+
+        self.assertEqual(counts[reference_loader.CREATED], 2)
+        self.assertEqual(counts[reference_loader.SKIPPED], 1)
+        self.assertEqual(Airline.objects.get(code='ZZ').airline_name, 'First Air')
+
+    def test_load_inserted_meanwhile(self):
+        '''Reference data loader - rows inserted by another load are updated'''
+        stored_rows = reference_loader._stored_rows_
+        reads = []
+
+        def stored_rows_(model, codes, field_names):
+            reads.append(codes)
+            # BA is not there yet on the first read
+            if len(reads) == 1:
+                return {}
+            return stored_rows(model, codes, field_names)
+
+        with patch.object(
+                reference_loader, '_stored_rows_', side_effect=stored_rows_):
+            counts = reference_loader.load_airlines(io.StringIO(json.dumps({
+                'BA': 'Speedbird', 'ZZ': 'Test Air'
+            })))
+
+        self.assertEqual(counts[reference_loader.CREATED], 1)
+        self.assertEqual(counts[reference_loader.UPDATED], 1)
+        self.assertEqual(Airline.objects.get(code='BA').airline_name, 'Speedbird')
@@ -0,0 +1,244 @@
+import os
+import tempfile
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from app.accounts.tests import factory as user_factory
+from app.helpers import utils
+from app.reservations import route_network
+from app.reservations.route_network import RouteNetwork, VERSION_KEY
+from app.reservations.tests import factory as reservation_factory
+
+ROUTES = [
+    ('LOS', 'LHR'), ('LHR', 'LOS'), ('LHR', 'JFK'), ('JFK', 'ATL'),
+    ('LOS', 'ABV'),
+]
+
+
+class RouteNetworkTests(SimpleTestCase):
+    '''Route network - adjacency arrays'''
+
+    def test_routes(self):
+        '''Route network - direct routes are looked up per direction'''
+        network = RouteNetwork.from_routes(ROUTES)
+
+        self.assertEqual(len(network), 5)
+        self.assertEqual(network.destinations('LOS'), ['ABV', 'LHR'])
+        self.assertEqual(network.destinations('ATL'), [])
+        self.assertEqual(network.destinations('XXX'), [])
+        self.assertTrue(network.has_route('LHR', 'JFK'))
+        self.assertFalse(network.has_route('JFK', 'LHR'))
+        self.assertFalse(network.has_route('LOS', 'XXX'))
+
+    def test_reachable(self):
+        '''Route network - fewest flights to every reachable airport'''
+        network = RouteNetwork.from_routes(ROUTES)
+
+        self.assertEqual(
+            network.reachable(['LOS'], 3),
+            {'LHR': 1, 'ABV': 1, 'JFK': 2, 'ATL': 3}
+        )
+        self.assertEqual(network.reachable(['LOS'], 1), {'LHR': 1, 'ABV': 1})
+        self.assertTrue(network.connects(['LOS'], ['JFK'], 2))
+        self.assertFalse(network.connects(['LOS'], ['ATL'], 2))
+        self.assertFalse(network.connects(['ATL'], ['LOS'], 3))
+
+    def test_save_load(self):
+        '''Route network - a saved network loads memory mapped'''
+        network = RouteNetwork.from_routes(ROUTES)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'routes.bin')
+            network.save(path)
+            loaded = RouteNetwork.load(path)
+
+            self.assertEqual(loaded.codes, network.codes)
+            self.assertEqual(list(loaded.offsets), list(network.offsets))
+            self.assertEqual(list(loaded.targets), list(network.targets))
+            self.assertTrue(loaded.has_route('JFK', 'ATL'))
+            self.assertEqual(
+                loaded.reachable(['LHR'], 2), network.reachable(['LHR'], 2))
+
+
+class AirportDestinations(APITestCase):
+    def setUp(self):
+        self.user = user_factory.create_user(
+            email='test@example.com',
+            password='testuserpassword',
+            username='testuser',
+            first_name='example',
+            last_name='demo'
+        )
+        route_network.reset_route_network()
+
+        departure = timezone.now() + timedelta(days=1)
+        reservation_factory.create_single_flight(
+            departure_airport='LOS',
+            arrival_airport='LHR',
+            expected_departure=departure,
+            expected_arrival=departure + timedelta(hours=6),
+            flight_number='0801'
+        )
+        reservation_factory.create_single_flight(
+            departure_airport='LHR',
+            arrival_airport='JFK',
+            expected_departure=departure + timedelta(hours=8),
+            expected_arrival=departure + timedelta(hours=16),
+            flight_number='0802'
+        )
+
+    def tearDown(self):
+        self.user.delete()
+        route_network.reset_route_network()
+
+    def _destinations_(self, airport_code, **data):
+        return self.client.get(
+            reverse(
+                'airports-destinations',
+                kwargs={
+                    'version': 'v1',
+                    'pk': airport_code
+                }
+            ),
+            data=data,
+            HTTP_AUTHORIZATION=utils.generate_token(self.user)
+        )
+
+    def test_destinations_direct(self):
+        '''Airport Destinations - Valid :- Direct flights'''
+        response = self._destinations_('LOS')
+        payload = response.data.get('payload')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([airport['code'] for airport in payload], ['LHR'])
+        self.assertEqual(payload[0]['stops'], 0)
+
+    def test_destinations_with_stops(self):
+        '''Airport Destinations - Valid :- Connecting flights'''
+        response = self._destinations_('LOS', max_stops=1)
+        payload = response.data.get('payload')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(airport['code'], airport['stops']) for airport in payload],
+            [('LHR', 0), ('JFK', 1)]
+        )
+
+    def _add_flight_(self, arrival_airport):
+        departure = timezone.now() + timedelta(days=1)
+        return reservation_factory.create_single_flight(
+            departure_airport='LOS',
+            arrival_airport=arrival_airport,
+            expected_departure=departure,
+            expected_arrival=departure + timedelta(hours=1),
+            flight_number='0803'
+        )
+
+    @patch('app.reservations.signals.transaction.on_commit',
+           side_effect=lambda func: func())
+    def test_destinations_route_added_elsewhere(self, on_commit):
+        '''Airport Destinations - Valid :- Route added by another worker'''
+        stale = route_network.get_route_network()
+        self._add_flight_('ABV')
+
+        # a worker still holding the network built before the new route
+        with patch.object(route_network, '_network', stale):
+            response = self._destinations_('LOS')
+
+        self.assertEqual(
+            [airport['code'] for airport in response.data.get('payload')],
+            ['ABV', 'LHR']
+        )
+
+    def test_route_added_once_committed(self):
+        '''Route network - workers are told of a new route after commit'''
+        version = cache.get(VERSION_KEY)
+        self._add_flight_('ABV')
+
+        # each test runs in a transaction that is never committed
+        self.assertEqual(cache.get(VERSION_KEY), version)
+
+    @patch('app.reservations.signals.transaction.on_commit',
+           side_effect=lambda func: func())
+    def test_route_added_known_route(self, on_commit):
+        '''Route network - updates and routes flown already are not news'''
+        version = cache.get(VERSION_KEY)
+        route_network.get_route_network()
+        flight = self._add_flight_('LHR')
+        flight.save()
+        # a process without a network of its own
+        route_network.reset_route_network()
+        route_network.route_added('LOS', 'LHR', added_at=timezone.now())
+        self.assertEqual(cache.get(VERSION_KEY), version)
+
+        route_network.route_added('LOS', 'ABV', added_at=timezone.now())
+        self.assertNotEqual(cache.get(VERSION_KEY), version)
+
+    def test_destinations_unknown_airport(self):
+        '''Airport Destinations - Invalid :- Unknown airport'''
+        response = self._destinations_('XXXX')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class PublishedRoutes(APITestCase):
+    def setUp(self):
+        self.super_user = user_factory.create_user(
+            email='adminuser@example.com',
+            password='adminuserpassword',
+            username='adminuser',
+            first_name='Admin',
+            last_name='User',
+            user_type='super_staff'
+        )
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'routes.bin')
+        RouteNetwork.from_routes([('JFK', 'ATL')]).save(self.path)
+        route_network.reset_route_network()
+
+    def tearDown(self):
+        self.super_user.delete()
+        route_network.reset_route_network()
+        self.directory.cleanup()
+
+    def _schedule_(self, departure_airport, arrival_airport):
+        with override_settings(ROUTE_NETWORK_FILE=self.path):
+            return self.client.post(
+                reverse(
+                    'airlines-schedule',
+                    kwargs={
+                        'version': 'v1',
+                        'pk': 'DL'
+                    }
+                ),
+                data={
+                    'expected_departure': timezone.now() + timedelta(hours=2),
+                    'expected_arrival': timezone.now() + timedelta(hours=12),
+                    'departure_airport': departure_airport,
+                    'arrival_airport': arrival_airport,
+                    'flight_number': '001a',
+                },
+                HTTP_AUTHORIZATION=utils.generate_token(self.super_user)
+            )
+
+    def test_schedule_published_route(self):
+        '''Published Routes - Valid :- Flight on a published route'''
+        response = self._schedule_('JFK', 'ATL')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_schedule_unpublished_route(self):
+        '''Published Routes - Invalid :- Flight off the published routes'''
+        response = self._schedule_('JFK', 'LHR')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data.get('errors').get('arrival_airport')['message'],
+            'No published route from JFK to LHR.'
+        )
@@ -0,0 +1,143 @@
+import json
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from app.accounts.tests import factory as user_factory
+from app.helpers import utils
+from app.helpers.renderers import FastJSONRenderer
+from app.helpers.response import Response
+from app.reservations.models import Flight, Reservation
+from app.reservations.serializers import (
+    FlightReadSerializer,
+    FlightSerializer,
+    ReservationReadSerializer,
+    ReservationSerializer
+)
+from app.reservations.tests import factory as reservation_factory
+
+
+class ReadSerializerTests(TestCase):
+    '''Read only list serializers'''
+
+    def setUp(self):
+        self.user = user_factory.create_user()
+        self.flight = reservation_factory.create_single_flight(
+            departure_airport='LHR', arrival_airport='JFK')
+        self.flight.departure = timezone.now() + timedelta(hours=3)
+        self.flight.save()
+        self.first_flight, self.return_flight = (
+            reservation_factory.create_return_flight(
+                departure_airport='LOS', arrival_airport='LHR'))
+
+        reservation_factory.make_reservation_single(
+            user_account=self.user, flight=self.flight)
+        reservation_factory.make_reservation_return(
+            user_account=self.user.account,
+            first_flight=self.first_flight,
+            return_flight=self.return_flight
+        )
+
+    def _render_(self, data):
+        return JSONRenderer().render(data)
+
+    def test_flight_output(self):
+        '''Read serializers - flights render exactly as `FlightSerializer`'''
+        flights = Flight.objects.order_by('expected_departure')
+
+        self.assertEqual(
+            self._render_(FlightReadSerializer(flights, many=True).data),
+            self._render_(FlightSerializer(flights, many=True).data)
+        )
+        self.assertEqual(
+            self._render_(FlightReadSerializer(self.flight).data),
+            self._render_(FlightSerializer(self.flight).data)
+        )
+
+    def test_reservation_output(self):
+        '''Read serializers - reservations render exactly as `ReservationSerializer`'''
+        reservations = Reservation.objects.order_by('ticket_type')
+
+        self.assertEqual(
+            self._render_(ReservationReadSerializer(
+                reservations.select_related(
+                    *ReservationReadSerializer.Meta.select_related),
+                many=True).data),
+            self._render_(ReservationSerializer(reservations, many=True).data)
+        )
+        reservation = reservations.last()
+        self.assertEqual(
+            self._render_(ReservationReadSerializer(reservation).data),
+            self._render_(ReservationSerializer(reservation).data)
+        )
+
+
+    def test_same_fields(self):
+        '''Read serializers - every field of the model serializers is output'''
+        reservation = Reservation.objects.exclude(return_flight=None).get()
+        read = ReservationReadSerializer(reservation).data
+        data = ReservationSerializer(reservation).data
+
+        self.assertEqual(list(read), list(data))
+        for name in ('first_flight_view', 'return_view', 'reserved_by'):
+            self.assertEqual(list(read[name]), list(data[name]))
+        self.assertEqual(
+            list(FlightReadSerializer(self.flight).data),
+            list(FlightSerializer(self.flight).data)
+        )
+
+
+class FastJSONRendererTests(APITestCase):
+    '''orjson backed JSON renderer'''
+
+    def setUp(self):
+        self.user = user_factory.create_user()
+        flight = reservation_factory.create_single_flight()
+        reservation_factory.make_reservation_single(
+            user_account=self.user, flight=flight)
+
+    def test_same_output_as_json_renderer(self):
+        '''JSON renderer - renders the response envelope as `JSONRenderer`'''
+        reservations = ReservationSerializer(
+            Reservation.objects.all(), many=True).data
+        data = Response({
+            'results': reservations,
+            'total': Decimal('12.50'),
+            'duration': timedelta(hours=1),
+            'at': timezone.now(),
+            'text': 'Lagos \u2028 Zürich',
+        }).data
+
+        self.assertEqual(
+            FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    def test_content_negotiation(self):
+        '''JSON renderer - indented output is still honoured'''
+        url = reverse('airports-list', kwargs={'version': 'v1'})
+        response = self.client.get(
+            url,
+            HTTP_AUTHORIZATION=utils.generate_token(self.user)
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertTrue(response.content.startswith(b'{"status_code":200'))
+
+        response = self.client.get(
+            url,
+            HTTP_ACCEPT='application/json; indent=4',
+            HTTP_AUTHORIZATION=utils.generate_token(self.user)
+        )
+        self.assertIn(b'\n    "status_code": 200', response.content)
+        self.assertEqual(
+            json.loads(response.content)['payload'],
+            json.loads(self.client.get(
+                url, HTTP_AUTHORIZATION=utils.generate_token(self.user)
+            ).content)['payload']
+        )
@@ -0,0 +1,134 @@
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from app.accounts.tests import factory as user_factory
+from app.helpers import throttling, utils
+
+
+def throttle_rates(**rates):
+    '''`override_settings` turning on the given throttle scopes'''
+    return override_settings(REST_FRAMEWORK=dict(
+        settings.REST_FRAMEWORK, DEFAULT_THROTTLE_RATES=rates))
+
+
+class LocalStoreTests(SimpleTestCase):
+    '''Throttle store - token buckets and in flight slots'''
+
+    def test_token_bucket(self):
+        '''Throttle store - bursts up to capacity, then refills over time'''
+        store = throttling.LocalStore()
+        take = [
+            store.take_token('bucket', 2, 1, now)
+            for now in (100, 100, 100, 100.5, 101)
+        ]
+        self.assertEqual([allowed for allowed, _ in take], [
+            True, True, False, False, True])
+        self.assertEqual(take[2][1], 1)
+        self.assertEqual(take[3][1], 0.5)
+
+    def test_slots(self):
+        '''Throttle store - slots are limited, released and expire'''
+        store = throttling.LocalStore()
+        self.assertTrue(store.acquire_slot('slots', 'a', 2, 30, 100))
+        self.assertTrue(store.acquire_slot('slots', 'b', 2, 30, 100))
+        self.assertFalse(store.acquire_slot('slots', 'c', 2, 30, 110))
+
+        store.release_slot('slots', 'a')
+        self.assertTrue(store.acquire_slot('slots', 'c', 2, 30, 110))
+        self.assertFalse(store.acquire_slot('slots', 'd', 2, 30, 120))
+        # `b` was never released (its worker died)
+        self.assertTrue(store.acquire_slot('slots', 'd', 2, 30, 130))
+
+
+class ThrottleTests(APITestCase):
+    '''Login and booking throttles'''
+
+    def setUp(self):
+        throttling.reset_store()
+        self.user = user_factory.create_user()
+        self.login_url = reverse('accounts-auth-user', kwargs={'version': 'v1'})
+        self.booking_url = reverse('reservations-list', kwargs={'version': 'v1'})
+
+    def tearDown(self):
+        throttling.reset_store()
+
+    @throttle_rates(login_account='2/min', login_ip='100/min')
+    def test_login_per_account(self):
+        '''Throttles - login attempts per username, in any case'''
+        for username in ('testuser', 'TESTUSER'):
+            response = self.client.post(self.login_url, {
+                'username': username, 'password': 'wrongpassword'})
+            self.assertEqual(
+                response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = self.client.post(self.login_url, {
+            'username': 'testuser', 'password': 'testuserpassword'})
+        self.assertEqual(
+            response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '30')
+        self.assertFalse(response.data.get('success'))
+
+        response = self.client.post(self.login_url, {
+            'username': 'someone-else', 'password': 'testuserpassword'})
+        self.assertEqual(
+            response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @throttle_rates(login_ip='1/min', login_account='100/min')
+    def test_login_per_ip(self):
+        '''Throttles - login attempts per client IP'''
+        self.client.post(self.login_url, {
+            'username': 'testuser', 'password': 'wrongpassword'})
+        response = self.client.post(self.login_url, {
+            'username': 'other', 'password': 'wrongpassword'})
+        self.assertEqual(
+            response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        response = self.client.post(
+            self.login_url,
+            {'username': 'other', 'password': 'wrongpassword'},
+            REMOTE_ADDR='10.0.0.2'
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @throttle_rates(booking_account='2/min', booking_ip='100/min')
+    def test_booking_per_account(self):
+        '''Throttles - bookings per account, listing is not counted'''
+        token = utils.generate_token(self.user)
+        for _ in range(2):
+            response = self.client.post(
+                self.booking_url, {}, HTTP_AUTHORIZATION=token)
+            self.assertEqual(
+                response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(
+            self.booking_url, {}, HTTP_AUTHORIZATION=token)
+        self.assertEqual(
+            response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        response = self.client.get(self.booking_url, HTTP_AUTHORIZATION=token)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(INFLIGHT_REQUEST_LIMIT=1)
+    def test_inflight_limit(self):
+        '''In flight limit - requests are refused while every slot is held'''
+        self.assertTrue(throttling.acquire_inflight_slot('held'))
+
+        response = self.client.get(
+            self.booking_url,
+            HTTP_AUTHORIZATION=utils.generate_token(self.user)
+        )
+        self.assertEqual(
+            response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertFalse(response.json().get('success'))
+
+        throttling.release_inflight_slot('held')
+        for _ in range(2):
+            response = self.client.get(
+                self.booking_url,
+                HTTP_AUTHORIZATION=utils.generate_token(self.user)
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -14,6 +14,10 @@ router.register(r'flights', views.FlightsViewSet,
                 basename='flights')
 router.register(r'airlines', views.AirlineViewSet,
                 basename='airlines')
+router.register(r'airports', views.AirportViewSet,
+                basename='airports')
+router.register(r'itineraries', views.ItineraryViewSet,
+                basename='itineraries')
 
 router.register(r'accounts', views.AccountReservationViewSet,
                 basename='account-reservations')
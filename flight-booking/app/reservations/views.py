@@ -5,13 +5,19 @@ from rest_framework import (
     decorators
 )
 
+from app.helpers.idempotency import idempotent
 from app.helpers.response import Response
 from app.helpers.pagination import paginate
+from app.helpers.streaming import stream_ndjson, use_streaming
+from app.helpers.throttling import BOOKING_THROTTLES
 from app.reservations import (
     services as reservation_services,
     serializers as reservation_serializers
 )
 
+# unique ordering used for keyset (cursor) pagination of reservations
+RESERVATION_ORDERING = ('first_flight__expected_departure', 'id')
+
 
 class ReservationViewSet(ViewSet):
     '''
@@ -24,6 +30,8 @@ class ReservationViewSet(ViewSet):
     create:
     Create Single Reservation (Book Reservation)
     '''
+    # only bookings (POST) are counted
+    throttle_classes = BOOKING_THROTTLES
 
     def list(self, request, **kwargs):
         '''
@@ -36,8 +44,9 @@ class ReservationViewSet(ViewSet):
         )
         return Response(
             paginate(
-                serializer=reservation_serializers.ReservationSerializer,
-                query_set=reservations, request=request
+                serializer=reservation_serializers.ReservationReadSerializer,
+                query_set=reservations, request=request,
+                ordering=RESERVATION_ORDERING
             )
         )
 
@@ -54,6 +63,7 @@ class ReservationViewSet(ViewSet):
             )
         )
 
+    @idempotent
     def create(self, request, **kwargs):
         '''
         post:
@@ -97,7 +107,7 @@ class ReservationViewSet(ViewSet):
         )
         return Response(
             paginate(
-                serializer=reservation_serializers.ReservationSerializer,
+                serializer=reservation_serializers.ReservationReadSerializer,
                 query_set=reservations,
                 request=request,
             )
@@ -119,7 +129,7 @@ class ReservationViewSet(ViewSet):
 
         return Response(
             paginate(
-                serializer=reservation_serializers.ReservationSerializer,
+                serializer=reservation_serializers.ReservationReadSerializer,
                 query_set=reservations,
                 request=request,
             )
@@ -127,7 +137,9 @@ class ReservationViewSet(ViewSet):
 
 
 class AccountReservationViewSet(ViewSet):
-    @decorators.action(detail=True, methods=['post', 'get'], url_path='reservations')
+    @decorators.action(detail=True, methods=['post', 'get'], url_path='reservations',
+                       throttle_classes=BOOKING_THROTTLES)
+    @idempotent
     def reservations(self, request, **kwargs):
         '''
         get:
@@ -145,9 +157,10 @@ class AccountReservationViewSet(ViewSet):
 
             return Response(
                 paginate(
-                    serializer=reservation_serializers.ReservationSerializer,
+                    serializer=reservation_serializers.ReservationReadSerializer,
                     query_set=reservations,
-                    request=request
+                    request=request,
+                    ordering=RESERVATION_ORDERING
                 )
 
             )
@@ -166,7 +179,8 @@ class AccountReservationViewSet(ViewSet):
 class FlightsViewSet(ViewSet):
     '''
     list:
-    List/Filter Flights extra queries: from, destination, date
+    List/Filter Flights extra queries: from, destination, within_km, date,
+    local_date, stream=ndjson
 
     retrieve:
     Retrieve Single Flight based on id
@@ -178,12 +192,23 @@ class FlightsViewSet(ViewSet):
     def list(self, request, **kwargs):
         '''
         get:
-        List/Filter Flights extra queries: from, destination, date
+        List/Filter Flights extra queries: from, destination, within_km,
+        date, local_date, stream=ndjson
         '''
+        flights = reservation_services.filter_flights(
+            request.user,
+            query_params=request.query_params
+        )
+        if use_streaming(request):
+            return stream_ndjson(
+                query_set=flights,
+                serializer=reservation_serializers.FlightReadSerializer
+            )
         return Response(
-            reservation_services.filter_flights(
-                request.user,
-                query_params=request.query_params
+            paginate(
+                request=request,
+                query_set=flights,
+                serializer=reservation_serializers.FlightReadSerializer
             )
         )
 
@@ -199,7 +224,9 @@ class FlightsViewSet(ViewSet):
             )
         )
 
-    @decorators.action(detail=True, methods=['get', 'post'], url_path='reservations')
+    @decorators.action(detail=True, methods=['get', 'post'], url_path='reservations',
+                       throttle_classes=BOOKING_THROTTLES)
+    @idempotent
     def reservations(self, request, **kwargs):
         '''
         get:
@@ -226,6 +253,90 @@ class FlightsViewSet(ViewSet):
                 message='Reservation made Successfully.'
             )
 
+    @decorators.action(detail=True, methods=['get', 'put'], url_path='seats')
+    def seats(self, request, **kwargs):
+        '''
+        get:
+        Retrieve seat capacity and availability per class for flight
+
+        put:
+        Set seat capacity for a flight class
+        '''
+        if request.method == 'GET':
+            return Response(
+                reservation_services.retrieve_seat_inventory(
+                    request.user,
+                    kwargs.get('pk')
+                )
+            )
+        if request.method == 'PUT':
+            return Response(
+                reservation_services.update_seat_inventory(
+                    request.user,
+                    flight_pk=kwargs.get('pk'),
+                    data=request.data
+                ),
+                message='Seats Updated Successfully.'
+            )
+
+
+class ItineraryViewSet(ViewSet):
+    '''
+    list:
+    Search direct and connecting itineraries extra queries: from, to, date,
+    max_stops, limit
+    '''
+
+    def list(self, request, **kwargs):
+        return Response(
+            reservation_services.search_itineraries(
+                request.user,
+                query_params=request.query_params
+            )
+        )
+
+
+class AirportViewSet(ViewSet):
+    '''
+    list:
+    Airport autocomplete extra queries: q, limit
+    '''
+
+    def list(self, request, **kwargs):
+        return Response(
+            reservation_services.search_airports(
+                request.user,
+                request.query_params
+            )
+        )
+
+    @decorators.action(detail=False, methods=['get'], url_path='nearest')
+    def nearest(self, request, **kwargs):
+        '''
+        get:
+        Airports nearest to a point extra queries: lat, lon, radius_km, limit
+        '''
+        return Response(
+            reservation_services.nearest_airports(
+                request.user,
+                request.query_params
+            )
+        )
+
+    @decorators.action(detail=True, methods=['get'], url_path='destinations')
+    def destinations(self, request, **kwargs):
+        '''
+        get:
+        Airports flown to from this airport extra queries: max_stops
+        '''
+        return Response(
+            reservation_services.filter_destinations(
+                request.user,
+                airport_code=kwargs.get('pk'),
+                query_params=request.query_params
+            )
+        )
+
 
 class AirlineViewSet(ViewSet):
     '''
@@ -242,7 +353,8 @@ class AirlineViewSet(ViewSet):
             paginate(
                 request=request,
                 query_set=airlines,
-                serializer=reservation_serializers.AirlineSerializer
+                serializer=reservation_serializers.AirlineSerializer,
+                ordering=('code',)
             )
         )
 
@@ -256,11 +368,21 @@ class AirlineViewSet(ViewSet):
         Create Single airline flight schedule
         '''
         if request.method == 'GET':
+            flights = reservation_services.retrieve_flight_for_airline(
+                request.user,
+                airline_code=kwargs.get('pk'),
+                query_params=request.query_params
+            )
+            if use_streaming(request):
+                return stream_ndjson(
+                    query_set=flights,
+                    serializer=reservation_serializers.FlightReadSerializer
+                )
             return Response(
-                reservation_services.retrieve_flight_for_airline(
-                    request.user,
-                    airline_code=kwargs.get('pk'),
-                    query_params=request.query_params
+                paginate(
+                    request=request,
+                    query_set=flights,
+                    serializer=reservation_serializers.FlightReadSerializer
                 ),
                 message='Available Flights For Airline: {} Returned'.format(
                     kwargs.get('pk'))
@@ -309,3 +431,35 @@ class AirlineViewSet(ViewSet):
             status=status.HTTP_201_CREATED,
             message='Flights Scheduled Successfully',
         )
+
+    @decorators.action(detail=True, methods=['post', 'get'], url_path='recurring-schedule')
+    def recurring_schedule(self, request, **kwargs):
+        '''
+        get:
+        List recurring flight schedules for airline
+
+        post:
+        Publish recurring flight schedule for airline (days of week, validity window, excluded dates)
+        '''
+        if request.method == 'GET':
+            flight_schedules = reservation_services.filter_flight_schedules(
+                request.user,
+                airline_code=kwargs.get('pk')
+            )
+            return Response(
+                paginate(
+                    request=request,
+                    query_set=flight_schedules,
+                    serializer=reservation_serializers.FlightScheduleSerializer
+                )
+            )
+        if request.method == 'POST':
+            return Response(
+                reservation_services.create_flight_schedule(
+                    request.user,
+                    airline_code=kwargs.get('pk'),
+                    data=request.data
+                ),
+                status=status.HTTP_201_CREATED,
+                message='Flight Schedule Published Successfully',
+            )
@@ -77,6 +77,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'bugsnag.django.middleware.BugsnagMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'app.helpers.middleware.InFlightLimitMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -95,8 +96,21 @@ REST_FRAMEWORK = {
     'DEFAULT_VERSIONING_CLASS': 'rest_framework.versioning.URLPathVersioning',
     'TEST_REQUEST_DEFAULT_FORMAT': 'json',
     'EXCEPTION_HANDLER': 'app.helpers.exceptions.handle_exceptions',
+    'DEFAULT_RENDERER_CLASSES': (
+        'app.helpers.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    # token bucket throttles (app.helpers.throttling): bursts of N,
+    # refilled over the period
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': env('THROTTLE_LOGIN_IP_RATE', default='30/min'),
+        'login_account': env('THROTTLE_LOGIN_ACCOUNT_RATE', default='10/min'),
+        'booking_ip': env('THROTTLE_BOOKING_IP_RATE', default='60/min'),
+        'booking_account': env(
+            'THROTTLE_BOOKING_ACCOUNT_RATE', default='20/min'),
+    },
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_jwt.authentication.JSONWebTokenAuthentication',
+        'app.helpers.authentication.ClaimsJSONWebTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
         'rest_framework.authentication.BasicAuthentication',
     ),
@@ -134,12 +148,31 @@ if IS_TEST:
         }
     }
     DEBUG = False
+    # tests turn throttles on where they test them
+    REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] = {}
 else:
     DATABASE_URL = env('DATABASE_URL', default=None)
     DATABASES = {
         'default': dj_database_url.config(default=DATABASE_URL)
     }
 
+# Cache
+# https://docs.djangoproject.com/en/2.1/topics/cache/
+CACHE_URL = env('CACHE_URL', default=None)
+if IS_TEST or CACHE_URL is None:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'redis_cache.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.1/ref/settings/#auth-password-validators
@@ -159,12 +192,23 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 PASSWORD_HASHERS = [
-    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'app.accounts.hashers.Argon2PasswordHasher',
     'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
     'django.contrib.auth.hashers.PBKDF2PasswordHasher',
     'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
 ]
 
+# Argon2 costs (memory in KiB); changing them rehashes each password on its
+# user's next login
+ARGON2_TIME_COST = env.int('ARGON2_TIME_COST', default=2)
+ARGON2_MEMORY_COST = env.int('ARGON2_MEMORY_COST', default=512)
+ARGON2_PARALLELISM = env.int('ARGON2_PARALLELISM', default=2)
+
+# Logins take a username or an email address
+AUTHENTICATION_BACKENDS = [
+    'app.accounts.backends.UsernameOrEmailBackend',
+]
+
 # Internationalization
 # https://docs.djangoproject.com/en/2.1/topics/i18n/
 
@@ -202,7 +246,7 @@ JWT_AUTH = {
     'rest_framework_jwt.utils.jwt_decode_handler',
 
     'JWT_PAYLOAD_HANDLER':
-    'rest_framework_jwt.utils.jwt_payload_handler',
+    'app.helpers.utils.jwt_payload_handler',
 
     'JWT_PAYLOAD_GET_USER_ID_HANDLER':
     'rest_framework_jwt.utils.jwt_get_user_id_from_payload_handler',
@@ -236,6 +280,82 @@ if CELERY_BROKER_URL is None:
 
 CELERY_RESULT_BACKEND = env('REDIS_URL', default='rpc://')
 
+# Pagination counts: exact, capped (stop after PAGINATION_COUNT_CAP rows) or
+# estimate (planner estimate for unfiltered queries); non exact counts are
+# cached for PAGINATION_COUNT_CACHE_TIMEOUT seconds
+PAGINATION_COUNT_STRATEGY = env(
+    'PAGINATION_COUNT_STRATEGY', default='exact')
+PAGINATION_COUNT_CAP = env.int('PAGINATION_COUNT_CAP', default=10000)
+PAGINATION_COUNT_CACHE_TIMEOUT = env.int(
+    'PAGINATION_COUNT_CACHE_TIMEOUT', default=60)
+
+# Rows fetched per round trip when streaming NDJSON (`?stream=ndjson`)
+STREAM_CHUNK_SIZE = env.int('STREAM_CHUNK_SIZE', default=500)
+
+# Airport/Airline representations: kept in the shared cache for
+# REFERENCE_CACHE_TIMEOUT seconds and in a per process LRU of
+# REFERENCE_CACHE_LOCAL_SIZE entries for REFERENCE_CACHE_LOCAL_TIMEOUT seconds
+REFERENCE_CACHE_TIMEOUT = env.int(
+    'REFERENCE_CACHE_TIMEOUT', default=60 * 60 * 24)
+REFERENCE_CACHE_LOCAL_SIZE = env.int(
+    'REFERENCE_CACHE_LOCAL_SIZE', default=10000)
+REFERENCE_CACHE_LOCAL_TIMEOUT = env.int(
+    'REFERENCE_CACHE_LOCAL_TIMEOUT', default=60)
+
+# Seconds before the in process airport search index is rebuilt
+AIRPORT_INDEX_TIMEOUT = env.int('AIRPORT_INDEX_TIMEOUT', default=60 * 5)
+
+# How from/destination flight filters find airports: `index` (in process
+# airport index) or `trigram` (database substring search, pg_trgm indexed)
+LOCATION_SEARCH_BACKEND = env('LOCATION_SEARCH_BACKEND', default='index')
+
+# Itinerary search: minimum time on the ground between connecting flights
+# (`LHR=90;JFK=60` overrides per airport), longest layover and how long a
+# day's departure index is kept per process
+MINIMUM_CONNECTION_MINUTES = env.int('MINIMUM_CONNECTION_MINUTES', default=45)
+MINIMUM_CONNECTION_MINUTES_BY_AIRPORT = env.dict(
+    'MINIMUM_CONNECTION_MINUTES_BY_AIRPORT', cast={'value': int}, default={})
+MAXIMUM_CONNECTION_HOURS = env.int('MAXIMUM_CONNECTION_HOURS', default=12)
+ITINERARY_INDEX_TIMEOUT = env.int('ITINERARY_INDEX_TIMEOUT', default=60)
+# departure windows (a day or two of flights each) kept per process
+ITINERARY_INDEX_CACHE_SIZE = env.int('ITINERARY_INDEX_CACHE_SIZE', default=4)
+
+# Route network (airport adjacency): a file written by `build-route-network`
+# is memory mapped and only its routes may be scheduled; without one the
+# network is built from upcoming flights/schedules every
+# ROUTE_NETWORK_TIMEOUT seconds, and by every worker once a route is added
+ROUTE_NETWORK_FILE = env('ROUTE_NETWORK_FILE', default='')
+ROUTE_NETWORK_TIMEOUT = env.int('ROUTE_NETWORK_TIMEOUT', default=60 * 10)
+
+# Seconds a user's groups and permissions stay in the shared cache (entries
+# are also dropped whenever they change)
+PERMISSION_CACHE_TIMEOUT = env.int(
+    'PERMISSION_CACHE_TIMEOUT', default=60 * 60 * 24)
+
+# Throttle buckets and in flight request slots live in Redis at
+# THROTTLE_REDIS_URL (the cache's by default), or in each process without one.
+# Past INFLIGHT_REQUEST_LIMIT concurrent requests (0: no limit) requests are
+# refused with a 503; slots held longer than INFLIGHT_REQUEST_TIMEOUT seconds
+# are taken to be from dead workers
+THROTTLE_REDIS_URL = env(
+    'THROTTLE_REDIS_URL', default='' if IS_TEST else CACHE_URL or '')
+THROTTLE_REDIS_TIMEOUT = env.float('THROTTLE_REDIS_TIMEOUT', default=0.1)
+INFLIGHT_REQUEST_LIMIT = env.int('INFLIGHT_REQUEST_LIMIT', default=0)
+INFLIGHT_REQUEST_TIMEOUT = env.int('INFLIGHT_REQUEST_TIMEOUT', default=30)
+INFLIGHT_RETRY_AFTER = env.int('INFLIGHT_RETRY_AFTER', default=1)
+
+# Successful bookings sent with an Idempotency-Key header are replayed to
+# retries for IDEMPOTENCY_KEY_TIMEOUT seconds; a retry arriving while the
+# first request is still running (for up to IDEMPOTENCY_LOCK_TIMEOUT seconds)
+# gets a 409
+IDEMPOTENCY_KEY_TIMEOUT = env.int(
+    'IDEMPOTENCY_KEY_TIMEOUT', default=60 * 60 * 24)
+IDEMPOTENCY_LOCK_TIMEOUT = env.int('IDEMPOTENCY_LOCK_TIMEOUT', default=60)
+
+# Days ahead recurring flight schedules are materialized as Flight rows
+FLIGHT_SCHEDULE_HORIZON_DAYS = env.int(
+    'FLIGHT_SCHEDULE_HORIZON_DAYS', default=60)
+
 MAX_IMAGE_UPLOAD_SIZE = env('MAX_IMAGE_UPLOAD_SIZE', default=5242880)
 
 EMAIL_HOST = env('EMAIL_SERVER', default='localhost')